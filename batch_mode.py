@@ -0,0 +1,190 @@
+"""
+Batch mode: populate the databases of many datasets in one process.
+
+Every faculty has its own offeredCourses.csv / workload.csv export and its
+own database. Instead of one cold start per faculty, a batch imports the
+extractors once, gives every dataset its own extractor instances and runs
+all datasets concurrently on one shared worker pool. Each dataset keeps its
+critical-path scheduling; while one dataset waits on a long dependency
+chain, the free workers pick up ready extractors of the others. Run metrics
+are shared, so the estimates learned from one faculty help the next.
+"""
+
+import os
+import time
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from run_metrics import RunMetricsStore, DEFAULT_METRICS_PATH
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One dataset directory and the database it populates"""
+    name: str
+    data_dir: str
+    db_path: str
+
+    @classmethod
+    def parse(cls, spec: str) -> 'BatchJob':
+        """
+        Parse 'DATA_DIR[=DB_PATH]'; the database defaults to <dir name>.db.
+
+        Raises:
+            ValueError: On an empty data directory
+        """
+        data_dir, _, db_path = spec.strip().partition('=')
+        data_dir = data_dir.strip()
+        if not data_dir:
+            raise ValueError(f"Invalid batch job: {spec!r}")
+        name = Path(data_dir).resolve().name
+        return cls(name, data_dir, db_path.strip() or f"{name}.db")
+
+
+def read_manifest(path: str) -> List[BatchJob]:
+    """Read one job spec per line; blank lines and # comments are ignored"""
+    jobs = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            jobs.append(BatchJob.parse(line))
+    return jobs
+
+
+@dataclass
+class BatchResult:
+    """Per-dataset results and aggregated metrics of a batch"""
+    results: Dict[str, object] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    workers: int = 1
+
+    @property
+    def success(self) -> bool:
+        return not self.errors and all(r.success for r in self.results.values())
+
+    @property
+    def extractor_seconds(self) -> float:
+        return sum(sum(r.timings.values()) for r in self.results.values())
+
+    @property
+    def total_rows(self) -> int:
+        return sum(sum(r.row_counts.values()) for r in self.results.values())
+
+    @property
+    def utilization(self) -> float:
+        """Share of the pool's capacity spent inside extractors"""
+        capacity = self.wall_seconds * self.workers
+        return self.extractor_seconds / capacity if capacity > 0 else 0.0
+
+    def table_totals(self) -> Dict[str, float]:
+        """Extractor seconds per table summed over all datasets"""
+        totals: Dict[str, float] = {}
+        for result in self.results.values():
+            for table, seconds in result.timings.items():
+                totals[table] = totals.get(table, 0.0) + seconds
+        return totals
+
+
+class BatchPopulator:
+    """
+    Runs several DatabasePopulators concurrently on one shared worker pool.
+
+    Every dataset is coordinated by its own lightweight thread (loading the
+    CSVs, scheduling, writing the sink); only extractor calls go to the
+    shared pool, so coordinators never block a worker.
+    """
+
+    def __init__(self, jobs: List[BatchJob], extractors_folder: str = "extractors",
+                 metrics_path: Optional[str] = DEFAULT_METRICS_PATH, workers: Optional[int] = None,
+                 staged: bool = False, memory_budget: Optional[int] = None,
+                 spill_dir: Optional[str] = None, max_concurrent: Optional[int] = None,
+                 partition_by_term: bool = False, schema_path: Optional[str] = None,
+                 upsert: bool = False, parse_cache: Optional[str] = None,
+                 baseline_hours: Optional[Dict[bool, float]] = None):
+        names = [job.name for job in jobs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate dataset names in batch: {', '.join(duplicates)}")
+        targets = [str(Path(job.db_path).resolve()) for job in jobs]
+        if len(set(targets)) != len(targets):
+            raise ValueError("Several datasets write into the same database")
+
+        self.jobs = list(jobs)
+        self.extractors_folder = extractors_folder
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.staged = staged
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.partition_by_term = partition_by_term
+        self.schema_path = schema_path
+        self.upsert = upsert
+        self.parse_cache = parse_cache
+        self.baseline_hours = baseline_hours
+        self.max_concurrent = max(1, min(max_concurrent or self.workers, len(self.jobs) or 1))
+        self.metrics = RunMetricsStore(metrics_path) if metrics_path else None
+
+    def run(self) -> BatchResult:
+        from simple_db_populator import DatabasePopulator, ExtractorRegistry
+
+        registry = ExtractorRegistry(self.extractors_folder)
+        registry.discover()
+        result = BatchResult(workers=self.workers)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extractor') as pool:
+            def populate(job: BatchJob):
+                populator = DatabasePopulator(
+                    job.data_dir, self.extractors_folder, workers=self.workers,
+                    memory_budget=self.memory_budget, spill_dir=self.spill_dir,
+                    registry=registry, metrics=self.metrics, pool=pool,
+                    partition_by_term=self.partition_by_term, schema_path=self.schema_path,
+                    upsert=self.upsert, parse_cache=self.parse_cache, baseline_hours=self.baseline_hours
+                )
+                job_started = time.perf_counter()
+                job_result = populator.populate(job.db_path, staged=self.staged)
+                logger.info(f"{'✓' if job_result.success else '❌'} {job.name}: {job.db_path} "
+                            f"in {time.perf_counter() - job_started:.2f}s")
+                return job_result
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                    thread_name_prefix='dataset') as coordinators:
+                futures = {coordinators.submit(populate, job): job for job in self.jobs}
+                for future, job in futures.items():
+                    try:
+                        result.results[job.name] = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ {job.name} failed: {e}")
+                        result.errors[job.name] = str(e)
+
+        result.wall_seconds = time.perf_counter() - started
+        return result
+
+
+def render_batch_summary(batch: BatchResult, jobs: List[BatchJob]) -> str:
+    lines = ["=" * 60, "BATCH SUMMARY", "=" * 60]
+    for job in jobs:
+        if job.name in batch.errors:
+            lines.append(f"  ❌ {job.name:<24} {batch.errors[job.name]}")
+            continue
+        result = batch.results[job.name]
+        state = "✓" if result.success else "❌"
+        problems = len(result.failed) + len(result.skipped)
+        lines.append(f"  {state} {job.name:<24} {sum(result.row_counts.values()):>8} rows  "
+                     f"{sum(result.timings.values()):8.3f}s  -> {job.db_path}"
+                     + (f"  ({problems} tables failed/skipped)" if problems else ""))
+
+    lines.append("")
+    lines.append(f"Datasets: {len(jobs)}, rows: {batch.total_rows}, wall time: {batch.wall_seconds:.2f}s")
+    lines.append(f"Extractor time: {batch.extractor_seconds:.2f}s on {batch.workers} workers "
+                 f"({batch.utilization:.0%} utilization)")
+    totals = sorted(batch.table_totals().items(), key=lambda item: -item[1])
+    if totals:
+        lines.append("Most expensive tables: " + ", ".join(f"{t} {s:.2f}s" for t, s in totals[:5]))
+    lines.append("=" * 60)
+    return "\n".join(lines)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the extractors.
+
+Times every extractor (or the given tables) on a synthetic input resampled
+from the CSV exports and reports rows/second. Run from the repository root:
+
+    python3 benchmarks/bench_extractors.py --rows 100000 --repeat 5
+    python3 benchmarks/bench_extractors.py OFFERING COURSE
+
+Under pytest each table is a parametrized case on a small input, so a
+broken extractor shows up as its own failure:
+
+    python3 -m pytest benchmarks/bench_extractors.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from extractor_benchmark import run_benchmarks, benchmark_extractor
+
+
+def pytest_generate_tests(metafunc):
+    """One benchmark case per discovered extractor"""
+    from simple_db_populator import ExtractorRegistry
+
+    if 'table' in metafunc.fixturenames:
+        metafunc.parametrize('table', sorted(ExtractorRegistry(str(ROOT / 'extractors')).discover()))
+
+
+def test_extractor_benchmark(table):
+    result = benchmark_extractor(table, rows=2_000, repeat=1, data_dir=str(ROOT / 'data'),
+                                 extractors_folder=str(ROOT / 'extractors'))
+    print(result.render())
+    assert result.output_rows > 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks(sys.argv[1:]))
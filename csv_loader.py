@@ -0,0 +1,292 @@
+"""
+CSV source loader for the database population tool.
+
+Loads the planning exports from the data directory into DataFrames named
+after the extractor parameters (OfferedCourses, WorkLoad).
+
+Low-cardinality columns are interned as pandas categoricals. Columns that
+hold the same kind of value share one dictionary across both CSVs, e.g. the
+``term`` categories are identical in OfferedCourses and WorkLoad and the
+department codes are shared by srvProvider, srvClient and lecDept. Equal
+values therefore have equal integer codes everywhere, which lets extractors
+resolve foreign keys with a lookup table over the codes (see fk_lookup).
+
+Loading can be restricted to the columns the scheduled extractors declare
+(DataExtractor.source_columns). Only those columns are parsed; the frames
+are LazySourceFrames that parse any other column on first access, so an
+extractor with an incomplete declaration still works, just more slowly.
+Columns sharing a dictionary are parsed together, and a dictionary first
+needed by a lazy load is seeded from all its columns in the loaded sources,
+so every column of a dictionary ends up with the same CategoricalDtype.
+
+Compressed exports (.csv.gz, .csv.zst) are parsed straight from a
+decompressing stream (see source_files.open_source). With a
+ParsedSourceCache, unchanged files are neither decompressed nor parsed again.
+"""
+
+import csv
+import logging
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Iterable
+from source_files import SOURCE_FILES, source_path, open_source
+from parsed_source_cache import ParsedSourceCache
+from trace_recorder import span
+
+logger = logging.getLogger(__name__)
+
+# Shared dictionaries: dictionary name -> (source, column) pairs using it
+INTERNED_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    'term': [('OfferedCourses', 'term'), ('WorkLoad', 'term')],
+    'department': [('OfferedCourses', 'srvProvider'), ('OfferedCourses', 'srvClient'),
+                   ('OfferedCourses', 'lecDept')],
+    'study_program': [('OfferedCourses', 'studyPrg')],
+    'elective': [('OfferedCourses', 'elective')],
+    'subject': [('OfferedCourses', 'sbjNo')],
+    'flag': [('OfferedCourses', 'isprof')],
+    'position': [('WorkLoad', 'job title')],
+}
+
+# The exports are semicolon separated and contain stray, unbalanced quotes
+CSV_OPTIONS = {'sep': ';', 'quoting': csv.QUOTE_NONE}
+
+# Tried in order; workload.csv is exported as Latin-1
+ENCODINGS = ('utf-8', 'cp1252')
+
+
+class LazySourceFrame(pd.DataFrame):
+    """
+    Source DataFrame holding only part of the CSV's columns.
+
+    Selecting a column that exists in the CSV but was not parsed yet
+    (``frame['col']`` or ``frame[[...]]``) parses it from the file with its
+    interned dtype. The frame itself is never modified, since extractor
+    threads read it concurrently: lazily parsed columns are published in a
+    side dict that is replaced, not mutated, on every load. Frames derived
+    from a LazySourceFrame are plain DataFrames.
+    """
+
+    _metadata = ['_lazy_loader', '_lazy_source', '_lazy_header', '_lazy_lock', '_lazy_columns']
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @classmethod
+    def wrap(cls, frame: pd.DataFrame, loader: 'CsvSourceLoader', name: str,
+             header: List[str]) -> 'LazySourceFrame':
+        lazy = cls(frame)
+        object.__setattr__(lazy, '_lazy_loader', loader)
+        object.__setattr__(lazy, '_lazy_source', name)
+        object.__setattr__(lazy, '_lazy_header', list(header))
+        object.__setattr__(lazy, '_lazy_lock', threading.Lock())
+        object.__setattr__(lazy, '_lazy_columns', {})
+        return lazy
+
+    @property
+    def unloaded_columns(self) -> List[str]:
+        return [column for column in self._lazy_header
+                if column not in self.columns and column not in self._lazy_columns]
+
+    def __getitem__(self, key):
+        wanted = self._lazy_keys(key)
+        if wanted is None:
+            return super().__getitem__(key)
+        lazy = self._load_missing(wanted)
+        if isinstance(key, str):
+            return lazy[key]
+        eager = super().__getitem__([column for column in wanted if column not in lazy])
+        return pd.DataFrame({column: lazy[column] if column in lazy else eager[column] for column in wanted},
+                            index=self.index)
+
+    def _lazy_keys(self, key) -> Optional[List[str]]:
+        """Requested column names if any of them still has to come from the CSV"""
+        if isinstance(key, str):
+            wanted = [key]
+        elif isinstance(key, (list, tuple, pd.Index)) and all(isinstance(k, str) for k in key):
+            wanted = list(key)
+        else:
+            return None  # Boolean masks, slices, ...
+        if all(column in self.columns or column not in self._lazy_header for column in wanted):
+            return None
+        return wanted
+
+    def _load_missing(self, wanted: List[str]) -> Dict[str, pd.Series]:
+        """Parse the wanted columns not loaded yet and return the published lazy columns"""
+        lazy = self._lazy_columns
+        if all(column in self.columns or column in lazy for column in wanted):
+            return lazy
+        with self._lazy_lock:
+            lazy = self._lazy_columns
+            missing = [column for column in wanted if column in self._lazy_header
+                       and column not in self.columns and column not in lazy]
+            if not missing:
+                return lazy
+            logger.info(f"Lazily loading {self._lazy_source} columns: {', '.join(missing)}")
+            loaded = self._lazy_loader.read_columns(self._lazy_source, missing)
+            lazy = dict(lazy)
+            for column in missing:
+                # Keep the interned (categorical) dtype of the parsed column
+                lazy[column] = loaded[column].set_axis(self.index)
+            object.__setattr__(self, '_lazy_columns', lazy)
+            return lazy
+
+
+class CsvSourceLoader:
+    """Loads the CSV sources and interns low-cardinality columns"""
+
+    def __init__(self, data_dir: str = 'data', intern: bool = True,
+                 cache: Optional[ParsedSourceCache] = None):
+        """
+        Args:
+            cache: Reuse parse results of unchanged source files across runs
+        """
+        self.data_dir = Path(data_dir)
+        self.intern = intern
+        self.cache = cache
+        self.dictionaries: Dict[str, pd.CategoricalDtype] = {}
+        self._encodings: Dict[str, str] = {}
+        self._headers: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, names: Optional[List[str]] = None,
+             columns: Optional[Dict[str, Optional[Iterable[str]]]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Load the requested sources (all by default).
+
+        Args:
+            names: Sources to load (default: all sources, or the keys of columns)
+            columns: Source name -> columns to parse, None for all columns.
+                Sources listed here are returned as LazySourceFrames.
+
+        Returns:
+            Dictionary of source name -> DataFrame
+        """
+        names = names or (list(columns) if columns is not None else list(SOURCE_FILES))
+        columns = columns or {}
+        wanted = {name: None if columns.get(name) is None else set(columns[name]) for name in names}
+        with self._lock:
+            for name in names:
+                if name not in self._headers:
+                    self._headers[name] = self.header(name)
+        wanted = self._with_shared_columns(wanted)
+        frames = {}
+        for name in names:
+            if wanted[name] is None:
+                frames[name] = self.read(name)
+                continue
+            header = self._headers[name]
+            frame = self.read(name, [column for column in header if column in wanted[name]])
+            frames[name] = LazySourceFrame.wrap(frame, self, name, header)
+        if self.intern:
+            with span('intern columns', 'csv'):
+                self.intern_columns(frames)
+        for name, frame in frames.items():
+            lazy = ""
+            if isinstance(frame, LazySourceFrame):
+                lazy = f", {len(frame.unloaded_columns)} columns deferred"
+            logger.info(f"Loaded {name}: {len(frame)} rows, {len(frame.columns)} columns, "
+                        f"{frame.memory_usage(deep=True).sum() / 1024:.0f} KiB{lazy}")
+        return frames
+
+    def header(self, name: str) -> List[str]:
+        """Column names of a source without parsing its rows"""
+        return list(self._read_csv(name, nrows=0).columns)
+
+    def read(self, name: str, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read a single source (or only usecols of it), trying the known export encodings"""
+        if usecols is not None and not usecols:
+            # Nothing requested: keep the row count, columns follow on demand
+            return pd.DataFrame(index=self._read_csv(name, usecols=[0]).index)
+        return self._read_csv(name, usecols=usecols)
+
+    def read_columns(self, name: str, columns: List[str]) -> pd.DataFrame:
+        """Parse additional columns of a source, interned like the eagerly loaded ones"""
+        frame = self.read(name, columns)
+        if self.intern:
+            self.intern_columns({name: frame})
+        return frame
+
+    def intern_columns(self, frames: Dict[str, pd.DataFrame]) -> None:
+        """Convert the INTERNED_COLUMNS to categoricals with shared dictionaries (in place)"""
+        for dictionary, members in INTERNED_COLUMNS.items():
+            present = [(name, column) for name, column in members
+                       if name in frames and column in frames[name].columns]
+            if not present:
+                continue
+
+            values = set()
+            for name, column in present:
+                values.update(frames[name][column].dropna().astype(str).unique())
+            if dictionary not in self.dictionaries:
+                # Seed a new dictionary with the deferred columns of the other loaded
+                # sources too, so that loading them later does not extend it
+                for name, column in self._deferred_members(members, present):
+                    values.update(self.read(name, [column])[column].dropna().astype(str).unique())
+            with self._lock:
+                existing = self.dictionaries.get(dictionary)
+                if existing is None:
+                    dtype = pd.CategoricalDtype(sorted(values))
+                else:
+                    # Only sources loaded by a later load() call can extend a dictionary;
+                    # new values go at the end, so the codes interned earlier stay valid
+                    new = sorted(values - set(existing.categories))
+                    dtype = pd.CategoricalDtype(list(existing.categories) + new) if new else existing
+                self.dictionaries[dictionary] = dtype
+
+            for name, column in present:
+                series = frames[name][column]
+                frames[name][column] = series.where(series.isna(), series.astype(str)).astype(dtype)
+
+    def _with_shared_columns(self, wanted: Dict[str, Optional[set]]) -> Dict[str, Optional[set]]:
+        """
+        Add the columns sharing a dictionary with a wanted column, so they are interned together.
+
+        Applies across sources: wanting OfferedCourses.term also parses WorkLoad.term.
+        Sources mapped to None are read completely and want all their columns.
+        """
+        for members in INTERNED_COLUMNS.values():
+            loaded = [(name, column) for name, column in members
+                      if name in wanted and column in self._headers[name]]
+            if any(wanted[name] is None or column in wanted[name] for name, column in loaded):
+                for name, column in loaded:
+                    if wanted[name] is not None:
+                        wanted[name].add(column)
+        return wanted
+
+    def _deferred_members(self, members: List[Tuple[str, str]],
+                          present: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Members of a dictionary in the loaded sources that are not part of present"""
+        return [(name, column) for name, column in members
+                if (name, column) not in present and column in self._headers.get(name, ())]
+
+    def _read_csv(self, name: str, **options) -> pd.DataFrame:
+        path = source_path(self.data_dir, name)
+        if not path.exists():
+            raise FileNotFoundError(f"CSV source not found: {path}")
+
+        # Header reads are cheap and not worth a cache entry
+        cache = self.cache if 'nrows' not in options else None
+        if cache is not None:
+            with span(f"parse cache {path.name}", 'csv'):
+                frame = cache.get(name, path, options)
+            if frame is not None:
+                return frame
+
+        known = self._encodings.get(name)
+        for encoding in ([known] if known else ENCODINGS):
+            try:
+                with span(f"read {path.name}", 'csv', encoding=encoding,
+                          columns=len(options['usecols']) if options.get('usecols') else 'all'), \
+                        open_source(path) as stream:
+                    frame = pd.read_csv(stream, encoding=encoding, **CSV_OPTIONS, **options)
+                if 'nrows' not in options:
+                    # Only a full pass proves the encoding; the header alone is ASCII
+                    self._encodings[name] = encoding
+                if cache is not None:
+                    cache.put(name, path, options, frame)
+                return frame
+            except UnicodeDecodeError:
+                logger.debug(f"{path} is not {encoding}, trying next encoding")
+        raise ValueError(f"Could not decode {path} with any of {ENCODINGS}")
@@ -0,0 +1,712 @@
+"""
+SQLite sinks for the database population tool.
+
+SqliteSink writes extracted tables directly into the live Planning_Tool
+database. StagedSqliteSink writes all tables into a shadow database file
+next to the live one, verifies it and then replaces the live file with a
+single atomic rename:
+
+- readers keep working on the previous file until they reconnect,
+- a failed or aborted load removes the shadow and never touches live data,
+- the previous database is kept as <db>.previous for a manual rollback,
+- primary and foreign keys of the schema are checked before the swap.
+
+The Partitioned* variants store term-scoped tables as one physical table
+per term behind a UNION ALL view (see TermPartitionedSinkMixin).
+
+UpsertSqliteSink merges every table into the existing one and writes only
+the rows whose content changed, by comparing per-row hashes.
+"""
+
+import os
+import json
+import math
+import pickle
+import shutil
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from trace_recorder import span
+from schema_model import SchemaModel
+
+logger = logging.getLogger(__name__)
+
+
+class LoadVerificationError(Exception):
+    """Raised when a staged database fails its integrity checks"""
+
+
+def to_sql_value(value: Any) -> Any:
+    """Convert numpy/pandas scalars and NaN to values sqlite3 can bind"""
+    if value is None:
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _column_list(columns) -> str:
+    return ', '.join(quote_identifier(c) for c in columns)
+
+
+class SqliteSink:
+    """Writes extracted records into a SQLite database, one table at a time"""
+
+    REJECTS_TABLE = '_REJECTED_ROWS'
+    HASHES_TABLE = '_ROW_HASHES'
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.row_counts: Dict[str, int] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def target_path(self) -> Path:
+        """Path of the file the tables are written into"""
+        return self.db_path
+
+    def open(self) -> 'SqliteSink':
+        self._connection = sqlite3.connect(self.target_path)
+        # Rollback journal keeps the database in a single file (required for the staged swap)
+        self._connection.execute('PRAGMA journal_mode=DELETE')
+        return self
+
+    def write_table(self, table_name: str, records: List[Dict[str, Any]]) -> int:
+        """Replace table_name with the given records and return the row count"""
+        if self._connection is None:
+            self.open()
+        with span(f"write {table_name}", 'db', rows=len(records)), self._connection:
+            self._replace_table(table_name, records)
+
+        self.row_counts[table_name] = len(records)
+        logger.info(f"✓ Wrote {len(records)} rows to {table_name}")
+        return len(records)
+
+    def _replace_table(self, table_name: str, records: List[Dict[str, Any]],
+                       columns: Optional[List[str]] = None) -> None:
+        """Drop and recreate a physical table (inside the caller's transaction)"""
+        columns = columns or self._columns(records)
+        table = quote_identifier(table_name)
+        # The table may have been stored as a partitioned view before
+        self._drop_relation(table_name)
+        if not columns:
+            logger.warning(f"{table_name}: no records, table left empty")
+            self._connection.execute(f'CREATE TABLE {table} (_EMPTY INTEGER)')
+            return
+        column_sql = ', '.join(quote_identifier(c) for c in columns)
+        definitions = ', '.join([column_sql] + self._constraints(table_name, columns))
+        self._connection.execute(f'CREATE TABLE {table} ({definitions})')
+        placeholders = ', '.join('?' for _ in columns)
+        self._connection.executemany(
+            f'INSERT INTO {table} ({column_sql}) VALUES ({placeholders})',
+            ([to_sql_value(record.get(c)) for c in columns] for record in records)
+        )
+
+    def _constraints(self, table_name: str, columns: List[str]) -> List[str]:
+        """Table constraint clauses for CREATE TABLE (none for plain loads)"""
+        return []
+
+    def write_rejects(self, table_name: str, rejects: List[Any]) -> None:
+        """Replace the rejected rows of table_name in the REJECTS_TABLE (see schema_coercion)"""
+        if self._connection is None:
+            self.open()
+        with self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.REJECTS_TABLE} '
+                '(TABLE_NAME TEXT, ROW_NR INTEGER, REASONS TEXT, RECORD TEXT)')
+            self._connection.execute(f'DELETE FROM {self.REJECTS_TABLE} WHERE TABLE_NAME = ?', (table_name,))
+            self._connection.executemany(
+                f'INSERT INTO {self.REJECTS_TABLE} (TABLE_NAME, ROW_NR, REASONS, RECORD) VALUES (?, ?, ?, ?)',
+                ((table_name, reject.row, '; '.join(reject.reasons),
+                  json.dumps({k: to_sql_value(v) for k, v in reject.record.items()}, default=str))
+                 for reject in rejects)
+            )
+
+    def _drop_relation(self, name: str) -> None:
+        """Drop the table or view called name, if any (DROP VIEW IF EXISTS fails on tables)"""
+        row = self._connection.execute(
+            "SELECT type FROM main.sqlite_master WHERE name = ? AND type IN ('table', 'view')", (name,)).fetchone()
+        if row is not None:
+            self._connection.execute(f'DROP {row[0].upper()} {quote_identifier(name)}')
+        # Row hashes of an earlier upsert load point at rowids that no longer exist
+        if self._connection.execute("SELECT 1 FROM main.sqlite_master WHERE name = ?",
+                                    (self.HASHES_TABLE,)).fetchone():
+            self._connection.execute(f'DELETE FROM {self.HASHES_TABLE} WHERE TABLE_NAME = ?', (name,))
+
+    def commit(self) -> None:
+        self.close()
+
+    def abort(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _columns(records: List[Dict[str, Any]]) -> List[str]:
+        """Union of record keys in first-seen order"""
+        columns: Dict[str, None] = {}
+        for record in records:
+            for key in record:
+                columns.setdefault(key, None)
+        return list(columns)
+
+
+class StagedSqliteSink(SqliteSink):
+    """
+    Writes into <db>.staging and swaps it in atomically on commit().
+
+    The swap is an os.replace() of the database file, which is atomic on
+    POSIX and Windows. The live database must use a rollback journal: a
+    leftover -wal file would be replayed against the new file.
+
+    With a schema, staged tables are created with the PRIMARY KEY, UNIQUE
+    and FOREIGN KEY clauses of the schema model: duplicate primary or
+    natural keys fail the write, and verify() checks the references with
+    PRAGMA foreign_key_check before the swap.
+    """
+
+    def __init__(self, db_path: str, expected_tables: Optional[List[str]] = None,
+                 keep_previous: bool = True, schema: Optional[SchemaModel] = None):
+        """
+        Args:
+            expected_tables: Tables the staged load must contain
+            schema: Schema model providing the key constraints of the tables
+        """
+        super().__init__(db_path)
+        self.expected_tables = list(expected_tables or [])
+        self.keep_previous = keep_previous
+        self.schema = schema
+        # Source rows per table (set by the populator); a table with source rows must not be empty
+        self.input_rows: Dict[str, int] = {}
+
+    @property
+    def target_path(self) -> Path:
+        return self.db_path.with_name(self.db_path.name + '.staging')
+
+    @property
+    def previous_path(self) -> Path:
+        return self.db_path.with_name(self.db_path.name + '.previous')
+
+    def open(self) -> 'StagedSqliteSink':
+        # Never build on top of the leftovers of an earlier failed load
+        self._remove(self.target_path)
+        return super().open()
+
+    def _replace_table(self, table_name: str, records: List[Dict[str, Any]],
+                       columns: Optional[List[str]] = None) -> None:
+        try:
+            super()._replace_table(table_name, records, columns)
+        except sqlite3.IntegrityError as e:
+            raise LoadVerificationError(f"{table_name}: {e}") from e
+
+    def _constraints(self, table_name: str, columns: List[str]) -> List[str]:
+        """PRIMARY KEY, UNIQUE and FOREIGN KEY clauses of the schema for the written columns"""
+        if self.schema is None or table_name not in self.schema:
+            return []
+        table = self.schema.table(table_name)
+        present = set(columns)
+        constraints = []
+        if table.primary_key and present.issuperset(table.primary_key):
+            constraints.append(f'PRIMARY KEY ({_column_list(table.primary_key)})')
+        # Natural keys behind the surrogate IDs (the upsert sink matches rows on them)
+        for index in table.indexes:
+            if index.is_unique_key and present.issuperset(index.columns):
+                constraints.append(f'UNIQUE ({_column_list(index.columns)})')
+        for fk in table.foreign_keys:
+            if present.issuperset(fk.columns) and self._can_reference(fk.to_table):
+                constraints.append(f'FOREIGN KEY ({_column_list(fk.columns)}) '
+                                   f'REFERENCES {quote_identifier(fk.to_table)} ({_column_list(fk.ref_columns)})')
+        return constraints
+
+    def _can_reference(self, table_name: str) -> bool:
+        """Whether table_name is stored as a table that foreign keys may reference"""
+        return True
+
+    def verify(self) -> None:
+        """Check the shadow database before it may replace the live one"""
+        if self._connection is None:
+            raise LoadVerificationError("Shadow database was never opened")
+
+        result = self._connection.execute('PRAGMA integrity_check').fetchone()[0]
+        if result != 'ok':
+            raise LoadVerificationError(f"Integrity check failed: {result}")
+
+        try:
+            violations = self._connection.execute('PRAGMA foreign_key_check').fetchall()
+        except sqlite3.DatabaseError as e:
+            # e.g. a referenced table is missing or its key columns were not written
+            raise LoadVerificationError(f"Foreign key check failed: {e}") from e
+        if violations:
+            raise LoadVerificationError(f"{len(violations)} foreign key violations, first: {violations[0]}")
+
+        existing = {row[0] for row in self._connection.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        missing = [t for t in self.expected_tables if t not in existing]
+        if missing:
+            raise LoadVerificationError(f"Missing tables in staged load: {', '.join(missing)}")
+
+        for table_name, expected in self.row_counts.items():
+            actual = self._connection.execute(
+                f'SELECT COUNT(*) FROM {quote_identifier(table_name)}').fetchone()[0]
+            if actual != expected:
+                raise LoadVerificationError(f"{table_name}: expected {expected} rows, found {actual}")
+            if actual == 0 and self.input_rows.get(table_name, 0) > 0:
+                raise LoadVerificationError(
+                    f"{table_name} is empty although its sources have {self.input_rows[table_name]} rows")
+
+    def commit(self) -> None:
+        """Verify the shadow database and atomically swap it into place"""
+        try:
+            self.verify()
+        except Exception:
+            self.abort()
+            raise
+        self.close()
+
+        wal_path = self.db_path.with_name(self.db_path.name + '-wal')
+        if wal_path.exists():
+            self._remove(self.target_path)
+            raise LoadVerificationError(f"Live database is in WAL mode ({wal_path}), refusing to swap")
+
+        if self.keep_previous and self.db_path.exists():
+            self._remove(self.previous_path)
+            try:
+                os.link(self.db_path, self.previous_path)
+            except OSError:
+                shutil.copy2(self.db_path, self.previous_path)
+
+        os.replace(self.target_path, self.db_path)
+        logger.info(f"✓ Swapped staged load into {self.db_path}")
+
+    def abort(self) -> None:
+        """Discard the shadow database, the live database stays untouched"""
+        self.close()
+        self._remove(self.target_path)
+        logger.warning(f"Staged load aborted, {self.db_path} left unchanged")
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        for candidate in (path, path.with_name(path.name + '-journal')):
+            if candidate.exists():
+                candidate.unlink()
+
+
+class TermPartitionedSinkMixin:
+    """
+    Stores term-scoped tables as one physical table per term.
+
+    OFFERING is written as OFFERING__SS15, OFFERING__WS1516, ... and a view
+    OFFERING that combines them with UNION ALL, so existing queries keep
+    working while single-term queries and reloads touch only their
+    partition. Partitions whose content did not change are not rewritten.
+    Archived terms are moved into a separate database and skipped by
+    later loads.
+    """
+
+    PARTITIONS_TABLE = '_TERM_PARTITIONS'
+    ARCHIVED_TABLE = '_ARCHIVED_TERMS'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resolver = None
+
+    @staticmethod
+    def partition_table(table_name: str, term: str) -> str:
+        """Name of the physical table holding one term of table_name"""
+        return f"{table_name}__{term}"
+
+    def _can_reference(self, table_name: str) -> bool:
+        from term_partitions import TERM_COLUMNS
+
+        # Term-scoped tables are UNION ALL views, which foreign keys cannot reference
+        return table_name not in TERM_COLUMNS
+
+    def open(self):
+        super().open()
+        with self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.PARTITIONS_TABLE} '
+                '(TABLE_NAME TEXT, TERM TEXT, ROW_COUNT INTEGER, DIGEST TEXT, PRIMARY KEY (TABLE_NAME, TERM))')
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {self.ARCHIVED_TABLE} (TERM TEXT PRIMARY KEY)')
+            # A staged load starts from an empty file: carry over the archived terms of the live database
+            if self.target_path != self.db_path and self.db_path.exists():
+                with sqlite3.connect(self.db_path) as live:
+                    try:
+                        archived = live.execute(f'SELECT TERM FROM {self.ARCHIVED_TABLE}').fetchall()
+                    except sqlite3.OperationalError:
+                        archived = []
+                self._connection.executemany(
+                    f'INSERT OR IGNORE INTO {self.ARCHIVED_TABLE} (TERM) VALUES (?)', archived)
+        return self
+
+    def write_table(self, table_name: str, records: List[Dict[str, Any]]) -> int:
+        from term_partitions import TERM_COLUMNS, TermResolver, partition_records
+
+        if table_name == 'SEMESTER_PLANNING':
+            self._resolver = TermResolver.from_records(records)
+        if table_name not in TERM_COLUMNS:
+            return super().write_table(table_name, records)
+        if self._connection is None:
+            self.open()
+
+        partitions = partition_records(table_name, records, self._term_resolver())
+        archived = self.archived_terms()
+        columns = self._columns(records)
+        existing = {term: digest for term, digest in self._connection.execute(
+            f'SELECT TERM, DIGEST FROM {self.PARTITIONS_TABLE} WHERE TABLE_NAME = ?', (table_name,))}
+
+        written = []
+        with span(f"write {table_name}", 'db', rows=len(records), partitions=len(partitions)), self._connection:
+            self._drop_relation(table_name)
+            for term, rows in partitions.items():
+                if term in archived:
+                    logger.info(f"{table_name}: term {term} is archived, {len(rows)} rows not loaded")
+                    continue
+                if self._write_partition(table_name, term, rows, columns, existing.get(term)):
+                    written.append(term)
+            for term in existing.keys() - partitions.keys():
+                self._drop_partition(table_name, term)
+            self._create_view(table_name)
+
+        count = self.row_counts[table_name] = self._connection.execute(
+            f'SELECT COUNT(*) FROM {quote_identifier(table_name)}').fetchone()[0]
+        logger.info(f"✓ Wrote {table_name}: {count} rows in {len(partitions)} term partitions, "
+                    f"{len(written)} rewritten")
+        return count
+
+    def write_partition(self, table_name: str, term: str, records: List[Dict[str, Any]]) -> int:
+        """Replace a single term of a term-scoped table, leaving the other terms untouched"""
+        from term_partitions import partition_name
+
+        if self._connection is None:
+            self.open()
+        term = partition_name(term)
+        if term in self.archived_terms():
+            raise ValueError(f"Term {term} is archived")
+        with self._connection:
+            self._write_partition(table_name, term, records, self._columns(records), digest=None)
+            self._create_view(table_name)
+        return len(records)
+
+    def partitions(self, table_name: str) -> Dict[str, int]:
+        """Term -> row count of the live partitions of table_name, in chronological order"""
+        from term_calendar import term_sort_key
+
+        counts = dict(self._connection.execute(
+            f'SELECT TERM, ROW_COUNT FROM {self.PARTITIONS_TABLE} WHERE TABLE_NAME = ?', (table_name,)))
+        return {term: counts[term] for term in sorted(counts, key=term_sort_key)}
+
+    def live_terms(self) -> List[str]:
+        """Terms with at least one live partition, in chronological order"""
+        from term_calendar import term_sort_key
+
+        terms = {row[0] for row in self._connection.execute(f'SELECT DISTINCT TERM FROM {self.PARTITIONS_TABLE}')}
+        return sorted(terms, key=term_sort_key)
+
+    def archived_terms(self) -> set:
+        return {row[0] for row in self._connection.execute(f'SELECT TERM FROM {self.ARCHIVED_TABLE}')}
+
+    def archive_term(self, term: str, archive_path: str) -> List[str]:
+        """
+        Move all partitions of term into the archive database.
+
+        Only the partition tables of that term and the views are touched;
+        later loads skip the term. Returns the archived table names.
+        """
+        from term_partitions import partition_name
+
+        if self._connection is None:
+            self.open()
+        term = partition_name(term)
+        tables = [row[0] for row in self._connection.execute(
+            f'SELECT TABLE_NAME FROM {self.PARTITIONS_TABLE} WHERE TERM = ?', (term,))]
+
+        self._connection.execute('ATTACH DATABASE ? AS archive', (str(archive_path),))
+        try:
+            with self._connection:
+                for table_name in tables:
+                    partition = quote_identifier(self.partition_table(table_name, term))
+                    self._connection.execute(f'DROP TABLE IF EXISTS archive.{partition}')
+                    self._connection.execute(f'CREATE TABLE archive.{partition} AS SELECT * FROM main.{partition}')
+                    self._drop_partition(table_name, term)
+                    self._create_view(table_name)
+                self._connection.execute(
+                    f'INSERT OR IGNORE INTO {self.ARCHIVED_TABLE} (TERM) VALUES (?)', (term,))
+        finally:
+            self._connection.execute('DETACH DATABASE archive')
+        logger.info(f"✓ Archived term {term} ({', '.join(tables) or 'no partitions'}) to {archive_path}")
+        return tables
+
+    def _term_resolver(self):
+        from term_partitions import TermResolver
+
+        if self._resolver is None:
+            # SEMESTER_PLANNING was not written in this run (e.g. a partial reload)
+            try:
+                cursor = self._connection.execute('SELECT * FROM SEMESTER_PLANNING')
+                names = [d[0] for d in cursor.description]
+                self._resolver = TermResolver.from_records(dict(zip(names, row)) for row in cursor)
+            except sqlite3.OperationalError:
+                self._resolver = TermResolver()
+        return self._resolver
+
+    def _write_partition(self, table_name: str, term: str, rows: List[Dict[str, Any]],
+                         columns: List[str], digest: Optional[str]) -> bool:
+        """Write one partition unless its content digest is unchanged; returns True if written"""
+        new_digest = hashlib.sha1(pickle.dumps(
+            (columns, [[to_sql_value(r.get(c)) for c in columns] for r in rows]))).hexdigest()
+        if digest == new_digest:
+            return False
+        self._replace_table(self.partition_table(table_name, term), rows, columns)
+        self._connection.execute(
+            f'INSERT OR REPLACE INTO {self.PARTITIONS_TABLE} (TABLE_NAME, TERM, ROW_COUNT, DIGEST) '
+            'VALUES (?, ?, ?, ?)', (table_name, term, len(rows), new_digest))
+        return True
+
+    def _drop_partition(self, table_name: str, term: str) -> None:
+        self._connection.execute(f'DROP TABLE IF EXISTS {quote_identifier(self.partition_table(table_name, term))}')
+        self._connection.execute(
+            f'DELETE FROM {self.PARTITIONS_TABLE} WHERE TABLE_NAME = ? AND TERM = ?', (table_name, term))
+
+    def _create_view(self, table_name: str) -> None:
+        """(Re)create the UNION ALL view over the live partitions of table_name"""
+        terms = list(self.partitions(table_name))
+        view = quote_identifier(table_name)
+        self._drop_relation(table_name)
+
+        partition_columns = {}
+        for term in terms:
+            partition = quote_identifier(self.partition_table(table_name, term))
+            partition_columns[term] = [row[1] for row in self._connection.execute(f'PRAGMA table_info({partition})')
+                                       if row[1] != '_EMPTY']
+        columns = list(dict.fromkeys(c for cols in partition_columns.values() for c in cols))
+        if not columns:
+            self._connection.execute(f'CREATE VIEW {view} AS SELECT NULL AS _EMPTY WHERE 0')
+            return
+        selects = []
+        for term in terms:
+            partition = quote_identifier(self.partition_table(table_name, term))
+            present = set(partition_columns[term])
+            fields = ', '.join(quote_identifier(c) if c in present else f'NULL AS {quote_identifier(c)}'
+                               for c in columns)
+            selects.append(f'SELECT {fields} FROM {partition}')
+        self._connection.execute(f'CREATE VIEW {view} AS ' + ' UNION ALL '.join(selects))
+
+
+class PartitionedSqliteSink(TermPartitionedSinkMixin, SqliteSink):
+    """SqliteSink storing term-scoped tables partitioned by term"""
+
+
+class PartitionedStagedSqliteSink(TermPartitionedSinkMixin, StagedSqliteSink):
+    """StagedSqliteSink storing term-scoped tables partitioned by term"""
+
+
+class UpsertSqliteSink(SqliteSink):
+    """
+    Merges extracted tables into the live database, writing only changed rows.
+
+    For every table a compact content hash per row is kept in HASHES_TABLE
+    (other sinks clear a table's hashes when they replace it), keyed by a
+    hash of the row's primary key (from the schema) together with the rowid
+    of the stored row. A load compares the new hashes with the stored ones
+    in bulk and issues only the inserts, updates and deletes needed, so
+    write volume and lock time scale with the change.
+
+    Rows are keyed by the primary key columns the records contain. Tables
+    without (unique) primary key values are keyed by row content; a changed
+    row is then a delete plus an insert. A table whose columns changed, or
+    that was written without hashes, is replaced once in full.
+
+    The extractors number surrogate IDs (O_ID, C_ID, ...) afresh on every
+    run. With a schema, rows of tables that declare a natural key are
+    matched on it instead: existing rows keep their stored ID, only new
+    rows get new IDs, and the foreign keys of later tables are remapped to
+    the stored IDs.
+    """
+
+    def __init__(self, db_path: str, primary_keys: Optional[Dict[str, List[str]]] = None,
+                 schema: Optional[SchemaModel] = None):
+        """
+        Args:
+            primary_keys: Table -> primary key columns (default: from schema)
+            schema: Schema model providing natural and foreign keys
+        """
+        super().__init__(db_path)
+        self.schema = schema
+        if primary_keys is None and schema is not None:
+            primary_keys = schema.primary_keys()
+        self.primary_keys = dict(primary_keys or {})
+        self.natural_keys = schema.natural_keys() if schema is not None else {}
+        # Table -> (inserted, updated, deleted) of the last write
+        self.changes: Dict[str, Tuple[int, int, int]] = {}
+        # Table -> extracted surrogate ID -> stored ID, for the foreign keys of later tables
+        self.id_maps: Dict[str, Dict[Any, Any]] = {}
+
+    def open(self) -> 'UpsertSqliteSink':
+        super().open()
+        with self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.HASHES_TABLE} (TABLE_NAME TEXT, KEY_HASH INTEGER, '
+                'ROW_HASH INTEGER, ROW_ID INTEGER, PRIMARY KEY (TABLE_NAME, KEY_HASH)) WITHOUT ROWID')
+        return self
+
+    def write_table(self, table_name: str, records: List[Dict[str, Any]]) -> int:
+        if self._connection is None:
+            self.open()
+        columns = self._columns(records)
+        rows = [[to_sql_value(record.get(c)) for c in columns] for record in records]
+        self._remap_foreign_keys(table_name, columns, rows)
+        self._keep_surrogate_ids(table_name, columns, rows)
+        hashes = self._row_hashes(table_name, columns, rows)
+        stored = {key: (row_hash, row_id) for key, row_hash, row_id in self._connection.execute(
+            f'SELECT KEY_HASH, ROW_HASH, ROW_ID FROM {self.HASHES_TABLE} WHERE TABLE_NAME = ?', (table_name,))}
+
+        with span(f"upsert {table_name}", 'db', rows=len(records)), self._connection:
+            if not columns or not stored or self._stored_columns(table_name) != columns:
+                inserted, updated, deleted = self._rebuild(table_name, columns, rows, hashes)
+            else:
+                inserted, updated, deleted = self._merge(table_name, columns, rows, hashes, stored)
+
+        self.changes[table_name] = (inserted, updated, deleted)
+        self.row_counts[table_name] = len(records)
+        logger.info(f"✓ Upserted {table_name}: +{inserted} ~{updated} -{deleted} rows "
+                    f"({len(records) - inserted - updated} unchanged)")
+        return len(records)
+
+    def _remap_foreign_keys(self, table_name: str, columns: List[str], rows: List[List[Any]]) -> None:
+        """Point foreign keys at the stored IDs of the referenced rows (in place)"""
+        if self.schema is None or table_name not in self.schema:
+            return
+        for fk in self.schema.table(table_name).foreign_keys:
+            ids = self.id_maps.get(fk.to_table)
+            if not ids or len(fk.columns) != 1 or fk.columns[0] not in columns:
+                continue
+            index = columns.index(fk.columns[0])
+            for row in rows:
+                row[index] = ids.get(row[index], row[index])
+
+    def _keep_surrogate_ids(self, table_name: str, columns: List[str], rows: List[List[Any]]) -> None:
+        """Replace extracted surrogate IDs by the stored IDs of rows with the same natural key (in place)"""
+        key = self.primary_keys.get(table_name, [])
+        natural = self.natural_keys.get(table_name, [])
+        if len(key) != 1 or not natural or not set(key + natural) <= set(columns):
+            return
+        id_index = columns.index(key[0])
+        natural_indexes = [columns.index(c) for c in natural]
+        naturals = [tuple(row[i] for i in natural_indexes) for row in rows]
+        if len(set(naturals)) != len(naturals):
+            logger.warning(f"{table_name}: natural key ({', '.join(natural)}) is not unique, "
+                           f"keeping the extracted {key[0]} values")
+            return
+
+        stored = {}
+        if set(key + natural) <= set(self._stored_columns(table_name)):
+            cursor = self._connection.execute(
+                f'SELECT {_column_list(natural + key)} FROM {quote_identifier(table_name)}')
+            stored = {tuple(row[:-1]): row[-1] for row in cursor}
+        if not stored:
+            # First load: the extracted IDs become the stored ones
+            self.id_maps[table_name] = {row[id_index]: row[id_index] for row in rows}
+            return
+
+        next_id = max((i for i in stored.values() if isinstance(i, int)), default=0) + 1
+        ids = {}
+        for row, value in zip(rows, naturals):
+            stored_id = stored.get(value)
+            if stored_id is None:
+                stored_id, next_id = next_id, next_id + 1
+            ids[row[id_index]] = row[id_index] = stored_id
+        self.id_maps[table_name] = ids
+
+    def _merge(self, table_name: str, columns: List[str], rows: List[List[Any]],
+               hashes: List[Tuple[int, int]], stored: Dict[int, Tuple[int, int]]) -> Tuple[int, int, int]:
+        table = quote_identifier(table_name)
+        new_keys = {key for key, _ in hashes}
+        deletes = [(row_id,) for key, (_, row_id) in stored.items() if key not in new_keys]
+        updates = []
+        inserts = []
+        for row, (key, row_hash) in zip(rows, hashes):
+            previous = stored.get(key)
+            if previous is None:
+                inserts.append((row, key, row_hash))
+            elif previous[0] != row_hash:
+                updates.append((row, key, row_hash, previous[1]))
+
+        self._connection.executemany(f'DELETE FROM {table} WHERE rowid = ?', deletes)
+        self._connection.executemany(
+            f'DELETE FROM {self.HASHES_TABLE} WHERE TABLE_NAME = ? AND KEY_HASH = ?',
+            ((table_name, key) for key, _ in stored.items() if key not in new_keys))
+
+        assignments = ', '.join(f'{quote_identifier(c)} = ?' for c in columns)
+        self._connection.executemany(f'UPDATE {table} SET {assignments} WHERE rowid = ?',
+                                     (row + [row_id] for row, _, _, row_id in updates))
+        self._connection.executemany(
+            f'UPDATE {self.HASHES_TABLE} SET ROW_HASH = ? WHERE TABLE_NAME = ? AND KEY_HASH = ?',
+            ((row_hash, table_name, key) for _, key, row_hash, _ in updates))
+
+        self._insert(table_name, columns, inserts)
+        return len(inserts), len(updates), len(deletes)
+
+    def _rebuild(self, table_name: str, columns: List[str], rows: List[List[Any]],
+                 hashes: List[Tuple[int, int]]) -> Tuple[int, int, int]:
+        """Replace the table and its hashes completely"""
+        self._drop_relation(table_name)
+        if not columns:
+            self._replace_table(table_name, [], columns)
+            return 0, 0, 0
+        column_sql = ', '.join(quote_identifier(c) for c in columns)
+        self._connection.execute(f'CREATE TABLE {quote_identifier(table_name)} ({column_sql})')
+        self._insert(table_name, columns, [(row, key, row_hash) for row, (key, row_hash) in zip(rows, hashes)])
+        return len(rows), 0, 0
+
+    def _insert(self, table_name: str, columns: List[str], inserts: List[Tuple[List[Any], int, int]]) -> None:
+        table = quote_identifier(table_name)
+        placeholders = ', '.join('?' for _ in columns)
+        last_row_id = self._connection.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM {table}').fetchone()[0]
+        self._connection.executemany(f'INSERT INTO {table} ({_column_list(columns)}) VALUES ({placeholders})',
+                                     (row for row, _, _ in inserts))
+        # New rows get rowid MAX(rowid) + 1 in insertion order
+        row_ids = [row[0] for row in self._connection.execute(
+            f'SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid', (last_row_id,))]
+        hashes = [(table_name, key, row_hash, row_id) for (_, key, row_hash), row_id in zip(inserts, row_ids)]
+        self._connection.executemany(
+            f'INSERT INTO {self.HASHES_TABLE} (TABLE_NAME, KEY_HASH, ROW_HASH, ROW_ID) VALUES (?, ?, ?, ?)', hashes)
+
+    def _row_hashes(self, table_name: str, columns: List[str], rows: List[List[Any]]) -> List[Tuple[int, int]]:
+        """(key hash, content hash) per row"""
+        row_hashes = [self._hash(row) for row in rows]
+        key_columns = [columns.index(c) for c in self.primary_keys.get(table_name, []) if c in columns]
+        if key_columns:
+            key_hashes = [self._hash([row[i] for i in key_columns]) for row in rows]
+            if len(set(key_hashes)) == len(key_hashes):
+                return list(zip(key_hashes, row_hashes))
+            logger.debug(f"{table_name}: primary key values not unique, keying rows by content")
+
+        # Content keys; identical rows are numbered so duplicates stay distinct
+        seen: Dict[int, int] = {}
+        hashes = []
+        for row_hash in row_hashes:
+            occurrence = seen[row_hash] = seen.get(row_hash, -1) + 1
+            hashes.append((self._hash([row_hash, occurrence]), row_hash))
+        return hashes
+
+    def _stored_columns(self, table_name: str) -> List[str]:
+        return [row[1] for row in self._connection.execute(f'PRAGMA table_info({quote_identifier(table_name)})')]
+
+    @staticmethod
+    def _hash(values: List[Any]) -> int:
+        """Signed 64-bit content hash (fits an SQLite INTEGER)"""
+        digest = hashlib.blake2b(json.dumps(values, default=str).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
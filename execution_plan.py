@@ -0,0 +1,109 @@
+"""
+Execution plan and cost estimates for a populator run.
+
+Resolves the extractor DAG statically (see extractor_dag), groups it into
+parallel levels and estimates the cost of every extractor from the stored
+metrics of earlier runs, scaled by the current input row counts. Neither
+pandas nor the data is touched: row counts come from counting lines.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from extractor_dag import ExtractorGraph, ExtractorNode, scan_extractors
+from run_metrics import RunMetricsStore, DEFAULT_METRICS_PATH
+from source_files import source_row_counts
+
+
+@dataclass
+class PlanNode:
+    """One extractor in the execution plan"""
+    table_name: str
+    level: int
+    dependencies: List[str]
+    input_rows: int
+    estimated_seconds: Optional[float]
+    from_history: bool
+
+
+def input_rows_for(node: ExtractorNode, source_rows: Dict[str, int]) -> int:
+    """Rows an extractor reads; extractors without CSV inputs scale with all sources"""
+    inputs = node.csv_inputs or tuple(source_rows)
+    return sum(source_rows.get(name, 0) for name in inputs)
+
+
+class ExecutionPlan:
+    """Static plan of a populator run with per-extractor cost estimates"""
+
+    def __init__(self, graph: ExtractorGraph, nodes: Dict[str, PlanNode], source_rows: Dict[str, int]):
+        self.graph = graph
+        self.nodes = nodes
+        self.source_rows = source_rows
+
+    @classmethod
+    def build(cls, extractors_folder: str = "extractors", data_dir: str = "data",
+              metrics_path: str = DEFAULT_METRICS_PATH) -> 'ExecutionPlan':
+        extractor_nodes = scan_extractors(extractors_folder)
+        graph = ExtractorGraph.from_nodes(extractor_nodes)
+        source_rows = source_row_counts(data_dir)
+        metrics = RunMetricsStore(metrics_path)
+
+        input_rows = {t: input_rows_for(n, source_rows) for t, n in extractor_nodes.items()}
+        estimates = metrics.estimates(input_rows)
+        history = metrics.load()
+
+        nodes: Dict[str, PlanNode] = {}
+        for level, tables in enumerate(graph.levels()):
+            for table in tables:
+                nodes[table] = PlanNode(
+                    table_name=table,
+                    level=level,
+                    dependencies=list(extractor_nodes[table].dependencies),
+                    input_rows=input_rows[table],
+                    estimated_seconds=estimates[table],
+                    from_history=table in history,
+                )
+        return cls(graph, nodes, source_rows)
+
+    @property
+    def has_estimates(self) -> bool:
+        return any(node.estimated_seconds is not None for node in self.nodes.values())
+
+    def costs(self) -> Dict[str, float]:
+        """Estimated seconds per table; one unit per table when there is no history at all"""
+        if not self.has_estimates:
+            return {table: 1.0 for table in self.nodes}
+        return {table: node.estimated_seconds or 0.0 for table, node in self.nodes.items()}
+
+    def critical_path(self):
+        return self.graph.critical_path(self.costs())
+
+    def render(self) -> str:
+        """Human readable plan"""
+        lines = ["=" * 60, "EXECUTION PLAN", "=" * 60]
+        rows = ', '.join(f"{name}={count}" for name, count in self.source_rows.items()) or 'none found'
+        lines.append(f"Input rows: {rows}")
+        critical, total = self.critical_path()
+        critical_set = set(critical)
+
+        for level, tables in enumerate(self.graph.levels()):
+            lines.append(f"\nLevel {level} ({len(tables)} parallel):")
+            for table in tables:
+                node = self.nodes[table]
+                if node.estimated_seconds is None:
+                    cost = '       ?'
+                else:
+                    cost = f"{node.estimated_seconds:7.3f}s" + ('' if node.from_history else '~')
+                marker = '*' if table in critical_set else ' '
+                deps = ', '.join(node.dependencies) or '-'
+                lines.append(f"  {marker} {table:<30} {cost:>9}  rows={node.input_rows:<8} deps: {deps}")
+
+        lines.append("\nCritical path: " + ' -> '.join(critical))
+        if self.has_estimates:
+            serial = sum(self.costs().values())
+            lines.append(f"Estimated time: {total:.3f}s with unlimited workers, {serial:.3f}s serial")
+            lines.append("(~ = no history for this table, estimated from the median rate of the others)")
+        else:
+            lines.append(f"No metrics from earlier runs, critical path has {len(critical)} tables")
+        lines.append("=" * 60)
+        return "\n".join(lines)
@@ -0,0 +1,162 @@
+"""
+Micro-benchmark harness for single extractors.
+
+Builds a synthetic input of the requested size by resampling the rows of
+the real CSV exports (keeping the interned categoricals), runs the
+extractor's dependencies once untimed to obtain their records, and then
+times the extractor itself. benchmarks/bench_extractors.py runs it for any
+or all tables, so authors see rows/second right after generating an
+extractor.
+"""
+
+import sys
+import time
+import inspect
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+from extractor_dag import ExtractorGraph
+from simple_db_populator import ExtractorRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROWS = 100_000
+DEFAULT_REPEAT = 5
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one extractor on a synthetic input"""
+    table_name: str
+    input_rows: int
+    output_rows: int
+    timings: List[float]
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.input_rows / self.best if self.best > 0 else float('inf')
+
+    def render(self) -> str:
+        mean = sum(self.timings) / len(self.timings)
+        return (f"{self.table_name}: {self.input_rows} input rows -> {self.output_rows} records\n"
+                f"  best {self.best * 1000:.1f} ms, mean {mean * 1000:.1f} ms over {len(self.timings)} runs\n"
+                f"  {self.rows_per_second:,.0f} rows/s")
+
+
+def synthetic_sources(data_dir: str = 'data', rows: int = DEFAULT_ROWS, seed: int = 0) -> Dict[str, Any]:
+    """
+    Resample every CSV source to the given number of rows.
+
+    The value distributions (and therefore the distinct counts the
+    extractors see) follow the real exports; only the volume changes.
+    """
+    import numpy as np
+    from csv_loader import CsvSourceLoader
+
+    rng = np.random.default_rng(seed)
+    sources = CsvSourceLoader(data_dir).load()
+    return {
+        name: frame.iloc[rng.integers(0, len(frame), size=rows)].reset_index(drop=True)
+        for name, frame in sources.items() if len(frame)
+    }
+
+
+def _extractor_kwargs(extractor, sources: Dict[str, Any], outputs: Dict[str, List[Dict[str, Any]]]):
+    kwargs = dict(sources)
+    kwargs.update({dep.lower(): outputs[dep] for dep in extractor.dependencies})
+    return kwargs
+
+
+def benchmark_extractors(tables: Optional[List[str]] = None, rows: int = DEFAULT_ROWS,
+                         repeat: int = DEFAULT_REPEAT, data_dir: str = 'data',
+                         extractors_folder: str = 'extractors', seed: int = 0) -> List[BenchmarkResult]:
+    """
+    Time several extractors (default: all) against one synthetic input.
+
+    The sources are resampled once and every dependency is extracted once,
+    untimed, for all benchmarked tables together.
+
+    Raises:
+        KeyError: If there is no extractor for one of the tables
+        RuntimeError: If a dependency fails on the synthetic input
+    """
+    extractors = ExtractorRegistry(extractors_folder).discover()
+    graph = ExtractorGraph({t: e.dependencies for t, e in extractors.items()})
+    tables = graph.topological_order() if tables is None else list(tables)
+    unknown = [table for table in tables if table not in extractors]
+    if unknown:
+        raise KeyError(f"No extractor for table {', '.join(unknown)}")
+    sources = synthetic_sources(data_dir, rows, seed)
+
+    outputs: Dict[str, List[Dict[str, Any]]] = {}
+    ancestors = graph.ancestors(tables)
+    for table in graph.topological_order():
+        if table not in ancestors:
+            continue
+        try:
+            outputs[table] = extractors[table].extract(**_extractor_kwargs(extractors[table], sources, outputs))
+        except Exception as e:
+            raise RuntimeError(f"Dependency {table} failed on the synthetic input: {e}") from e
+
+    return [_time_extractor(table, extractors[table], sources, outputs, repeat) for table in tables]
+
+
+def benchmark_extractor(table_name: str, rows: int = DEFAULT_ROWS, repeat: int = DEFAULT_REPEAT,
+                        data_dir: str = 'data', extractors_folder: str = 'extractors',
+                        seed: int = 0) -> BenchmarkResult:
+    """Time one extractor against a synthetic input (see benchmark_extractors)"""
+    return benchmark_extractors([table_name], rows, repeat, data_dir, extractors_folder, seed)[0]
+
+
+def _time_extractor(table_name: str, extractor, sources: Dict[str, Any],
+                    outputs: Dict[str, List[Dict[str, Any]]], repeat: int) -> BenchmarkResult:
+    kwargs = _extractor_kwargs(extractor, sources, outputs)
+    parameters = inspect.signature(extractor.extract).parameters
+    used = [name for name in sources if name in parameters] or list(sources)
+    timings = []
+    records: List[Dict[str, Any]] = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        records = extractor.extract(**kwargs)
+        timings.append(time.perf_counter() - started)
+
+    input_rows = sum(len(sources[name]) for name in used)
+    return BenchmarkResult(table_name, input_rows, len(records), timings)
+
+
+def run_benchmarks(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point of benchmarks/bench_extractors.py"""
+    parser = argparse.ArgumentParser(description="Benchmark extractors on synthetic input")
+    parser.add_argument('tables', nargs='*', metavar='TABLE',
+                        help='Tables whose extractors are timed (default: all)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f'Rows per synthetic CSV source (default: {DEFAULT_ROWS})')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Timed runs (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--data-dir', default='data',
+                        help='CSV exports the synthetic input is sampled from (default: data)')
+    parser.add_argument('--extractors-folder', default='extractors',
+                        help='Path to extractors folder (default: extractors)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the resampling')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        results = benchmark_extractors([table.upper() for table in args.tables] or None, args.rows,
+                                       args.repeat, args.data_dir, args.extractors_folder, args.seed)
+    except Exception as e:
+        print(f"\n💥 Benchmark failed: {e}")
+        return 1
+    for result in results:
+        print(result.render())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks(sys.argv[1:]))
@@ -0,0 +1,174 @@
+"""
+Static extractor dependency graph.
+
+Reads table names, dependencies and CSV inputs straight from the extractor
+sources with the ast module, so the graph is available without importing
+the extractors (and therefore without importing pandas). The graph offers
+the topological helpers shared by the execution plan and the scheduler:
+parallel levels, descendants and cost-weighted longest paths.
+"""
+
+import ast
+import logging
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExtractorNode:
+    """Static description of one extractor class"""
+    table_name: str
+    class_name: str
+    module: str
+    dependencies: Tuple[str, ...] = ()
+    csv_inputs: Tuple[str, ...] = ()
+
+
+def _property_value(function: ast.FunctionDef):
+    """Return the literal returned by a property body, or None"""
+    for statement in function.body:
+        if isinstance(statement, ast.Return) and statement.value is not None:
+            try:
+                return ast.literal_eval(statement.value)
+            except ValueError:
+                return None
+    return None
+
+
+def _dataframe_parameters(function: ast.FunctionDef) -> Tuple[str, ...]:
+    """Names of extract() parameters annotated as pd.DataFrame"""
+    names = []
+    for arg in function.args.args + function.args.kwonlyargs:
+        annotation = arg.annotation
+        if isinstance(annotation, ast.Attribute) and annotation.attr == 'DataFrame':
+            names.append(arg.arg)
+        elif isinstance(annotation, ast.Name) and annotation.id == 'DataFrame':
+            names.append(arg.arg)
+    return tuple(names)
+
+
+def scan_extractors(extractors_folder: str = "extractors") -> Dict[str, ExtractorNode]:
+    """Parse every extractor module and collect its ExtractorNodes by table name"""
+    nodes: Dict[str, ExtractorNode] = {}
+    for module_path in sorted(Path(extractors_folder).glob('*.py')):
+        try:
+            tree = ast.parse(module_path.read_text(encoding='utf-8'), filename=str(module_path))
+        except SyntaxError as e:
+            logger.error(f"Could not parse {module_path.name}: {e}")
+            continue
+
+        for cls in (n for n in tree.body if isinstance(n, ast.ClassDef)):
+            methods = {f.name: f for f in cls.body if isinstance(f, ast.FunctionDef)}
+            if 'table_name' not in methods or 'extract' not in methods:
+                continue
+            table_name = _property_value(methods['table_name'])
+            if not isinstance(table_name, str):
+                continue
+            dependencies = _property_value(methods['dependencies']) if 'dependencies' in methods else []
+            nodes[table_name] = ExtractorNode(
+                table_name=table_name,
+                class_name=cls.name,
+                module=module_path.stem,
+                dependencies=tuple(dependencies or ()),
+                csv_inputs=_dataframe_parameters(methods['extract']),
+            )
+    return nodes
+
+
+class ExtractorGraph:
+    """Dependency DAG over extractors (edges point from dependency to dependent)"""
+
+    def __init__(self, dependencies: Dict[str, Iterable[str]]):
+        self.dependencies: Dict[str, Tuple[str, ...]] = {t: tuple(d) for t, d in dependencies.items()}
+        for table, deps in self.dependencies.items():
+            unknown = [dep for dep in deps if dep not in self.dependencies]
+            if unknown:
+                raise ValueError(f"{table} depends on tables without extractor: {', '.join(unknown)}")
+        self.dependents: Dict[str, List[str]] = {t: [] for t in self.dependencies}
+        for table, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(table)
+        self._order = self._topological_order()
+
+    @classmethod
+    def from_nodes(cls, nodes: Dict[str, ExtractorNode]) -> 'ExtractorGraph':
+        return cls({table: node.dependencies for table, node in nodes.items()})
+
+    def subgraph(self, tables: Iterable[str]) -> 'ExtractorGraph':
+        """Graph over the given tables; dependencies outside the subset are dropped"""
+        subset = set(tables)
+        return ExtractorGraph({t: [d for d in self.dependencies[t] if d in subset]
+                               for t in self._order if t in subset})
+
+    def topological_order(self) -> List[str]:
+        return list(self._order)
+
+    def levels(self) -> List[List[str]]:
+        """Group tables into levels that can run in parallel"""
+        depth: Dict[str, int] = {}
+        for table in self._order:
+            depth[table] = 1 + max((depth[d] for d in self.dependencies[table]), default=-1)
+        levels: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for table in self._order:
+            levels[depth[table]].append(table)
+        return levels
+
+    def descendants(self, tables: Iterable[str]) -> Set[str]:
+        """All tables that (transitively) depend on any of the given tables"""
+        seen: Set[str] = set()
+        stack = list(tables)
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def ancestors(self, tables: Iterable[str]) -> Set[str]:
+        """All tables the given tables (transitively) depend on"""
+        seen: Set[str] = set()
+        stack = list(tables)
+        while stack:
+            for dep in self.dependencies.get(stack.pop(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def bottom_levels(self, costs: Dict[str, float]) -> Dict[str, float]:
+        """Cost of the longest path from each table to the end of the DAG, including itself"""
+        remaining: Dict[str, float] = {}
+        for table in reversed(self._order):
+            remaining[table] = costs.get(table, 0.0) + max(
+                (remaining[d] for d in self.dependents[table]), default=0.0)
+        return remaining
+
+    def critical_path(self, costs: Dict[str, float]) -> Tuple[List[str], float]:
+        """Return the most expensive dependency chain and its total cost"""
+        if not self._order:
+            return [], 0.0
+        remaining = self.bottom_levels(costs)
+        roots = [t for t in self._order if not self.dependencies[t]]
+        current: Optional[str] = max(roots, key=lambda t: remaining[t])
+        path = []
+        while current is not None:
+            path.append(current)
+            current = max(self.dependents[current], key=lambda t: remaining[t], default=None)
+        return path, remaining[path[0]]
+
+    def _topological_order(self) -> List[str]:
+        remaining = {table: set(deps) for table, deps in self.dependencies.items()}
+        ordered: List[str] = []
+        while remaining:
+            ready = sorted(table for table, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+            for table in ready:
+                ordered.append(table)
+                del remaining[table]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return ordered
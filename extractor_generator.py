@@ -24,6 +24,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from schema_model import DEFAULT_SCHEMA_PATH, load_schema
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -67,10 +69,13 @@ This extractor follows the DataExtractor contract for the database population sy
 Modify the extract() method to implement your specific business logic.
 """
 
+import logging
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
 
+logger = logging.getLogger(__name__)
+
 
 class {class_name}(DataExtractor):
     """Extract data for {table_name} table"""
@@ -85,6 +90,12 @@ class {class_name}(DataExtractor):
         """Return list of table names this extractor depends on"""
         return {dependencies_list}
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        # TODO: List every column extract() reads; sources left out are loaded completely
+        return {source_columns}
+    
     def extract(self, {extract_parameters}) -> List[Dict[str, Any]]:
         """
         Extract data for {table_name} table.
@@ -93,83 +104,103 @@ class {class_name}(DataExtractor):
         
         Returns:
             List of dictionaries representing {table_name} table records
-            
+{schema_columns}
         TODO: Implement your extraction logic here
-        Example structure:
+        Work column-wise; avoid iterrows() and per-row dictionary lookups:
         ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {{
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }}
-            records.append(record)
-        return records
+        # Project onto the needed source columns and de-duplicate in one step
+        frame = self.distinct(some_dataframe, ['source_column_1', 'source_column_2'], **kwargs)
+        
+        # Resolve foreign keys with a single merge against the dependency records
+        keys = pd.DataFrame(dependency_records, columns=['DEP_NATURAL_KEY', 'DEP_ID'])
+        frame = frame.merge(keys, how='left', left_on='source_column_1', right_on='DEP_NATURAL_KEY')
+        
+        frame.insert(0, 'ID', range(1, len(frame) + 1))  # Auto-incrementing ID
+        frame = frame.rename(columns={{'source_column_2': 'COLUMN_2', 'DEP_ID': 'FK_DEPENDENCY'}})
+        return frame[['ID', 'COLUMN_2', 'FK_DEPENDENCY']].to_dict(orient='records')
         ```
+        
+        Measure rows/second with: python3 benchmarks/bench_extractors.py {table_name}
         """
         # TODO: Replace this placeholder with your extraction logic
         logger.warning(f"{{self.__class__.__name__}} is using placeholder implementation")
-        logger.info(f"Available parameters: {{list(kwargs.keys()) if 'kwargs' in locals() else 'None'}}")
         
         # Placeholder implementation - replace with actual logic
-        records = []
-        
-        # Example: If you have a DataFrame parameter, process it
         {extraction_example}
         
+        records = frame.to_dict(orient='records')
         logger.info(f"{{self.__class__.__name__}} extracted {{len(records)}} records")
         return records
 '''
     
     @staticmethod
     def generate_extraction_example(csv_inputs: List[str], dependencies: List[str]) -> str:
-        """Generate example extraction code based on CSV inputs and dependencies"""
+        """Generate vectorized example extraction code based on CSV inputs and dependencies"""
         examples = []
+        merge_dependencies = list(dependencies)
         
-        # CSV processing example
+        # CSV processing example: column projection and dedup instead of iterrows()
         if csv_inputs:
             primary_csv = csv_inputs[0]
             examples.append(f'''# Example using primary CSV: {primary_csv}
-        if '{primary_csv}' in locals():
-            df = {primary_csv}
-            for index, row in df.iterrows():
-                # TODO: Replace with actual column mappings
-                record = {{
-                    'ID': row.get('id', index),  # Replace 'id' with actual column
-                    'NAME': row.get('name', f'Record_{{index}}'),  # Replace with actual column
-                    # Add more columns based on your table schema
-                }}
-                records.append(record)''')
-        
-        # Dependency usage example
-        if dependencies:
-            dep_name = dependencies[0].lower()
-            table_name = dependencies[0]
-            # Fix: Properly escape braces and use string concatenation for complex template
-            lookup_example = f"{dep_name}_lookup = {{record['ID']: record for record in {dep_name}}}"
-            examples.append(f'''
+        # TODO: Replace with the source columns this table needs (declared in source_columns)
+        columns = self.source_columns['{primary_csv}']
+        frame = self.distinct({primary_csv}, columns, **kwargs).reset_index(drop=True)
+        frame.insert(0, 'ID', range(1, len(frame) + 1))  # Replace with the table's ID column''')
+        elif merge_dependencies:
+            base = merge_dependencies.pop(0)
+            examples.append(f'''# Example building on dependency data: {base}
+        frame = pd.DataFrame({base.lower()})''')
+        else:
+            examples.append('''# No CSV inputs or dependencies specified
+        # You'll need to implement extraction logic based on provided parameters
+        frame = pd.DataFrame()''')
         
+        # Dependency usage example: merge-based foreign key resolution
+        if merge_dependencies:
+            dep_name = merge_dependencies[0].lower()
+            table_name = merge_dependencies[0]
+            examples.append(f'''
         # Example using dependency data: {table_name}
-        if {dep_name}:
-            # Access dependency records for foreign key lookups
-            {lookup_example}
-            
-            # Example: Use dependency data in extraction logic
-            for index, row in some_dataframe.iterrows():
-                dependency_id = row.get('dependency_id')  # Replace with actual FK column
-                if dependency_id in {dep_name}_lookup:
-                    # Use dependency record data
-                    dep_record = {dep_name}_lookup[dependency_id]
-                    # TODO: Implement logic using dependency data
-                    pass''')
-        
-        if not examples:
-            examples.append('''# No CSV inputs or dependencies specified
-        # You'll need to implement extraction logic based on provided parameters''')
+        # Resolve the foreign key with one merge instead of a per-row lookup
+        {dep_name}_keys = pd.DataFrame({dep_name})
+        # TODO: Replace with the FK source column and the natural key / ID columns of {table_name}
+        fk_column, natural_key, dependency_id = 'dependency_key', 'NATURAL_KEY', 'ID'
+        if fk_column in frame.columns and {{natural_key, dependency_id}} <= set({dep_name}_keys.columns):
+            frame = frame.merge(
+                {dep_name}_keys[[natural_key, dependency_id]].rename(columns={{dependency_id: 'FK_{table_name}'}}),
+                how='left', left_on=fk_column, right_on=natural_key
+            ).drop(columns=natural_key)''')
         
         return "\n".join(examples)
     
+    @staticmethod
+    def generate_source_columns(csv_inputs: List[str]) -> str:
+        """Generate the source_columns declaration matching the extraction example"""
+        if not csv_inputs:
+            return "{}"
+        # The example projects the primary CSV onto these columns
+        return repr({csv_inputs[0]: ['source_column_1', 'source_column_2']})
+    
+    @staticmethod
+    def generate_schema_columns(table) -> str:
+        """Document the target columns of the table from the schema model (Table or None)"""
+        if table is None:
+            return "            "
+        primary_key = set(table.primary_key)
+        references = {column: f"{fk.to_table}.{ref}" for fk in table.foreign_keys
+                      for column, ref in zip(fk.columns, fk.ref_columns)}
+        lines = ["", "        Target columns (dbschema/schema.dbs):"]
+        for column in table.columns:
+            size = ''
+            if column.length is not None:
+                size = f"({column.length},{column.decimal})" if column.decimal is not None else f"({column.length})"
+            notes = (['PK'] if column.name in primary_key else []) \
+                + ([f"FK -> {references[column.name]}"] if column.name in references else []) \
+                + (['mandatory'] if column.mandatory else [])
+            lines.append(f"            {column.name}: {column.type}{size}" + (f" ({', '.join(notes)})" if notes else ""))
+        return "\n".join(lines) + "\n            "
+    
     @staticmethod
     def generate_extract_parameters(csv_inputs: List[str], dependencies: List[str]) -> str:
         """Generate method parameters based on CSV inputs and dependencies"""
@@ -377,9 +408,11 @@ class ExtractorGenerator:
     Implements Facade Pattern for complex generation operations.
     """
     
-    def __init__(self, extractors_folder: str = "extractors"):
+    def __init__(self, extractors_folder: str = "extractors",
+                 schema_path: Optional[str] = DEFAULT_SCHEMA_PATH):
         self.extractors_folder = Path(extractors_folder)
         self.template = ExtractorTemplate()
+        self.schema = load_schema(schema_path) if schema_path and Path(schema_path).exists() else None
         
         # Ensure extractors folder exists
         self.extractors_folder.mkdir(exist_ok=True)
@@ -429,6 +462,7 @@ class ExtractorGenerator:
             csv_inputs=', '.join(definition.csv_inputs) or 'None',
             dependencies=', '.join(definition.dependencies) or 'None',
             dependencies_list=repr(definition.dependencies),
+            source_columns=self.template.generate_source_columns(definition.csv_inputs),
             extract_parameters=self.template.generate_extract_parameters(
                 definition.csv_inputs, definition.dependencies
             ),
@@ -437,11 +471,22 @@ class ExtractorGenerator:
             ),
             extraction_example=self.template.generate_extraction_example(
                 definition.csv_inputs, definition.dependencies
-            )
+            ),
+            schema_columns=self.template.generate_schema_columns(self._schema_table(definition.table_name))
         )
         
         return content
     
+    def _schema_table(self, table_name: str):
+        """The table's schema definition, None (with a warning) if the schema does not define it"""
+        if self.schema is None:
+            return None
+        if table_name not in self.schema:
+            logger.warning(f"{table_name} is not defined in the schema; known tables: "
+                           f"{', '.join(self.schema.table_names)}")
+            return None
+        return self.schema.table(table_name)
+    
     def _write_file_atomic(self, target_path: Path, content: str, backup: bool = False) -> bool:
         """Write file atomically with optional backup"""
         try:
@@ -466,7 +511,7 @@ class ExtractorGenerator:
             # Atomic move
             shutil.move(tmp_path, target_path)
             
-            logger.info(f"✓ Generated extractor: {target_path}")
+            logger.info(f"✓ Generated {target_path}")
             return True
             
         except Exception as e:
@@ -535,6 +580,7 @@ class ExtractorGeneratorCLI:
                     print(f"   1. Edit the extract() method in {definition.file_name}")
                     print(f"   2. Implement your data transformation logic")
                     print(f"   3. Test with: python3 simple_db_populator.py")
+                    print(f"   4. Measure rows/second with: python3 benchmarks/bench_extractors.py {definition.table_name}")
                 return 0
             else:
                 print("\n❌ Generation failed!")
@@ -566,6 +612,7 @@ Examples:
   
   # Overwrite existing
   python3 extractor_generator.py PROFESSOR --overwrite
+
             """
         )
         
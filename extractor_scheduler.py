@@ -0,0 +1,81 @@
+"""
+Critical-path-aware scheduling of extractors.
+
+A plain topological scheduler may start cheap leaf tables first and leave a
+long chain (e.g. OFFERING -> COURSE -> DEPUTAT_ACCOUNT) to run alone at the
+end. CriticalPathScheduler ranks ready extractors by their bottom level: the
+estimated cost of the longest path from the extractor to the end of the DAG,
+weighted by the persisted per-extractor timings scaled to the current input
+sizes. Expensive chains therefore start as early as possible.
+"""
+
+import heapq
+import logging
+from typing import Dict, List, Set
+
+from extractor_dag import ExtractorGraph
+
+logger = logging.getLogger(__name__)
+
+
+class CriticalPathScheduler:
+    """
+    Hands out ready extractors in order of their remaining critical path.
+
+    Not thread-safe: the populator's coordinating thread owns the scheduler
+    and only the extractor calls themselves run on worker threads.
+    """
+
+    def __init__(self, graph: ExtractorGraph, costs: Dict[str, float]):
+        self.graph = graph
+        self.priority = graph.bottom_levels(costs)
+        self._waiting: Dict[str, Set[str]] = {t: set(d) for t, d in graph.dependencies.items()}
+        self._ready: List = []
+        self._running: Set[str] = set()
+        self.skipped: List[str] = []
+        self._release([t for t, deps in self._waiting.items() if not deps])
+
+    def has_ready(self) -> bool:
+        return bool(self._ready)
+
+    @property
+    def ready_count(self) -> int:
+        return len(self._ready)
+
+    def finished(self) -> bool:
+        return not self._ready and not self._running and not self._waiting
+
+    def pop(self) -> str:
+        """Take the ready extractor with the longest remaining path"""
+        _, table = heapq.heappop(self._ready)
+        self._running.add(table)
+        return table
+
+    def complete(self, table: str) -> List[str]:
+        """Mark table as done and return the extractors that became ready"""
+        self._running.discard(table)
+        newly_ready = []
+        for dependent in self.graph.dependents[table]:
+            deps = self._waiting.get(dependent)
+            if deps is None:
+                continue
+            deps.discard(table)
+            if not deps:
+                newly_ready.append(dependent)
+        self._release(newly_ready)
+        return newly_ready
+
+    def fail(self, table: str) -> List[str]:
+        """Mark table as failed; all its descendants are skipped and returned"""
+        self._running.discard(table)
+        skipped = sorted(d for d in self.graph.descendants([table]) if d in self._waiting)
+        for dependent in skipped:
+            del self._waiting[dependent]
+        self.skipped.extend(skipped)
+        return skipped
+
+    def _release(self, tables: List[str]) -> None:
+        for table in tables:
+            del self._waiting[table]
+            # heapq is a min-heap: negate the priority, ties broken by name
+            heapq.heappush(self._ready, (-self.priority.get(table, 0.0), table))
@@ -0,0 +1,261 @@
+"""
+What-if simulator for reassigning OFFERING_ASSIGNMENT rows to other teachers.
+
+Department heads try out reassignments and want to see each teacher's load
+and deputat balance immediately; repopulating the database per edit is far
+too slow. The simulator takes the extracted TEACHER, SEMESTER_PLANNING,
+COURSE, OFFERING, OFFERING_ASSIGNMENT and POSITION_PROFESSOR records once,
+computes the starting balances with the DeputatBalanceEngine and then keeps
+everything in indexed form:
+
+- per teacher, one array over the chronological term axis with the assigned
+  hours (OA_ASSIGNED_HOURS) and one with the credited hours (COURSE hours
+  plus POSITION_PROFESSOR reductions, as in DEPUTAT_ACCOUNT)
+- the COURSE rows per (offering, teacher) and the assignments per
+  (offering, teacher)
+
+Reassigning an assignment moves its hours between two cells of the load
+arrays and, when it was the previous teacher's last assignment of the
+offering, moves that teacher's COURSE rows of the offering along. Within
+one step this is decided on the state before the step, so swapping two
+teachers' assignments swaps their courses whatever the order. The cost
+is proportional to the changed rows; balances of a teacher are a cumulative
+sum over the terms, computed when asked for.
+
+Every apply() is one step on an undo journal: undo() reverts the last step
+by replaying it backwards, checkpoint()/rollback() return to an earlier
+scenario.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Set
+from columnar import as_columnar
+from deputat_balance import DeputatBalanceEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AssignmentChange:
+    """One reassigned OFFERING_ASSIGNMENT row and the COURSE rows moved with it"""
+    oa_id: int
+    old_teacher: int
+    new_teacher: int
+    course_rows: List[int] = field(default_factory=list)
+
+
+@dataclass
+class SimulationStep:
+    """The changes applied by one apply() call"""
+    label: str
+    changes: List[AssignmentChange]
+
+
+class AssignmentSimulator:
+    """Incrementally maintained teacher loads and deputat balances under reassignments"""
+
+    def __init__(self, teacher: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]],
+                 course: List[Dict[str, Any]], offering: List[Dict[str, Any]],
+                 offering_assignment: List[Dict[str, Any]], position_professor: List[Dict[str, Any]],
+                 baseline_hours: Optional[Dict[bool, float]] = None):
+        engine = DeputatBalanceEngine(teacher, semester_planning, baseline_hours=baseline_hours)
+        balances = engine.load(course, position_professor)
+
+        self.term_ids = list(engine.term_ids)
+        self._term_position = {sp_id: pos for pos, sp_id in enumerate(self.term_ids)}
+        self.calendar = engine.calendar
+        teachers = as_columnar(teacher)
+        self._baseline = {
+            t_id: engine.baseline_hours[bool(is_professor)]
+            for t_id, is_professor in zip(teachers.column('T_ID').tolist(),
+                                          teachers.to_frame(['T_ISPROFESSOR'])['T_ISPROFESSOR'].tolist())
+        }
+        self._default_baseline = engine.baseline_hours[False]
+
+        # Credited hours per teacher and term position, seeded from the engine's balances
+        self._credited: Dict[int, np.ndarray] = {}
+        for t_id, sp_id, credit in zip(balances['T_ID'].tolist(), balances['SP_ID'].tolist(),
+                                       balances['ACC_CREDIT_HOURS'].tolist()):
+            self._row(self._credited, t_id)[self._term_position[sp_id]] = credit
+        self._assigned: Dict[int, np.ndarray] = {}
+
+        self._index_courses(course)
+        self._index_assignments(offering, offering_assignment)
+
+        self._journal: List[SimulationStep] = []
+        self.touched: Set[Tuple[int, int]] = set()
+
+    # Scenario editing
+
+    def reassign(self, oa_id: int, teacher: int) -> SimulationStep:
+        """Give one assignment to another teacher (one undoable step)"""
+        return self.apply({oa_id: teacher}, label=f"OA {oa_id} -> T {teacher}")
+
+    def apply(self, reassignments: Dict[int, int], label: str = '') -> SimulationStep:
+        """
+        Apply several reassignments OA_ID -> teacher as one undoable step.
+
+        Raises:
+            KeyError: If an assignment or teacher is unknown
+        """
+        for oa_id, teacher in reassignments.items():
+            if oa_id not in self._assignments:
+                raise KeyError(f"Unknown OFFERING_ASSIGNMENT {oa_id}")
+            if teacher not in self._baseline:
+                raise KeyError(f"Unknown TEACHER {teacher}")
+
+        moves = {oa_id: teacher for oa_id, teacher in reassignments.items()
+                 if self._assignments[oa_id]['FK_TEACHER'] != teacher}
+        # A teacher's COURSE rows of an offering go along with the last of their assignments
+        # of it that leaves. Decided on the state before the step, so that swaps within one
+        # step do not depend on the order of the reassignments.
+        leaving: Dict[Tuple[Any, Any], List[int]] = defaultdict(list)
+        for oa_id in sorted(moves):
+            assignment = self._assignments[oa_id]
+            leaving[(assignment['FK_OFFERING'], assignment['FK_TEACHER'])].append(oa_id)
+        course_rows = {
+            oa_ids[-1]: sorted(self._courses_by_key.get(key, ()))
+            for key, oa_ids in leaving.items() if self._assignment_count[key] == len(oa_ids)
+        }
+
+        changes = []
+        for oa_id, teacher in moves.items():
+            change = AssignmentChange(oa_id, self._assignments[oa_id]['FK_TEACHER'], teacher,
+                                      course_rows.get(oa_id, []))
+            self._move(change.oa_id, change.old_teacher, change.new_teacher, change.course_rows)
+            changes.append(change)
+
+        step = SimulationStep(label or f"{len(changes)} reassignments", changes)
+        self._journal.append(step)
+        return step
+
+    def undo(self) -> Optional[SimulationStep]:
+        """Revert the last step; returns it, or None if there is nothing to undo"""
+        if not self._journal:
+            return None
+        step = self._journal.pop()
+        for change in reversed(step.changes):
+            self._move(change.oa_id, change.new_teacher, change.old_teacher, change.course_rows)
+        return step
+
+    def checkpoint(self) -> int:
+        """Marker of the current scenario for rollback()"""
+        return len(self._journal)
+
+    def rollback(self, checkpoint: int = 0) -> None:
+        """Undo every step after checkpoint (default: back to the extracted state)"""
+        while len(self._journal) > checkpoint:
+            self.undo()
+
+    @property
+    def steps(self) -> List[SimulationStep]:
+        return list(self._journal)
+
+    # Queries
+
+    def teacher_load(self, teacher: int) -> pd.DataFrame:
+        """Assigned and credited hours of a teacher per term"""
+        return pd.DataFrame({
+            'SP_ID': self.term_ids,
+            'ASSIGNED_HOURS': self._assigned.get(teacher, np.zeros(len(self.term_ids))),
+            'CREDITED_HOURS': self._credited.get(teacher, np.zeros(len(self.term_ids))),
+        })
+
+    def teacher_balances(self, teacher: int) -> pd.DataFrame:
+        """DEPUTAT_ACCOUNT columns of one teacher over all terms"""
+        credit = self._credited.get(teacher, np.zeros(len(self.term_ids)))
+        baseline = np.full(len(self.term_ids), self._baseline.get(teacher, self._default_baseline))
+        delta = credit - baseline
+        balance = np.cumsum(delta)
+        return pd.DataFrame({
+            'T_ID': teacher,
+            'SP_ID': self.term_ids,
+            'ACC_BASELINE_HOURS': baseline,
+            'ACC_CREDIT_HOURS': credit,
+            'ACC_DEBIT_HOURS': baseline,
+            'ACC_BALANCE': balance,
+            'ACC_CARRYOVER': balance - delta,
+        })
+
+    def balances(self, teachers: Optional[List[int]] = None) -> pd.DataFrame:
+        """Balances of the given teachers (default: all with credited hours)"""
+        teachers = sorted(self._credited) if teachers is None else teachers
+        if not teachers:
+            return pd.DataFrame(columns=DeputatBalanceEngine._balance_columns())
+        return pd.concat([self.teacher_balances(t) for t in teachers], ignore_index=True)
+
+    def affected_teachers(self) -> List[int]:
+        """Teachers whose load was touched by any step since the simulator was built"""
+        return sorted({teacher for teacher, _ in self.touched})
+
+    def assignments(self) -> List[Dict[str, Any]]:
+        """The OFFERING_ASSIGNMENT records of the current scenario"""
+        return [dict(record) for record in self._assignments.values()]
+
+    # Internals
+
+    def _index_courses(self, course: List[Dict[str, Any]]) -> None:
+        courses = as_columnar(course).to_frame(['C_TEACHER', 'C_SEMESTER', 'C_CREDITED_HOURS', 'FK_OFFERING'])
+        hours = pd.to_numeric(courses['C_CREDITED_HOURS'], errors='coerce').fillna(0.0)
+        positions = self.calendar.map_positions(self.calendar.map_ids(courses['C_SEMESTER']))
+        # Rows the balance engine ignores (no teacher or term) are never moved
+        valid = courses['C_TEACHER'].notna() & positions.notna()
+
+        self._course_teacher = courses['C_TEACHER'].tolist()
+        self._course_hours = hours.tolist()
+        self._course_position = positions.tolist()
+        self._courses_by_key: Dict[Tuple[Any, Any], Set[int]] = defaultdict(set)
+        for row in np.flatnonzero(valid.to_numpy()).tolist():
+            self._courses_by_key[(courses['FK_OFFERING'].iat[row], self._course_teacher[row])].add(row)
+
+    def _index_assignments(self, offering: List[Dict[str, Any]],
+                           offering_assignment: List[Dict[str, Any]]) -> None:
+        offering_term = as_columnar(offering).mapping('O_ID', 'FK_SEMESTER_PLANNING')
+        self._assignments: Dict[int, Dict[str, Any]] = {}
+        self._assignment_position: Dict[int, Optional[int]] = {}
+        self._assignment_hours: Dict[int, float] = {}
+        self._assignment_count: Counter = Counter()
+        for record in offering_assignment:
+            oa_id = record['OA_ID']
+            self._assignments[oa_id] = dict(record)
+            position = self._term_position.get(offering_term.get(record['FK_OFFERING']))
+            hours = pd.to_numeric(record.get('OA_ASSIGNED_HOURS'), errors='coerce')
+            self._assignment_position[oa_id] = position
+            self._assignment_hours[oa_id] = 0.0 if pd.isna(hours) else float(hours)
+            self._assignment_count[(record['FK_OFFERING'], record['FK_TEACHER'])] += 1
+            if position is not None:
+                self._row(self._assigned, record['FK_TEACHER'])[position] += self._assignment_hours[oa_id]
+
+    def _move(self, oa_id: int, old_teacher: int, new_teacher: int, course_rows: List[int]) -> None:
+        """Move an assignment and the given COURSE rows from old_teacher to new_teacher"""
+        assignment = self._assignments[oa_id]
+        offering = assignment['FK_OFFERING']
+        position = self._assignment_position[oa_id]
+        if position is not None:
+            hours = self._assignment_hours[oa_id]
+            self._row(self._assigned, old_teacher)[position] -= hours
+            self._row(self._assigned, new_teacher)[position] += hours
+            self.touched.update({(old_teacher, position), (new_teacher, position)})
+        assignment['FK_TEACHER'] = new_teacher
+        self._assignment_count[(offering, old_teacher)] -= 1
+        self._assignment_count[(offering, new_teacher)] += 1
+
+        for row in course_rows:
+            position = int(self._course_position[row])
+            hours = self._course_hours[row]
+            self._row(self._credited, old_teacher)[position] -= hours
+            self._row(self._credited, new_teacher)[position] += hours
+            self._courses_by_key[(offering, old_teacher)].discard(row)
+            self._courses_by_key[(offering, new_teacher)].add(row)
+            self._course_teacher[row] = new_teacher
+            self.touched.update({(old_teacher, position), (new_teacher, position)})
+
+    def _row(self, table: Dict[int, np.ndarray], teacher: int) -> np.ndarray:
+        row = table.get(teacher)
+        if row is None:
+            row = table[teacher] = np.zeros(len(self.term_ids))
+        return row
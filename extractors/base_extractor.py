@@ -7,7 +7,7 @@ create a clean separation of concerns.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class DataExtractor(ABC):
     """Base class for table data extractors"""
@@ -43,3 +43,41 @@ class DataExtractor(ABC):
             List of table names (empty list if no dependencies)
         """
         return []
+    
+    @property
+    def source_columns(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Return the CSV columns this extractor reads, per source.
+        
+        The loader parses only the union of the columns declared by the
+        scheduled extractors. A source the extractor takes as a parameter
+        but does not list here is loaded completely; an empty list means the
+        source is not read at all. Columns missing from the declaration are
+        still loaded on first access, only slower.
+        
+        Returns:
+            Dictionary of source name -> column names, or None to load
+            every column of the sources in the extract() signature
+        """
+        return None
+    
+    def distinct(self, frame, columns: List[str], **kwargs):
+        """
+        Return the de-duplicated projection of frame onto columns.
+        
+        When the extraction system passes a shared ProjectionCache as
+        projection_cache, the projection is served from the cache and each
+        distinct projection is computed only once per run.
+        
+        Args:
+            frame: Source DataFrame (e.g. OfferedCourses)
+            columns: Column names to project on
+            **kwargs: Extraction kwargs, may contain projection_cache
+            
+        Returns:
+            DataFrame with the unique rows of the projection
+        """
+        cache = kwargs.get('projection_cache')
+        if cache is not None:
+            return cache.distinct(frame, columns)
+        return frame[list(columns)].drop_duplicates()
@@ -0,0 +1,186 @@
+"""
+Columnar, read-only container for extractor outputs.
+
+Dependency outputs used to reach every consumer as a list of record dicts,
+which each consumer turned back into sets, dicts or Series. A ColumnarTable
+stores an output once as one NumPy array per column: columns of only
+ints, only floats or only bools as native arrays, everything else
+(strings, mixed values, columns with missing values) as object arrays, so
+the dict rows give back exactly the values the extractor produced. All
+arrays are marked read-only, so one table is safely shared by all
+concurrent consumers and column access hands out views instead of copies.
+
+Legacy extractors keep working unchanged: iterating, indexing and len()
+behave like the record list, yielding rows with Python scalars. The rows are
+materialized on first use and then cached; since all consumers share them,
+they are read-only mappings (copy with dict(row) to modify one).
+
+An empty table built from an empty record list cannot know its columns, so
+on an empty table every column name resolves to an empty column.
+
+Columns are NumPy arrays, so the table converts to Arrow with
+pyarrow.table(table.arrays()) where pyarrow is installed.
+"""
+
+import sys
+import threading
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Mapping, Sequence, Union
+
+
+class ColumnarTable(Sequence):
+    """Immutable table of equally long, read-only NumPy columns"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], length: Optional[int] = None):
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            array = np.asarray(values)
+            array.flags.writeable = False
+            self._columns[name] = array
+        lengths = {len(array) for array in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of different lengths: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else (length or 0)
+        self._rows: Optional[List[Mapping[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ColumnarTable':
+        """Build a table from record dicts; keys missing in a record become None"""
+        if isinstance(records, ColumnarTable):
+            return records
+        records = list(records)
+        names: Dict[str, None] = {}
+        for record in records:
+            for key in record:
+                names.setdefault(key, None)
+        return cls({name: _to_array([record.get(name) for record in records]) for name in names},
+                   length=len(records))
+
+    # Columnar access
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only view of a column (an empty column for any name on an empty table).
+
+        Raises:
+            KeyError: If a non-empty table has no such column
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            if self._length == 0:
+                return _EMPTY_COLUMN
+            raise KeyError(f"No column {name}; columns: {', '.join(self._columns)}") from None
+
+    def series(self, name: str) -> pd.Series:
+        """A column as Series sharing the column's memory"""
+        return pd.Series(self.column(name), name=name, copy=False)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        DataFrame of the given columns (default: all).
+
+        Like pd.DataFrame(records, columns=...), unknown columns are all-missing.
+        """
+        columns = self.columns if columns is None else list(columns)
+        data = {name: self._columns[name] if name in self._columns
+                else np.full(self._length, None, dtype=object) for name in columns}
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+    def mapping(self, key: str, value: str) -> Dict[Any, Any]:
+        """Dictionary key column -> value column (later rows win, as in a dict comprehension)"""
+        return dict(zip(self.column(key).tolist(), self.column(value).tolist()))
+
+    def unique(self, name: str) -> set:
+        return set(self.column(name).tolist())
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns (object columns count their elements)"""
+        total = 0
+        for array in self._columns.values():
+            total += array.nbytes
+            if array.dtype == object and len(array):
+                # Estimate the referenced objects from a sample of about 100 values
+                sample = array[::max(len(array) // 100, 1)]
+                total += sum(sys.getsizeof(value) for value in sample) * len(array) // len(sample)
+        return total
+
+    # Record list compatibility
+
+    def to_records(self) -> List[Mapping[str, Any]]:
+        """The rows as read-only mappings of Python scalars (cached, shared by all callers)"""
+        rows = self._rows
+        if rows is None:
+            with self._lock:
+                if self._rows is None:
+                    names = self.columns
+                    values = [array.tolist() for array in self._columns.values()]
+                    self._rows = [MappingProxyType(dict(zip(names, row))) for row in zip(*values)] if names \
+                        else [MappingProxyType({}) for _ in range(self._length)]
+                rows = self._rows
+        return rows
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.to_records())
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self.to_records()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ColumnarTable):
+            other = other.to_records()
+        return isinstance(other, list) and self.to_records() == other
+
+    def __getstate__(self):
+        # Only the columns are pickled; dict rows and the lock are rebuilt on demand
+        return {'columns': self._columns, 'length': self._length}
+
+    def __setstate__(self, state):
+        self.__init__(state['columns'], state['length'])
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable({self._length} rows, columns={self.columns})"
+
+
+def as_columnar(records: Union[ColumnarTable, Iterable[Dict[str, Any]]]) -> ColumnarTable:
+    """Return records as ColumnarTable, converting record lists (e.g. in benchmarks)"""
+    return ColumnarTable.from_records(records)
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    """Native array for uniformly bool/int/float columns, object array otherwise"""
+    kinds = {type(value) for value in values}
+    if kinds == {bool}:
+        return np.array(values, dtype=bool)
+    if kinds == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            return _object_array(values)
+    if kinds == {float}:
+        return np.array(values, dtype=np.float64)
+    return _object_array(values)
+
+
+_EMPTY_COLUMN = np.empty(0, dtype=object)
+_EMPTY_COLUMN.flags.writeable = False
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
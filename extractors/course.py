@@ -4,7 +4,7 @@ CourseExtractor - Data extractor for COURSE table
 
 Generated on: 2025-12-11 14:55:10
 CSV Inputs: OfferedCourses
-Dependencies: OFFERING, TEACHER, SUBJECT
+Dependencies: OFFERING, TEACHER, SUBJECT, SEMESTER_PLANNING
 
 This extractor follows the DataExtractor contract for the database population system.
 Modify the extract() method to implement your specific business logic.
@@ -13,6 +13,8 @@ Modify the extract() method to implement your specific business logic.
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from columnar import as_columnar
+from term_calendar import TermCalendar
 
 
 class CourseExtractor(DataExtractor):
@@ -26,9 +28,14 @@ class CourseExtractor(DataExtractor):
     @property
     def dependencies(self) -> List[str]:
         """Return list of table names this extractor depends on"""
-        return ['OFFERING', 'TEACHER', 'SUBJECT']
+        return ['OFFERING', 'TEACHER', 'SUBJECT', 'SEMESTER_PLANNING']
     
-    def extract(self, OfferedCourses: pd.DataFrame, offering: List[Dict[str, Any]], teacher: List[Dict[str, Any]], subject: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['lecNo', 'sbjNo', 'assNotes', 'term', 'cntCurr', 'cntLec', 'cntSchd']}
+    
+    def extract(self, OfferedCourses: pd.DataFrame, offering: List[Dict[str, Any]], teacher: List[Dict[str, Any]], subject: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for COURSE table.
         
@@ -39,6 +46,7 @@ class CourseExtractor(DataExtractor):
             offering: List of OFFERING table records from dependency resolution
             teacher: List of TEACHER table records from dependency resolution
             subject: List of SUBJECT table records from dependency resolution
+            semester_planning: List of SEMESTER_PLANNING table records from dependency resolution
         Additional:
             **kwargs: Additional parameters passed by the extraction system
         
@@ -61,14 +69,17 @@ class CourseExtractor(DataExtractor):
         """
 
         # Get relevant columns and remove duplicates
-        coursesDF = OfferedCourses[[
+        coursesDF = self.distinct(OfferedCourses, [
             'lecNo', 'sbjNo', 'assNotes', 'term', 'cntCurr', 'cntLec', 'cntSchd'
-        ]].drop_duplicates()
+        ], **kwargs)
 
         # Create lookup sets for validation (same as original)
-        valid_teacher_ids = {t['T_ID'] for t in teacher}
-        valid_subject_nrs = {s['S_NR'] for s in subject}
-        valid_offering_ids = {o['OA_ID'] for o in offering}
+        valid_teacher_ids = as_columnar(teacher).unique('T_ID')
+        valid_subject_nrs = as_columnar(subject).unique('S_NR')
+
+        # Offerings are identified by (subject number, term)
+        offering_ids = {(o['FK_SUBJECT'], o['FK_SEMESTER_PLANNING']): o['O_ID'] for o in offering}
+        coursesDF['SP_ID'] = TermCalendar.from_records(semester_planning).map_ids(coursesDF['term'])
         
         def safe_numeric(value):
             """Convert numeric strings with comma decimal separator to float"""
@@ -84,12 +95,12 @@ class CourseExtractor(DataExtractor):
         courses = []
         for index, row in coursesDF.iterrows():
             # Skip rows with missing required data
-            if pd.isna(row['lecNo']) or pd.isna(row['sbjNo']) or pd.isna(row['oa_id']):
+            if pd.isna(row['lecNo']) or pd.isna(row['sbjNo']) or pd.isna(row['SP_ID']):
                 continue
             
-            teacher_id = int(row['lecNo'])
+            teacher_id = int(float(row['lecNo']))
             subject_nr = str(row['sbjNo'])
-            offering_id = int(row['oa_id']) 
+            offering_id = offering_ids.get((subject_nr, int(row['SP_ID'])))
             
             # Validate foreign keys (same as original logic)
             if teacher_id not in valid_teacher_ids:
@@ -98,7 +109,7 @@ class CourseExtractor(DataExtractor):
             if subject_nr not in valid_subject_nrs:
                 continue  # Skip courses with invalid subject
 
-            if offering_id not in valid_offering_ids:
+            if offering_id is None:
                 continue  # Skip courses with invalid offering
             
             course = {
@@ -110,7 +121,7 @@ class CourseExtractor(DataExtractor):
                 'C_CREDITED_HOURS': safe_numeric(row['cntLec']),
                 'C_TEACHER_COMMENT': str(row['assNotes']) if not pd.isna(row['assNotes']) else None,
                 'C_SEMESTER': str(row['term']) if not pd.isna(row['term']) else None,
-                'FK_OFFERING': offering_id  # Foreign key to OFFERING.OA_ID
+                'FK_OFFERING': offering_id  # Foreign key to OFFERING.O_ID
             }
             courses.append(course)
         
@@ -28,6 +28,11 @@ class DepartmentExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return []
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['srvProvider', 'srvClient', 'lecDept'], 'WorkLoad': []}
+    
     def extract(self, OfferedCourses: pd.DataFrame, WorkLoad: pd.DataFrame, **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for DEPARTMENT table.
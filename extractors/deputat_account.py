@@ -4,20 +4,30 @@ DeputatAccountExtractor - Data extractor for DEPUTAT_ACCOUNT table
 
 Generated on: 2025-12-11 14:55:09
 CSV Inputs: None
-Dependencies: TEACHER, SEMESTER_PLANNING
+Dependencies: TEACHER, SEMESTER_PLANNING, COURSE, POSITION_PROFESSOR
 
 This extractor follows the DataExtractor contract for the database population system.
 Modify the extract() method to implement your specific business logic.
 """
 
 import pandas as pd
+import logging
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from deputat_balance import DeputatBalanceEngine
+
+logger = logging.getLogger(__name__)
 
 
 class DeputatAccountExtractor(DataExtractor):
     """Extract data for DEPUTAT_ACCOUNT table"""
     
+    def __init__(self):
+        # Kept after extract() so single-term changes can be applied incrementally
+        self.engine = None
+        # Teachers, terms and baseline hours the engine was built from
+        self._basis = None
+    
     @property
     def table_name(self) -> str:
         """Return the database table name this extractor targets"""
@@ -26,9 +36,14 @@ class DeputatAccountExtractor(DataExtractor):
     @property
     def dependencies(self) -> List[str]:
         """Return list of table names this extractor depends on"""
-        return ['TEACHER', 'SEMESTER_PLANNING']
+        return ['TEACHER', 'SEMESTER_PLANNING', 'COURSE', 'POSITION_PROFESSOR']
     
-    def extract(self, teacher: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {}
+    
+    def extract(self, teacher: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], course: List[Dict[str, Any]], position_professor: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for DEPUTAT_ACCOUNT table.
         
@@ -36,49 +51,55 @@ class DeputatAccountExtractor(DataExtractor):
         Dependencies:
             teacher: List of TEACHER table records from dependency resolution
             semester_planning: List of SEMESTER_PLANNING table records from dependency resolution
+            course: List of COURSE table records (C_CREDITED_HOURS per teacher and term)
+            position_professor: List of POSITION_PROFESSOR table records (reductions per term)
         Additional:
             **kwargs: Additional parameters passed by the extraction system
+                baseline_hours: Optional teaching obligation by T_ISPROFESSOR
+                changed_terms: Term codes whose COURSE/POSITION_PROFESSOR rows
+                    changed since the previous call (watch mode); when teachers,
+                    terms and baseline hours are unchanged, only these terms are
+                    updated through update_term() instead of reloading the history
         
         Returns:
             List of dictionaries representing DEPUTAT_ACCOUNT table records
-            
-        TODO: Implement your extraction logic here
-        Example structure:
-        ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }
-            records.append(record)
-        return records
-        ```
         """
-        # TODO: Replace this placeholder with your extraction logic
-        logger.warning(f"{self.__class__.__name__} is using placeholder implementation")
-        logger.info(f"Available parameters: {list(kwargs.keys()) if 'kwargs' in locals() else 'None'}")
-        
-        # Placeholder implementation - replace with actual logic
-        records = []
-        
-        # Example: If you have a DataFrame parameter, process it
-        
-        
-        # Example using dependency data: TEACHER
-        if teacher:
-            # Access dependency records for foreign key lookups
-            teacher_lookup = {record['ID']: record for record in teacher}
-            
-            # Example: Use dependency data in extraction logic
-            for index, row in some_dataframe.iterrows():
-                dependency_id = row.get('dependency_id')  # Replace with actual FK column
-                if dependency_id in teacher_lookup:
-                    # Use dependency record data
-                    dep_record = teacher_lookup[dependency_id]
-                    # TODO: Implement logic using dependency data
-                    pass
+        basis = (teacher, semester_planning, kwargs.get('baseline_hours'))
+        changed_terms = kwargs.get('changed_terms')
+        if changed_terms and self._same_basis(basis) and all(t in self.engine.calendar for t in changed_terms):
+            for term in changed_terms:
+                self.update_term(term, course, position_professor=position_professor)
+        else:
+            self.engine = DeputatBalanceEngine(
+                teacher, semester_planning, baseline_hours=kwargs.get('baseline_hours')
+            )
+            self.engine.load(course, position_professor)
+        self._basis = basis
         
+        records = self.engine.to_records()
         logger.info(f"{self.__class__.__name__} extracted {len(records)} records")
         return records
+    
+    def update_term(self, term: Any, course: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Apply changed COURSE records of a single term to the materialized balances.
+        
+        Args:
+            term: SP_ID or term code of the changed term
+            course: COURSE records; rows of other terms are ignored
+            **kwargs: position_professor records, if they changed too
+        
+        Returns:
+            List of dictionaries representing only the DEPUTAT_ACCOUNT records
+            that changed; all other records keep their stored values and IDs
+        """
+        if self.engine is None:
+            raise RuntimeError("extract() must run before update_term()")
+        changes = self.engine.update_term(term, course, kwargs.get('position_professor'))
+        return self.engine.to_records(changes)
+    
+    def _same_basis(self, basis) -> bool:
+        """True if the engine was built from the same teachers, terms and baseline hours"""
+        if self.engine is None or self._basis is None:
+            return False
+        return all(new is old or new == old for new, old in zip(basis, self._basis))
@@ -0,0 +1,255 @@
+"""
+Deputat balance engine for the DEPUTAT_ACCOUNT table.
+
+Computes, per teacher and SEMESTER_PLANNING term, the teaching obligation
+(baseline), the credited hours and the carry-over from the previous term.
+Credited hours are the sum of COURSE.C_CREDITED_HOURS plus the reductions
+granted through POSITION_PROFESSOR.CREDIT_HOURS.
+
+All aggregation happens in grouped, vectorized pandas operations. The engine
+keeps the aggregates and balances as dense teacher x term arrays between
+calls. Replacing the inputs of a single term re-aggregates only that term,
+writes the (teacher, term) cells whose hours changed and re-runs the
+cumulative sum from that term onwards for the affected teachers only; all
+other rows keep their stored balances.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+from columnar import as_columnar
+from term_calendar import TermCalendar
+
+logger = logging.getLogger(__name__)
+
+# Teaching obligation (SWS per semester) by T_ISPROFESSOR. Professors at
+# universities of applied sciences teach 18 SWS under the state teaching
+# load ordinances (Lehrverpflichtungsverordnung); lecturers teach by
+# contract and carry no standing obligation. Override with --baseline-hours.
+DEFAULT_BASELINE_HOURS = {True: 18.0, False: 0.0}
+
+
+class DeputatBalanceEngine:
+    """
+    Materialized deputat balances with incremental per-term maintenance.
+
+    The engine holds one row per teacher with course or reduction hours and
+    one column per chronologically ordered term. Balances are a per-teacher
+    cumulative sum over the terms of credited minus baseline hours.
+    """
+
+    def __init__(self, teacher: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]],
+                 baseline_hours: Optional[Dict[bool, float]] = None):
+        self.baseline_hours = dict(baseline_hours or DEFAULT_BASELINE_HOURS)
+
+        # Chronological term axis: SP_ID ordered by term key
+        self.calendar = TermCalendar.from_records(semester_planning)
+        self.term_ids = list(self.calendar.sp_ids)
+        self.term_name_to_id = self.calendar.id_mapping()
+
+        self._teacher_baseline = {
+            t['T_ID']: self.baseline_hours[bool(t.get('T_ISPROFESSOR'))] for t in teacher
+        }
+
+        # Teacher rows in load order (new teachers are appended), per-cell hours and balances
+        self._teachers: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self._course_hours = self._grid(0)
+        self._reduction_hours = self._grid(0)
+        self._balance = self._grid(0)
+        self._loaded = False
+
+    def load(self, course: List[Dict[str, Any]], position_professor: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Aggregate the complete history and compute all balances"""
+        hours = self._aggregate(course, position_professor)
+        self._teachers = sorted(hours['T_ID'].unique().tolist())
+        self._row_of = {t_id: row for row, t_id in enumerate(self._teachers)}
+        self._course_hours = self._grid(len(self._teachers))
+        self._reduction_hours = self._grid(len(self._teachers))
+        rows = hours['T_ID'].map(self._row_of).to_numpy(dtype='int64')
+        columns = self.calendar.map_positions(hours['SP_ID']).to_numpy(dtype='int64')
+        self._course_hours[rows, columns] = hours['COURSE_HOURS'].to_numpy()
+        self._reduction_hours[rows, columns] = hours['REDUCTION_HOURS'].to_numpy()
+        self._balance = self._grid(len(self._teachers))
+        self._propagate(np.arange(len(self._teachers)), start_position=0)
+        self._loaded = True
+        return self.balances()
+
+    def update_term(self, term: Any, course: List[Dict[str, Any]],
+                    position_professor: Optional[List[Dict[str, Any]]] = None) -> pd.DataFrame:
+        """
+        Replace the inputs of a single term and refresh the affected balances.
+
+        Only teachers whose hours in that term changed are touched: their
+        cells of the term are rewritten and their balances re-accumulated
+        from the term onwards.
+
+        Args:
+            term: SP_ID or term code (e.g. 'WS1516') of the changed term
+            course: COURSE records; rows of other terms are ignored
+            position_professor: POSITION_PROFESSOR records (rows of other
+                terms are ignored); None keeps the stored reductions of the term
+
+        Returns:
+            The balance rows that changed: the touched teachers from the
+            term onwards and all rows of teachers seen for the first time
+        """
+        if not self._loaded:
+            raise RuntimeError("load() must be called before update_term()")
+
+        sp_id = self.calendar.sp_id(term)
+        if sp_id is None:
+            raise ValueError(f"Unknown term: {term!r}")
+        position = self.calendar.position(sp_id)
+
+        fresh = self._aggregate(course, position_professor or [], only_term=sp_id)
+        known = len(self._teachers)
+        for t_id in fresh['T_ID'].tolist():
+            self._add_teacher(t_id)
+
+        # New values of the term column: teachers without fresh rows drop to zero
+        course_column = np.zeros(len(self._teachers))
+        rows = fresh['T_ID'].map(self._row_of).to_numpy(dtype='int64')
+        course_column[rows] = fresh['COURSE_HOURS'].to_numpy()
+        changed = course_column != self._course_hours[:, position]
+        self._course_hours[:, position] = course_column
+        if position_professor is not None:
+            reduction_column = np.zeros(len(self._teachers))
+            reduction_column[rows] = fresh['REDUCTION_HOURS'].to_numpy()
+            changed |= reduction_column != self._reduction_hours[:, position]
+            self._reduction_hours[:, position] = reduction_column
+
+        touched = np.flatnonzero(changed)
+        self._propagate(touched, start_position=position)
+        logger.info(f"Updated deputat balances of {len(touched)} teachers from term {sp_id} onwards")
+
+        # Teachers seen for the first time also gain their rows before the term
+        added = np.arange(known, len(self._teachers))
+        existing = touched[touched < known]
+        return pd.concat([self._frame(existing, start_position=position), self._frame(added, start_position=0)],
+                         ignore_index=True)
+
+    def balances(self) -> pd.DataFrame:
+        """Return the current balance frame ordered by teacher and term"""
+        return self._frame(np.arange(len(self._teachers)), start_position=0)
+
+    def to_records(self, changes: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """
+        Return the balances as DEPUTAT_ACCOUNT records.
+
+        ACC_ID numbers the (teacher, term) cells in teacher load order, so a
+        cell keeps its ID across update_term() calls.
+
+        Args:
+            changes: Rows returned by update_term() (default: all balances)
+        """
+        frame = self.balances() if changes is None else changes.copy()
+        rows = frame['T_ID'].map(self._row_of).to_numpy(dtype='int64')
+        positions = self.calendar.map_positions(frame['SP_ID']).to_numpy(dtype='int64')
+        frame.insert(0, 'ACC_ID', rows * len(self.term_ids) + positions + 1)
+        frame = frame.rename(columns={'T_ID': 'FK_TEACHER', 'SP_ID': 'FK_SEMESTER_PLANNING'})
+        hour_columns = ['ACC_BASELINE_HOURS', 'ACC_CREDIT_HOURS', 'ACC_DEBIT_HOURS',
+                        'ACC_BALANCE', 'ACC_CARRYOVER']
+        frame[hour_columns] = frame[hour_columns].round(2)
+        return frame[['ACC_ID', 'FK_TEACHER', 'FK_SEMESTER_PLANNING'] + hour_columns].to_dict(orient='records')
+
+    def _aggregate(self, course: List[Dict[str, Any]], position_professor: List[Dict[str, Any]],
+                   only_term: Optional[int] = None) -> pd.DataFrame:
+        """Group course and reduction hours by (teacher, term)"""
+        courses = as_columnar(course).to_frame(['C_TEACHER', 'C_SEMESTER', 'C_CREDITED_HOURS'])
+        courses['SP_ID'] = self.calendar.map_ids(courses['C_SEMESTER'])
+        course_hours = (
+            _int_keys(courses, ['C_TEACHER', 'SP_ID'])
+            .assign(C_CREDITED_HOURS=lambda df: pd.to_numeric(df['C_CREDITED_HOURS'], errors='coerce').fillna(0.0))
+            .groupby(['C_TEACHER', 'SP_ID'])['C_CREDITED_HOURS'].sum()
+            .rename_axis(['T_ID', 'SP_ID']).rename('COURSE_HOURS')
+        )
+
+        reductions = as_columnar(position_professor).to_frame(['P_ID', 'TERM', 'CREDIT_HOURS'])
+        reduction_hours = (
+            _int_keys(reductions, ['P_ID', 'TERM'])
+            .assign(CREDIT_HOURS=lambda df: pd.to_numeric(df['CREDIT_HOURS'], errors='coerce').fillna(0.0))
+            .groupby(['P_ID', 'TERM'])['CREDIT_HOURS'].sum()
+            .rename_axis(['T_ID', 'SP_ID']).rename('REDUCTION_HOURS')
+        )
+
+        hours = pd.concat([course_hours, reduction_hours], axis=1).fillna(0.0).reset_index()
+        hours = hours[hours['SP_ID'].isin(self.term_ids)]
+        if only_term is not None:
+            hours = hours[hours['SP_ID'] == only_term]
+        return hours.astype({'T_ID': 'int64', 'SP_ID': 'int64'})
+
+    def _add_teacher(self, t_id: int) -> None:
+        """Append a zero row for a teacher seen for the first time"""
+        if t_id in self._row_of:
+            return
+        self._row_of[t_id] = len(self._teachers)
+        self._teachers.append(t_id)
+        self._course_hours = np.vstack([self._course_hours, self._grid(1)])
+        self._reduction_hours = np.vstack([self._reduction_hours, self._grid(1)])
+        self._balance = np.vstack([self._balance, self._grid(1)])
+        if self.term_ids:
+            # Balances up to the changed term are the plain baseline debit
+            self._balance[-1] = np.cumsum(-np.full(len(self.term_ids), self._baseline(t_id)))
+
+    def _propagate(self, rows: np.ndarray, start_position: int) -> None:
+        """Re-accumulate the balances of the given teacher rows from start_position onwards"""
+        if not len(rows) or start_position >= len(self.term_ids):
+            return
+        delta = self._delta(rows)[:, start_position:]
+        carry_in = self._balance[rows, start_position - 1] if start_position > 0 else 0.0
+        self._balance[rows, start_position:] = np.cumsum(delta, axis=1) + np.reshape(carry_in, (-1, 1))
+
+    def _delta(self, rows: np.ndarray) -> np.ndarray:
+        credit = self._course_hours[rows] + self._reduction_hours[rows]
+        return credit - self._baselines(rows)[:, None]
+
+    def _baseline(self, t_id: int) -> float:
+        return self._teacher_baseline.get(t_id, self.baseline_hours[False])
+
+    def _baselines(self, rows: np.ndarray) -> np.ndarray:
+        return np.array([self._baseline(self._teachers[row]) for row in rows], dtype='float64')
+
+    def _frame(self, rows: np.ndarray, start_position: int) -> pd.DataFrame:
+        """Balance rows of the given teacher rows from start_position onwards"""
+        positions = np.arange(start_position, len(self.term_ids))
+        if not len(rows) or not len(positions):
+            return pd.DataFrame({column: pd.Series(dtype='int64' if column in ('T_ID', 'SP_ID') else 'float64')
+                                 for column in self._balance_columns()})
+        grid_rows = np.repeat(rows, len(positions))
+        grid_positions = np.tile(positions, len(rows))
+        credit = self._course_hours[grid_rows, grid_positions] + self._reduction_hours[grid_rows, grid_positions]
+        baseline = np.repeat(self._baselines(rows), len(positions))
+        balance = self._balance[grid_rows, grid_positions]
+        return pd.DataFrame({
+            'T_ID': np.asarray(self._teachers, dtype='int64')[grid_rows],
+            'SP_ID': np.asarray(self.term_ids, dtype='int64')[grid_positions],
+            'ACC_BASELINE_HOURS': baseline,
+            'ACC_CREDIT_HOURS': credit,
+            'ACC_DEBIT_HOURS': baseline,
+            'ACC_BALANCE': balance,
+            'ACC_CARRYOVER': balance - (credit - baseline),
+        }).sort_values(['T_ID', 'SP_ID'], key=lambda column: column if column.name == 'T_ID'
+                       else self.calendar.map_positions(column), ignore_index=True)
+
+    def _grid(self, teachers: int) -> np.ndarray:
+        return np.zeros((teachers, len(self.term_ids)))
+
+    @staticmethod
+    def _balance_columns() -> List[str]:
+        return ['T_ID', 'SP_ID', 'ACC_BASELINE_HOURS', 'ACC_CREDIT_HOURS',
+                'ACC_DEBIT_HOURS', 'ACC_BALANCE', 'ACC_CARRYOVER']
+
+
+def _int_keys(frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Rows with all key columns set, with the keys as int64.
+
+    Keys arrive as ints, floats (after NaN handling) or strings (after
+    schema coercion of VARCHAR columns); grouping on mixed dtypes would
+    put 2, 2.0 and '2' into separate groups.
+    """
+    keys = frame[columns].apply(pd.to_numeric, errors='coerce')
+    valid = keys.notna().all(axis=1)
+    return frame[valid].assign(**{column: keys.loc[valid, column].astype('int64') for column in columns})
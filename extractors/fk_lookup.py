@@ -0,0 +1,39 @@
+"""
+Foreign key resolution helpers for extractors.
+
+Source columns loaded by the CsvSourceLoader are categoricals with shared
+dictionaries. For those, a key mapping is resolved once per category and
+the result is gathered through the integer codes, instead of hashing every
+row's string value. Other columns fall back to Series.map.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+from trace_recorder import span
+
+
+def map_keys(series: pd.Series, mapping: Dict[Any, Any]) -> pd.Series:
+    """
+    Map source values to foreign key IDs.
+
+    Args:
+        series: Source column (categorical or plain)
+        mapping: Source value -> referenced ID
+
+    Returns:
+        Series of IDs aligned with series; unmatched values become NaN
+    """
+    with span('map_keys', 'fk', column=str(series.name), rows=len(series)):
+        return _map_keys(series, mapping)
+
+
+def _map_keys(series: pd.Series, mapping: Dict[Any, Any]) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        # One slot per category plus a trailing NaN slot for code -1 (missing)
+        lookup = np.empty(len(categories) + 1, dtype=object)
+        lookup[:-1] = [mapping.get(value, np.nan) for value in categories]
+        lookup[-1] = np.nan
+        return pd.Series(lookup[series.cat.codes.to_numpy()], index=series.index, name=series.name)
+    return series.map(mapping)
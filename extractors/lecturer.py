@@ -13,15 +13,21 @@ class LecturerExtractor(DataExtractor):
     def dependencies(self) -> List[str]:
         return ["TEACHER"]  # Need teachers data for supervisor lookup
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        return {'OfferedCourses': ['isprof', 'lecNo', 'supervisor']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, teacher: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract lecturers and resolve supervisor foreign keys.
         Same logic as original getLecturers function with name-based supervisor lookup.
         """
         # Filter for lecturers only (non-professors)
-        lecturersDF = OfferedCourses[
-            OfferedCourses['isprof'] == False
-        ][['lecNo', 'supervisor']].drop_duplicates()
+        lecturersDF = self.distinct(OfferedCourses, ['isprof', 'lecNo', 'supervisor'], **kwargs)
+        lecturersDF = lecturersDF[lecturersDF['isprof'] == 'FALSCH']
+        # One row per lecturer: rows naming a supervisor win over rows without one
+        lecturersDF = (lecturersDF.sort_values('supervisor', na_position='last', kind='stable')
+                       .drop_duplicates(subset=['lecNo']))
         
         lecturers = []
         for index, row in lecturersDF.iterrows():
@@ -45,7 +51,7 @@ class LecturerExtractor(DataExtractor):
                         break
             
             lecturer = {
-                'L_ID': int(row['lecNo']),  # References TEACHER.T_ID
+                'T_ID': int(float(row['lecNo'])),  # References TEACHER.T_ID
                 'L_STREET_ADDRESS': None,  # Default null as in original
                 'L_CITY': None,           # Default null as in original
                 'L_ZIP': None,            # Default null as in original
@@ -54,6 +60,6 @@ class LecturerExtractor(DataExtractor):
             lecturers.append(lecturer)
         
         # Sort by ID (same as original)
-        lecturers = sorted(lecturers, key=lambda x: x['L_ID'])
+        lecturers = sorted(lecturers, key=lambda x: x['T_ID'])
         
         return lecturers
\ No newline at end of file
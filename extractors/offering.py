@@ -13,6 +13,9 @@ Modify the extract() method to implement your specific business logic.
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from fk_lookup import map_keys
+from columnar import as_columnar
+from term_calendar import TermCalendar
 
 
 class OfferingExtractor(DataExtractor):
@@ -28,31 +31,37 @@ class OfferingExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return ['SUBJECT', 'SEMESTER_PLANNING']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['sbjNo', 'term', 'numSchd', 'elective']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, subject: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
 
-        offeringDF = OfferedCourses[['sbjNo', 'term', 'numSchd', 'elective']].drop_duplicates() 
+        offeringDF = self.distinct(OfferedCourses, ['sbjNo', 'term', 'numSchd', 'elective'], **kwargs)
 
-        # Map subject numbers to their IDs
-        subject_nr_to_id = {s['S_NR']: s['S_ID'] for s in subject}
+        # Subjects are referenced by their number (SUBJECT.S_NR)
+        subject_nrs = as_columnar(subject).mapping('S_NR', 'S_NR')
 
-        # Map terms to their IDs
-        term_name_to_id = {sem['SP_NAME']: sem['SP_ID'] for sem in semester_planning}
+        # Chronological term calendar, maps term codes to their IDs
+        calendar = TermCalendar.from_records(semester_planning)
 
-        # Replace subject numbers with their corresponding subject IDs
-        offeringDF['S_ID'] = offeringDF['sbjNo'].map(subject_nr_to_id)
+        # Keep only subject numbers that exist in SUBJECT
+        offeringDF['S_NR'] = map_keys(offeringDF['sbjNo'], subject_nrs)
 
         # Replace terms with their corresponding semester planning IDs
-        offeringDF['SP_ID'] = offeringDF['term'].map(term_name_to_id)
+        offeringDF['SP_ID'] = calendar.map_ids(offeringDF['term'])
+        offeringDF = offeringDF.dropna(subset=['S_NR', 'SP_ID'])
 
         result = []
         for i, offeringDF in enumerate(offeringDF.to_dict(orient='records')):
             offering = {
                 'O_ID': i + 1,  # Auto-incrementing ID
-                'FK_SUBJECT': offeringDF['S_ID'],  # Foreign key to SUBJECT.S_ID
-                'FK_SEMESTER_PLANNING': offeringDF['SP_ID'],  # Foreign key to SEMESTER_PLANNING.SP_ID
-                'O_PLANNED_HOURS': int(offeringDF['numSchd']) if not pd.isna(offeringDF['numSchd']) else 0,
-                'O_TYPE': bool(offeringDF['elective']) if not pd.isna(offeringDF['elective']) else False
+                'FK_SUBJECT': offeringDF['S_NR'],  # Foreign key to SUBJECT.S_NR
+                'FK_SEMESTER_PLANNING': int(offeringDF['SP_ID']),  # Foreign key to SEMESTER_PLANNING.SP_ID
+                'O_PLANNED_HOURS': float(offeringDF['numSchd']) if not pd.isna(offeringDF['numSchd']) else 0.0,
+                'O_TYPE': str(offeringDF['elective']) if not pd.isna(offeringDF['elective']) else None
             }
             result.append(offering)
 
-        return result
\ No newline at end of file
+        return result
@@ -4,7 +4,7 @@ OfferingAssignmentExtractor - Data extractor for OFFERING_ASSIGNMENT table
 
 Generated on: 2025-12-11 14:55:10
 CSV Inputs: OfferedCourses
-Dependencies: OFFERING, TEACHER
+Dependencies: OFFERING, TEACHER, SEMESTER_PLANNING
 
 This extractor follows the DataExtractor contract for the database population system.
 Modify the extract() method to implement your specific business logic.
@@ -13,6 +13,8 @@ Modify the extract() method to implement your specific business logic.
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from columnar import as_columnar
+from term_calendar import TermCalendar
 
 
 class OfferingAssignmentExtractor(DataExtractor):
@@ -26,8 +28,54 @@ class OfferingAssignmentExtractor(DataExtractor):
     @property
     def dependencies(self) -> List[str]:
         """Return list of table names this extractor depends on"""
-        return ['OFFERING', 'TEACHER']
+        return ['OFFERING', 'TEACHER', 'SEMESTER_PLANNING']
     
-    def extract(self, OfferedCourses: pd.DataFrame, offering: List[Dict[str, Any]], teacher: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['sbjNo', 'term', 'lecNo', 'isprof', 'cntSchd']}
+    
+    def extract(self, OfferedCourses: pd.DataFrame, offering: List[Dict[str, Any]], teacher: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Extract data for OFFERING_ASSIGNMENT table.
         
-        offeringAssignmentsDF = OfferedCourses[['sbjNo', 'lecName', 'lec1stn']].drop_duplicates()
+        Args:
+        CSV Data:
+            OfferedCourses: DataFrame loaded from OfferedCourses.csv
+        Dependencies:
+            offering: List of OFFERING table records from dependency resolution
+            teacher: List of TEACHER table records from dependency resolution
+            semester_planning: List of SEMESTER_PLANNING table records from dependency resolution
+        Additional:
+            **kwargs: Additional parameters passed by the extraction system
+        
+        Returns:
+            List of dictionaries representing OFFERING_ASSIGNMENT table records
+            (one per offering and teacher, with that teacher's scheduled hours)
+        """
+        offeringAssignmentsDF = self.distinct(OfferedCourses, ['sbjNo', 'term', 'lecNo', 'isprof', 'cntSchd'], **kwargs)
+        offeringAssignmentsDF = offeringAssignmentsDF.dropna(subset=['sbjNo', 'term', 'lecNo'])
+
+        # Offerings are identified by (subject number, term)
+        offering_ids = {(o['FK_SUBJECT'], o['FK_SEMESTER_PLANNING']): o['O_ID'] for o in offering}
+        valid_teacher_ids = as_columnar(teacher).unique('T_ID')
+        offeringAssignmentsDF['SP_ID'] = TermCalendar.from_records(semester_planning).map_ids(offeringAssignmentsDF['term'])
+
+        assignments = []
+        for row in offeringAssignmentsDF.to_dict(orient='records'):
+            if pd.isna(row['SP_ID']):
+                continue
+            offering_id = offering_ids.get((str(row['sbjNo']), int(row['SP_ID'])))
+            teacher_id = int(float(row['lecNo']))
+            if offering_id is None or teacher_id not in valid_teacher_ids:
+                continue
+
+            assignments.append({
+                'OA_ID': len(assignments) + 1,  # Auto-incrementing ID
+                'FK_OFFERING': offering_id,  # Foreign key to OFFERING.O_ID
+                'FK_TEACHER': teacher_id,  # Foreign key to TEACHER.T_ID
+                'OA_ROLE': 'PROFESSOR' if row['isprof'] == 'WAHR' else 'LECTURER',
+                'OA_ASSIGNED_HOURS': float(row['cntSchd']) if not pd.isna(row['cntSchd']) else 0.0
+            })
+
+        return assignments
@@ -28,6 +28,11 @@ class PositionExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return []
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'WorkLoad': ['job title']}
+    
     def extract(self, WorkLoad: pd.DataFrame, **kwargs) -> List[Dict[str, Any]]:
         """
         Extract unique job titles and assign auto-incrementing IDs.
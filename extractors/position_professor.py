@@ -4,15 +4,21 @@ PositionProfessorExtractor - Data extractor for POSITION_PROFESSOR table
 
 Generated on: 2025-12-11 14:55:09
 CSV Inputs: WorkLoad
-Dependencies: PROFESSOR, POSITION, SEMESTER_PLANNING
+Dependencies: PROFESSOR, POSITION, SEMESTER_PLANNING, TEACHER
 
 This extractor follows the DataExtractor contract for the database population system.
 Modify the extract() method to implement your specific business logic.
 """
 
+import logging
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from fk_lookup import map_keys
+from columnar import as_columnar
+from term_calendar import TermCalendar
+
+logger = logging.getLogger(__name__)
 
 
 class PositionProfessorExtractor(DataExtractor):
@@ -26,43 +32,49 @@ class PositionProfessorExtractor(DataExtractor):
     @property
     def dependencies(self) -> List[str]:
         """Return list of table names this extractor depends on"""
-        return ['PROFESSOR', 'POSITION', 'SEMESTER_PLANNING']
+        return ['PROFESSOR', 'POSITION', 'SEMESTER_PLANNING', 'TEACHER']
+    
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'WorkLoad': ['term', 'name', 'job title', 'reduction']}
     
-    def extract(self, WorkLoad: pd.DataFrame, professor: List[Dict[str, Any]], position: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    def extract(self, WorkLoad: pd.DataFrame, professor: List[Dict[str, Any]], position: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], teacher: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         
-        professorPositionDF = WorkLoad[['term', 'name', 'job title', 'reduction']].drop_duplicates()
+        professorPositionDF = self.distinct(WorkLoad, ['term', 'name', 'job title', 'reduction'], **kwargs)
 
         # Map position names to their IDs
-        position_name_to_id = {pos['PO_NAME']: pos['PO_ID'] for pos in position}
-
-        # Map terms to their IDs
-        term_name_to_id = {sem['SP_NAME']: sem['SP_ID'] for sem in semester_planning}
-
-        # Map professor names to their IDs
-        professor_name_to_id = {prof['P_NAME']: prof['P_ID'] for prof in professor}
-
-
+        position_name_to_id = as_columnar(position).mapping('PO_NAME', 'PO_ID')
 
+        # Chronological term calendar, maps term codes to their IDs
+        calendar = TermCalendar.from_records(semester_planning)
 
+        # Map professor names (WorkLoad.name is the last name) to their IDs
+        professor_ids = as_columnar(professor).unique('P_ID')
+        professor_name_to_id = {t['T_LASTNAME']: t['T_ID'] for t in teacher if t['T_ID'] in professor_ids}
         # Replace job titles with their corresponding position IDs
-        professorPositionDF['PO_ID'] = professorPositionDF['job title'].map(position_name_to_id)
+        professorPositionDF['PO_ID'] = map_keys(professorPositionDF['job title'], position_name_to_id)
 
         # Replace terms with their corresponding semester planning IDs
-        professorPositionDF['term'] = professorPositionDF['term'].map(term_name_to_id)
+        professorPositionDF['term'] = calendar.map_ids(professorPositionDF['term'])
 
         # Replace professor names with their corresponding professor IDs
-        professorPositionDF['P_ID'] = professorPositionDF['name'].map(professor_name_to_id)
+        professorPositionDF['P_ID'] = map_keys(professorPositionDF['name'], professor_name_to_id)
 
-
-        
+        resolved = professorPositionDF[['P_ID', 'PO_ID', 'term']].notna().all(axis=1)
+        if not resolved.all():
+            unmatched = sorted(professorPositionDF.loc[~resolved, 'name'].dropna().unique())
+            logger.warning(f"Skipping {int((~resolved).sum())} WorkLoad rows without a matching "
+                           f"professor, position or term: {unmatched}")
+        professorPositionDF = professorPositionDF[resolved]
 
         result = []
         for professorPositionDF in professorPositionDF.to_dict(orient='records'):  
                 if professorPositionDF and str(professorPositionDF).strip():
                     result.append({
-                        'P_ID': professorPositionDF['P_ID'],  # Foreign key to PROFESSOR.P_ID
-                        'PO_ID': professorPositionDF['PO_ID'],  # Foreign key to POSITION.P_ID
-                        'TERM': professorPositionDF['term'], # Foreign key to SEMESTER_PLANNING.SP_ID
+                        'P_ID': int(professorPositionDF['P_ID']),  # Foreign key to PROFESSOR.P_ID
+                        'PO_ID': int(professorPositionDF['PO_ID']),  # Foreign key to POSITION.PO_ID
+                        'TERM': int(professorPositionDF['term']), # Foreign key to SEMESTER_PLANNING.SP_ID
                         'CREDIT_HOURS': int(str(professorPositionDF['reduction']).strip())
                     })
         return result
@@ -28,6 +28,11 @@ class ProfessorExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return ['TEACHER']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['lecNo', 'lecRoom']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, teacher: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for PROFESSOR table.
@@ -42,55 +47,23 @@ class ProfessorExtractor(DataExtractor):
         
         Returns:
             List of dictionaries representing PROFESSOR table records
-            
-        TODO: Implement your extraction logic here
-        Example structure:
-        ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }
-            records.append(record)
-        return records
-        ```
         """
-        # TODO: Replace this placeholder with your extraction logic
-        logger.warning(f"{self.__class__.__name__} is using placeholder implementation")
-        logger.info(f"Available parameters: {list(kwargs.keys()) if 'kwargs' in locals() else 'None'}")
-        
-        # Placeholder implementation - replace with actual logic
-        records = []
-        
-        # Example: If you have a DataFrame parameter, process it
-        # Example using primary CSV: OfferedCourses
-        if 'OfferedCourses' in locals():
-            df = OfferedCourses
-            for index, row in df.iterrows():
-                # TODO: Replace with actual column mappings
-                record = {
-                    'ID': row.get('id', index),  # Replace 'id' with actual column
-                    'NAME': row.get('name', f'Record_{index}'),  # Replace with actual column
-                    # Add more columns based on your table schema
-                }
-                records.append(record)
+        # Every teacher flagged as professor is a PROFESSOR (P_ID = T_ID)
+        professor_ids = sorted(t['T_ID'] for t in teacher if t.get('T_ISPROFESSOR'))
 
+        # Room per teacher: the first room given in any of their rows
+        roomsDF = self.distinct(OfferedCourses, ['lecNo', 'lecRoom'], **kwargs).dropna()
+        rooms = {}
+        for lec_no, room in zip(roomsDF['lecNo'], roomsDF['lecRoom']):
+            if str(room).strip():
+                rooms.setdefault(int(float(lec_no)), str(room).strip())
         
-        # Example using dependency data: TEACHER
-        if teacher:
-            # Access dependency records for foreign key lookups
-            teacher_lookup = {record['ID']: record for record in teacher}
-            
-            # Example: Use dependency data in extraction logic
-            for index, row in some_dataframe.iterrows():
-                dependency_id = row.get('dependency_id')  # Replace with actual FK column
-                if dependency_id in teacher_lookup:
-                    # Use dependency record data
-                    dep_record = teacher_lookup[dependency_id]
-                    # TODO: Implement logic using dependency data
-                    pass
+        professors = []
+        for professor_id in professor_ids:
+            professors.append({
+                'P_ID': professor_id,  # Foreign key to TEACHER.T_ID
+                'P_CREDIT_HOUR_ACCOUNT': None,  # Kept in DEPUTAT_ACCOUNT
+                'P_ROOM': rooms.get(professor_id)
+            })
         
-        logger.info(f"{self.__class__.__name__} extracted {len(records)} records")
-        return records
+        return professors
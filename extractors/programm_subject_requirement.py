@@ -10,14 +10,23 @@ This extractor follows the DataExtractor contract for the database population sy
 Modify the extract() method to implement your specific business logic.
 """
 
+import logging
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from columnar import as_columnar
+from requirement_index import RequirementIndex
+
+logger = logging.getLogger(__name__)
 
 
 class ProgrammSubjectRequirementExtractor(DataExtractor):
     """Extract data for PROGRAMM_SUBJECT_REQUIREMENT table"""
     
+    def __init__(self):
+        # Kept after extract() for program/subject requirement lookups
+        self.index = None
+    
     @property
     def table_name(self) -> str:
         """Return the database table name this extractor targets"""
@@ -28,10 +37,22 @@ class ProgrammSubjectRequirementExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return ['STUDY_PROGRAM', 'SUBJECT', 'SEMESTER_PLANNING']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['studyPrg', 'sbjNo', 'term', 'numCurr', 'sbjlevel']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, study_program: List[Dict[str, Any]], subject: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for PROGRAMM_SUBJECT_REQUIREMENT table.
         
+        One requirement per distinct (studyPrg, sbjNo, term) of the export,
+        with the curricular hours (numCurr) and the target semester
+        (sbjlevel) of its first occurrence. The keys are resolved by inner
+        merge joins against STUDY_PROGRAM, SUBJECT and SEMESTER_PLANNING, so
+        the cost grows with the number of rows, not with programs x subjects.
+        The requirements are kept as self.index (see requirement_index).
+        
         Args:
         CSV Data:
             OfferedCourses: DataFrame loaded from OfferedCourses.csv
@@ -44,55 +65,45 @@ class ProgrammSubjectRequirementExtractor(DataExtractor):
         
         Returns:
             List of dictionaries representing PROGRAMM_SUBJECT_REQUIREMENT table records
-            
-        TODO: Implement your extraction logic here
-        Example structure:
-        ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }
-            records.append(record)
-        return records
-        ```
         """
-        # TODO: Replace this placeholder with your extraction logic
-        logger.warning(f"{self.__class__.__name__} is using placeholder implementation")
-        logger.info(f"Available parameters: {list(kwargs.keys()) if 'kwargs' in locals() else 'None'}")
+        requirements = (
+            self.distinct(OfferedCourses, ['studyPrg', 'sbjNo', 'term', 'numCurr', 'sbjlevel'], **kwargs)
+            .drop_duplicates(subset=['studyPrg', 'sbjNo', 'term'])
+        )
+        requirements = requirements.astype({'studyPrg': object, 'sbjNo': object, 'term': object})
         
-        # Placeholder implementation - replace with actual logic
-        records = []
+        programs = as_columnar(study_program).to_frame(['ST_NAME'])
+        subjects = as_columnar(subject).to_frame(['S_NR']).drop_duplicates()
+        terms = as_columnar(semester_planning).to_frame(['SP_TERM', 'SP_ID'])
         
-        # Example: If you have a DataFrame parameter, process it
-        # Example using primary CSV: OfferedCourses
-        if 'OfferedCourses' in locals():
-            df = OfferedCourses
-            for index, row in df.iterrows():
-                # TODO: Replace with actual column mappings
-                record = {
-                    'ID': row.get('id', index),  # Replace 'id' with actual column
-                    'NAME': row.get('name', f'Record_{index}'),  # Replace with actual column
-                    # Add more columns based on your table schema
-                }
-                records.append(record)
-
+        joined = (
+            requirements
+            .merge(programs, left_on='studyPrg', right_on='ST_NAME', how='inner')
+            .merge(subjects, left_on='sbjNo', right_on='S_NR', how='inner')
+            .merge(terms, left_on='term', right_on='SP_TERM', how='inner')
+        )
+        if len(joined) < len(requirements):
+            logger.warning(f"{self.__class__.__name__}: {len(requirements) - len(joined)} of {len(requirements)} "
+                           f"requirements reference unknown programs, subjects or terms")
+        
+        hours = joined['numCurr']
+        if not pd.api.types.is_numeric_dtype(hours):
+            # Hours are exported with a comma as decimal separator
+            hours = hours.astype(str).str.replace(',', '.', regex=False)
+        
+        result = pd.DataFrame({
+            'FK_STUDY_PROGRAM': joined['ST_NAME'],
+            'FK_SUBJECT': joined['S_NR'],
+            'FK_SEMESTER_PLANNING': joined['SP_ID'].astype('int64'),
+            'PSR_REQUIRED_HOURS': pd.to_numeric(hours, errors='coerce').round(2),
+            'PSR_TARGET_SEMESTER': pd.to_numeric(joined['sbjlevel'], errors='coerce').round().astype('Int64'),
+            'PSR_ESTIMATED_NEEDS': None,
+        }).sort_values(['FK_STUDY_PROGRAM', 'FK_SEMESTER_PLANNING', 'FK_SUBJECT'], ignore_index=True)
+        result.insert(0, 'PSR_ID', range(1, len(result) + 1))
         
-        # Example using dependency data: STUDY_PROGRAM
-        if study_program:
-            # Access dependency records for foreign key lookups
-            study_program_lookup = {record['ID']: record for record in study_program}
-            
-            # Example: Use dependency data in extraction logic
-            for index, row in some_dataframe.iterrows():
-                dependency_id = row.get('dependency_id')  # Replace with actual FK column
-                if dependency_id in study_program_lookup:
-                    # Use dependency record data
-                    dep_record = study_program_lookup[dependency_id]
-                    # TODO: Implement logic using dependency data
-                    pass
+        self.index = RequirementIndex.from_frame(result, term_ids=dict(zip(terms['SP_TERM'], terms['SP_ID'])))
         
+        columns = [result[name].astype(object).where(result[name].notna(), None).tolist() for name in result.columns]
+        records = [dict(zip(result.columns, row)) for row in zip(*columns)]
         logger.info(f"{self.__class__.__name__} extracted {len(records)} records")
         return records
@@ -0,0 +1,115 @@
+"""
+Shared projection and de-duplication cache over the source DataFrames.
+
+Most extractors start with ``OfferedCourses[[...]].drop_duplicates()`` on
+overlapping column subsets, and every such call hashes the full frame again.
+The ProjectionCache computes each distinct projection once per run and
+serves narrower projections from the smallest wider projection already in
+the cache, so only the first projection of a source scans all rows.
+
+Deriving a subset from a de-duplicated superset keeps the first occurrence
+of every row, so the result (including its index labels) is identical to
+projecting the full frame directly.
+"""
+
+import logging
+import threading
+import pandas as pd
+from typing import Dict, List, Optional, Iterable, FrozenSet, Sequence
+from trace_recorder import span, instant
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectionCache:
+    """Per-run cache of de-duplicated column projections, keyed by source frame"""
+
+    def __init__(self, sources: Optional[Dict[str, pd.DataFrame]] = None):
+        self._names: Dict[int, str] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._projections: Dict[str, Dict[FrozenSet[str], pd.DataFrame]] = {}
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'derived': 0, 'scans': 0}
+
+        for name, frame in (sources or {}).items():
+            self.register(name, frame)
+
+    def register(self, name: str, frame: pd.DataFrame) -> None:
+        """Register a source frame; previous projections of that name are dropped"""
+        with self._lock:
+            previous = self._frames.get(name)
+            if previous is not None:
+                self._names.pop(id(previous), None)
+            # Holding the frame keeps its id() stable for the lifetime of the cache
+            self._frames[name] = frame
+            self._names[id(frame)] = name
+            self._projections[name] = {}
+
+    def source_name(self, frame: pd.DataFrame) -> Optional[str]:
+        return self._names.get(id(frame))
+
+    def distinct(self, frame: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Return ``frame[columns].drop_duplicates()``, computed at most once per run.
+
+        Frames that were not registered are projected directly. The caller
+        receives a copy and may modify it freely.
+        """
+        columns = list(columns)
+        name = self.source_name(frame)
+        if name is None:
+            return frame[columns].drop_duplicates()
+
+        return self._projection(name, columns)[columns].copy()
+
+    def prime(self, frame: pd.DataFrame, column_sets: Iterable[Sequence[str]]) -> None:
+        """
+        Precompute the projections of several column sets.
+
+        The union of the column sets is the only scan of the source frame;
+        each column set is then derived from the union, so later distinct()
+        calls with one of these column sets are cache hits.
+        """
+        name = self.source_name(frame)
+        column_sets = [list(columns) for columns in column_sets if columns]
+        union: List[str] = []
+        for columns in column_sets:
+            union.extend(c for c in columns if c not in union)
+        if name is None or not union:
+            return
+        self._projection(name, union)
+        for columns in column_sets:
+            self._projection(name, columns)
+
+    def _projection(self, name: str, columns: List[str]) -> pd.DataFrame:
+        """Cached projection of a registered source; callers must not modify it"""
+        key = frozenset(columns)
+        with self._lock:
+            cached = self._projections[name].get(key)
+            if cached is not None:
+                self.stats['hits'] += 1
+                instant('projection cache hit', 'cache', source=name, columns=columns)
+            else:
+                cached = self._compute(name, key, columns)
+                self._projections[name][key] = cached
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in self._projections:
+                self._projections[name] = {}
+
+    def _compute(self, name: str, key: FrozenSet[str], columns: List[str]) -> pd.DataFrame:
+        """Derive the projection from the smallest cached superset, else scan the source"""
+        supersets = [proj for cols, proj in self._projections[name].items() if key < cols]
+        if supersets:
+            base = min(supersets, key=len)
+            self.stats['derived'] += 1
+            kind = 'derive'
+        else:
+            base = self._frames[name]
+            self.stats['scans'] += 1
+            kind = 'scan'
+            logger.debug(f"Projection cache scan of {name} for {columns}")
+        with span(f"projection {kind}", 'cache', source=name, columns=columns, rows=len(base)):
+            return base[columns].drop_duplicates()
@@ -0,0 +1,65 @@
+"""
+Sparse program x subject x term index of PROGRAMM_SUBJECT_REQUIREMENT.
+
+Only a tiny share of all (study program, subject, term) combinations are
+actual requirements, so the index stores just the existing ones, grouped
+both ways: (program, term) -> subjects and (subject, term) -> programs.
+"Which subjects does program X require in term T" and its reverse are a
+single dict probe each, and building the index is one grouped pass over
+the requirements, linear in their number.
+"""
+
+import pandas as pd
+from typing import Dict, List, Any, Tuple, Optional
+from columnar import as_columnar
+
+EMPTY: Tuple[Any, ...] = ()
+
+
+class RequirementIndex:
+    """Requirements grouped by (program, term) and by (subject, term)"""
+
+    def __init__(self, by_program: Dict[Tuple[Any, Any], Tuple[Any, ...]],
+                 by_subject: Dict[Tuple[Any, Any], Tuple[Any, ...]],
+                 term_ids: Optional[Dict[Any, Any]] = None):
+        """
+        Args:
+            term_ids: Term code -> SP_ID, so terms can be given as codes too
+        """
+        self._by_program = by_program
+        self._by_subject = by_subject
+        self._term_ids = dict(term_ids or {})
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, program: str = 'FK_STUDY_PROGRAM',
+                   subject: str = 'FK_SUBJECT', term: str = 'FK_SEMESTER_PLANNING',
+                   term_ids: Optional[Dict[Any, Any]] = None) -> 'RequirementIndex':
+        """Group requirement rows (PROGRAMM_SUBJECT_REQUIREMENT columns by default)"""
+        frame = frame[[program, subject, term]].dropna().drop_duplicates()
+        return cls(_group(frame, program, term, subject), _group(frame, subject, term, program), term_ids)
+
+    @classmethod
+    def from_records(cls, requirements: List[Dict[str, Any]],
+                     term_ids: Optional[Dict[Any, Any]] = None) -> 'RequirementIndex':
+        columns = ['FK_STUDY_PROGRAM', 'FK_SUBJECT', 'FK_SEMESTER_PLANNING']
+        return cls.from_frame(as_columnar(requirements).to_frame(columns), term_ids=term_ids)
+
+    def subjects(self, program: Any, term: Any) -> Tuple[Any, ...]:
+        """Subjects program requires in term (SP_ID or term code), sorted"""
+        return self._by_program.get((program, self._term_ids.get(term, term)), EMPTY)
+
+    def programs(self, subject: Any, term: Any) -> Tuple[Any, ...]:
+        """Programs requiring subject in term (SP_ID or term code), sorted"""
+        return self._by_subject.get((subject, self._term_ids.get(term, term)), EMPTY)
+
+    def __len__(self) -> int:
+        return sum(len(subjects) for subjects in self._by_program.values())
+
+
+def _group(frame: pd.DataFrame, key: str, term: str, value: str) -> Dict[Tuple[Any, Any], Tuple[Any, ...]]:
+    """(key, term) -> sorted values, in one pass over the sorted rows"""
+    ordered = frame.sort_values(value, kind='stable')
+    groups: Dict[Tuple[Any, Any], List[Any]] = {}
+    for group, item in zip(zip(ordered[key].tolist(), ordered[term].tolist()), ordered[value].tolist()):
+        groups.setdefault(group, []).append(item)
+    return {group: tuple(items) for group, items in groups.items()}
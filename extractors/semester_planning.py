@@ -10,14 +10,22 @@ This extractor follows the DataExtractor contract for the database population sy
 Modify the extract() method to implement your specific business logic.
 """
 
+import logging
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from term_calendar import TermCalendar
+
+logger = logging.getLogger(__name__)
 
 
 class SemesterPlanningExtractor(DataExtractor):
     """Extract data for SEMESTER_PLANNING table"""
     
+    def __init__(self):
+        # Kept after extract() for term ordering and term -> SP_ID mapping
+        self.calendar = None
+    
     @property
     def table_name(self) -> str:
         """Return the database table name this extractor targets"""
@@ -28,10 +36,20 @@ class SemesterPlanningExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return []
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['term'], 'WorkLoad': ['term']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, WorkLoad: pd.DataFrame, **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for SEMESTER_PLANNING table.
         
+        One planning per distinct term code of both sources. SP_IDs are
+        numbered in chronological order (see term_calendar), so comparing
+        two SP_IDs compares their terms. Every term starts as version 1,
+        not final; invalid term codes are skipped with a warning.
+        
         Args:
         CSV Data:
             OfferedCourses: DataFrame loaded from OfferedCourses.csv
@@ -41,40 +59,25 @@ class SemesterPlanningExtractor(DataExtractor):
         
         Returns:
             List of dictionaries representing SEMESTER_PLANNING table records
-            
-        TODO: Implement your extraction logic here
-        Example structure:
-        ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }
-            records.append(record)
-        return records
-        ```
         """
-        # TODO: Replace this placeholder with your extraction logic
-        logger.warning(f"{self.__class__.__name__} is using placeholder implementation")
-        logger.info(f"Available parameters: {list(kwargs.keys()) if 'kwargs' in locals() else 'None'}")
+        terms = set()
+        for frame in (OfferedCourses, WorkLoad):
+            terms.update(str(term).strip().upper() for term in pd.unique(frame['term'].dropna()))
         
-        # Placeholder implementation - replace with actual logic
-        records = []
+        self.calendar = TermCalendar.from_terms(terms)
+        skipped = sorted(terms - set(self.calendar.terms))
+        if skipped:
+            logger.warning(f"{self.__class__.__name__} skipped invalid term codes: {', '.join(skipped)}")
         
-        # Example: If you have a DataFrame parameter, process it
-        # Example using primary CSV: OfferedCourses
-        if 'OfferedCourses' in locals():
-            df = OfferedCourses
-            for index, row in df.iterrows():
-                # TODO: Replace with actual column mappings
-                record = {
-                    'ID': row.get('id', index),  # Replace 'id' with actual column
-                    'NAME': row.get('name', f'Record_{index}'),  # Replace with actual column
-                    # Add more columns based on your table schema
-                }
-                records.append(record)
+        records = [
+            {
+                'SP_ID': sp_id,
+                'SP_TERM': term,
+                'SP_VERSION_NR': 1,
+                'SP_IS_FINAL': False,
+            }
+            for sp_id, term in zip(self.calendar.sp_ids, self.calendar.terms)
+        ]
         
-        logger.info(f"{self.__class__.__name__} extracted {len(records)} records")
+        logger.info(f"{self.__class__.__name__} extracted {len(records)} terms")
         return records
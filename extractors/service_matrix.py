@@ -0,0 +1,86 @@
+"""
+Provider x client x term table of inter-department service hours.
+
+The inter-department service reports ask how many weekly hours one
+department teaches for another, per term or in total. ServiceMatrix holds
+these sums built once from the SERVICE_REQUEST rows, so every report value
+is a dict lookup instead of a scan over the requests.
+
+Only few (provider, client, term) combinations carry hours, so the sums are
+stored sparsely: one dict keyed by (provider, client, term) plus per-term
+adjacency dicts per provider and per client. Memory grows with the number
+of non-zero cells, not with providers x clients x terms. Totals over all
+terms are kept under the term None.
+"""
+
+import pandas as pd
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+from columnar import as_columnar
+
+
+class ServiceMatrix:
+    """Sparse service hour sums per (provider, client, term)"""
+
+    def __init__(self, cells: Dict[Tuple[Any, Any, Any], float]):
+        """
+        Args:
+            cells: (provider, client, term) -> weekly hours; zero cells may be omitted
+        """
+        self._cells: Dict[Tuple[Any, Any, Any], float] = {}
+        self._provided: Dict[Tuple[Any, Any], Dict[Any, float]] = defaultdict(dict)
+        self._received: Dict[Tuple[Any, Any], Dict[Any, float]] = defaultdict(dict)
+        for (provider, client, term), hours in cells.items():
+            if not hours:
+                continue
+            for key in ((provider, client, term), (provider, client, None)):
+                self._cells[key] = self._cells.get(key, 0.0) + float(hours)
+        for (provider, client, term), hours in self._cells.items():
+            self._provided[(provider, term)][client] = hours
+            self._received[(client, term)][provider] = hours
+
+        self.providers = sorted({provider for provider, _, _ in self._cells})
+        self.clients = sorted({client for _, client, _ in self._cells})
+        self.terms = sorted({term for _, _, term in self._cells if term is not None})
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, provider: str = 'SR_EXPORTING_FACULTY',
+                   client: str = 'SR_IMPORTING_FACULTY', term: str = 'FK_SEMESTER_PLANNING',
+                   hours: str = 'SR_WEEKLY_HOURS') -> 'ServiceMatrix':
+        """Sum the hours of a frame (SERVICE_REQUEST columns by default) into a matrix"""
+        frame = frame.dropna(subset=[provider, client, term])
+        sums = (
+            frame.assign(**{hours: pd.to_numeric(frame[hours], errors='coerce').fillna(0.0)})
+            .groupby([provider, client, term], observed=True)[hours].sum()
+        )
+        return cls({key: value for key, value in sums.items() if value})
+
+    @classmethod
+    def from_records(cls, service_request: List[Dict[str, Any]]) -> 'ServiceMatrix':
+        columns = ['SR_EXPORTING_FACULTY', 'SR_IMPORTING_FACULTY', 'FK_SEMESTER_PLANNING', 'SR_WEEKLY_HOURS']
+        return cls.from_frame(as_columnar(service_request).to_frame(columns))
+
+    def __len__(self) -> int:
+        """Number of non-zero (provider, client, term) cells"""
+        return sum(1 for _, _, term in self._cells if term is not None)
+
+    def hours(self, provider: Any, client: Any, term: Any = None) -> float:
+        """Weekly hours provider teaches for client in term (all terms when None)"""
+        return self._cells.get((provider, client, term), 0.0)
+
+    def provided_by(self, provider: Any, term: Any = None) -> Dict[Any, float]:
+        """Hours per client department served by provider"""
+        return dict(self._provided.get((provider, term), {}))
+
+    def received_by(self, client: Any, term: Any = None) -> Dict[Any, float]:
+        """Hours per provider department teaching for client"""
+        return dict(self._received.get((client, term), {}))
+
+    def to_frame(self, term: Any = None) -> pd.DataFrame:
+        """Provider x client table of one term (all terms when None)"""
+        frame = pd.DataFrame(0.0, index=pd.Index(self.providers, name='provider'),
+                             columns=pd.Index(self.clients, name='client'))
+        for (provider, client, cell_term), hours in self._cells.items():
+            if cell_term == term:
+                frame.at[provider, client] = hours
+        return frame
@@ -10,14 +10,32 @@ This extractor follows the DataExtractor contract for the database population sy
 Modify the extract() method to implement your specific business logic.
 """
 
+import logging
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
+from fk_lookup import map_keys
+from columnar import as_columnar
+from service_matrix import ServiceMatrix
+
+logger = logging.getLogger(__name__)
+
+# Grouping keys and the SERVICE_REQUEST columns they resolve to
+SERVICE_KEYS = {
+    'srvProvider': 'SR_EXPORTING_FACULTY',
+    'srvClient': 'SR_IMPORTING_FACULTY',
+    'sbjNo': 'FK_SUBJECT',
+    'term': 'FK_SEMESTER_PLANNING',
+}
 
 
 class ServiceRequestExtractor(DataExtractor):
     """Extract data for SERVICE_REQUEST table"""
     
+    def __init__(self):
+        # Kept after extract() for the inter-department service reports
+        self.matrix = None
+    
     @property
     def table_name(self) -> str:
         """Return the database table name this extractor targets"""
@@ -28,10 +46,27 @@ class ServiceRequestExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return ['SUBJECT', 'SEMESTER_PLANNING', 'DEPARTMENT']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['srvProvider', 'srvClient', 'sbjNo', 'term', 'lecNo', 'cntSchd', 'numSchd']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, subject: List[Dict[str, Any]], semester_planning: List[Dict[str, Any]], department: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for SERVICE_REQUEST table.
         
+        OfferedCourses holds one row per lecturer of an offering, so the
+        hours are counted per offering (sbjNo, term) first: the offering's
+        planned hours (numSchd) are counted once and split over its rows by
+        their scheduled share (cntSchd; equal parts when all are zero). The
+        shares of rows whose service provider differs from its client are
+        teaching one department delivers to another; they are summed in one
+        grouped aggregation per (provider, client, subject, term), with the
+        keys resolved to DEPARTMENT.D_NAME, SUBJECT.S_NR and
+        SEMESTER_PLANNING.SP_ID. Rows whose keys do not resolve are dropped.
+        The provider x client x term sums are kept as self.matrix (see
+        service_matrix).
+        
         Args:
         CSV Data:
             OfferedCourses: DataFrame loaded from OfferedCourses.csv
@@ -44,55 +79,54 @@ class ServiceRequestExtractor(DataExtractor):
         
         Returns:
             List of dictionaries representing SERVICE_REQUEST table records
-            
-        TODO: Implement your extraction logic here
-        Example structure:
-        ```python
-        records = []
-        for index, row in some_dataframe.iterrows():
-            record = {
-                'COLUMN_1': row['source_column_1'],
-                'COLUMN_2': row['source_column_2'],
-                # Add more columns as needed
-            }
-            records.append(record)
-        return records
-        ```
         """
-        # TODO: Replace this placeholder with your extraction logic
-        logger.warning(f"{self.__class__.__name__} is using placeholder implementation")
-        logger.info(f"Available parameters: {list(kwargs.keys()) if 'kwargs' in locals() else 'None'}")
+        services = self.distinct(OfferedCourses, list(SERVICE_KEYS) + ['lecNo', 'cntSchd', 'numSchd'], **kwargs)
+        services = services.dropna(subset=['sbjNo', 'term'])
         
-        # Placeholder implementation - replace with actual logic
-        records = []
+        # Each offering's planned hours once, split over its lecturer rows
+        scheduled = _hours(services['cntSchd'])
+        offering = [services['sbjNo'], services['term']]
+        offering_scheduled = scheduled.groupby(offering, observed=True).transform('sum')
+        offering_rows = scheduled.groupby(offering, observed=True).transform('size')
+        share = (scheduled / offering_scheduled).where(offering_scheduled > 0, 1.0 / offering_rows)
+        services = services.assign(SR_WEEKLY_HOURS=_hours(services['numSchd']) * share)
         
-        # Example: If you have a DataFrame parameter, process it
-        # Example using primary CSV: OfferedCourses
-        if 'OfferedCourses' in locals():
-            df = OfferedCourses
-            for index, row in df.iterrows():
-                # TODO: Replace with actual column mappings
-                record = {
-                    'ID': row.get('id', index),  # Replace 'id' with actual column
-                    'NAME': row.get('name', f'Record_{index}'),  # Replace with actual column
-                    # Add more columns based on your table schema
-                }
-                records.append(record)
-
+        provider, client = services['srvProvider'].astype(object), services['srvClient'].astype(object)
+        services = services[provider.notna() & client.notna() & (provider != client)]
+        
+        departments = as_columnar(department).unique('D_NAME')
+        mappings = {
+            'srvProvider': {name: name for name in departments},
+            'srvClient': {name: name for name in departments},
+            'sbjNo': {nr: nr for nr in as_columnar(subject).unique('S_NR')},
+            'term': as_columnar(semester_planning).mapping('SP_TERM', 'SP_ID'),
+        }
+        keys = pd.DataFrame({SERVICE_KEYS[column]: map_keys(services[column], mapping)
+                             for column, mapping in mappings.items()}, index=services.index)
+        keys['SR_WEEKLY_HOURS'] = services['SR_WEEKLY_HOURS']
         
-        # Example using dependency data: SUBJECT
-        if subject:
-            # Access dependency records for foreign key lookups
-            subject_lookup = {record['ID']: record for record in subject}
-            
-            # Example: Use dependency data in extraction logic
-            for index, row in some_dataframe.iterrows():
-                dependency_id = row.get('dependency_id')  # Replace with actual FK column
-                if dependency_id in subject_lookup:
-                    # Use dependency record data
-                    dep_record = subject_lookup[dependency_id]
-                    # TODO: Implement logic using dependency data
-                    pass
+        resolved = keys.dropna(subset=list(SERVICE_KEYS.values()))
+        if len(resolved) < len(keys):
+            logger.warning(f"{self.__class__.__name__}: {len(keys) - len(resolved)} of {len(keys)} "
+                           f"service rows reference unknown departments, subjects or terms")
+        grouped = (
+            resolved.groupby(list(SERVICE_KEYS.values()), sort=True)['SR_WEEKLY_HOURS'].sum()
+            .round(2).reset_index()
+        )
+        grouped['FK_SEMESTER_PLANNING'] = grouped['FK_SEMESTER_PLANNING'].astype('int64')
+        grouped.insert(0, 'SR_ID', range(1, len(grouped) + 1))
+        grouped['SR_STATUS'] = None
         
+        self.matrix = ServiceMatrix.from_frame(grouped)
+        
+        records = grouped[['SR_ID', 'FK_SUBJECT', 'FK_SEMESTER_PLANNING', 'SR_EXPORTING_FACULTY',
+                           'SR_IMPORTING_FACULTY', 'SR_WEEKLY_HOURS', 'SR_STATUS']].to_dict(orient='records')
         logger.info(f"{self.__class__.__name__} extracted {len(records)} records")
         return records
+
+
+def _hours(column: pd.Series) -> pd.Series:
+    """Numeric hours; exports may use a comma as decimal separator"""
+    if not pd.api.types.is_numeric_dtype(column):
+        column = column.astype(str).str.replace(',', '.', regex=False)
+    return pd.to_numeric(column, errors='coerce').fillna(0.0)
@@ -10,7 +10,6 @@ This extractor follows the DataExtractor contract for the database population sy
 Modify the extract() method to implement your specific business logic.
 """
 
-from tkinter.font import names
 import pandas as pd
 from typing import Dict, List, Any
 from base_extractor import DataExtractor
@@ -29,6 +28,11 @@ class StudyProgramExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return []
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['studyPrg', 'srvClient']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for STUDY_PROGRAM table.
@@ -57,6 +61,7 @@ class StudyProgramExtractor(DataExtractor):
         ```
         """
         studyPrograms = []
+        names = OfferedCourses['studyPrg'].dropna().unique()
         for name in names:
             if not name or pd.isna(name):
                 continue
@@ -64,6 +69,8 @@ class StudyProgramExtractor(DataExtractor):
             # Find most common department (srvClient) for this study program
             program_data = OfferedCourses[OfferedCourses['studyPrg'] == name]
             department_counts = program_data['srvClient'].value_counts()
+            # Categorical columns also count the categories that never occur
+            department_counts = department_counts[department_counts > 0]
             
             if len(department_counts) > 0:
                 most_common_dept = department_counts.index[0]
@@ -28,6 +28,11 @@ class SubjectExtractor(DataExtractor):
         """Return list of table names this extractor depends on"""
         return ['STUDY_PROGRAM']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['sbjNo', 'sbjName', 'sbjlevel', 'sbjNotes', 'elective', 'studyPrg', 'numCurr', 'numSchd']}
+    
     def extract(self, OfferedCourses: pd.DataFrame, study_program: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for SUBJECT table.
@@ -45,9 +50,9 @@ class SubjectExtractor(DataExtractor):
         """
             
         # Get relevant columns and remove duplicates
-        subjectsDF = OfferedCourses[[
+        subjectsDF = self.distinct(OfferedCourses, [
             'sbjNo', 'sbjName', 'sbjlevel', 'sbjNotes', 'elective', 'studyPrg', 'numCurr', 'numSchd'
-        ]].drop_duplicates()
+        ], **kwargs)
         
         def safe_numeric(value):
             """Convert numeric strings with comma decimal separator to float"""
@@ -67,9 +72,9 @@ class SubjectExtractor(DataExtractor):
             
             subject = {
                 'S_NR': str(row['sbjNo']),  # Primary key (not auto-increment)
-                'S_STUDY_RPOGRAM': str(row['studyPrg']) if not pd.isna(row['studyPrg']) else None,
+                'S_STUDY_PROGRAM': str(row['studyPrg']) if not pd.isna(row['studyPrg']) else None,
                 'S_NAME': str(row['sbjName']) if not pd.isna(row['sbjName']) else None,
-                'S_SEMESTER': int(row['sbjlevel']) if not pd.isna(row['sbjlevel']) else None,
+                'S_SEMESTER': int(float(row['sbjlevel'])) if not pd.isna(row['sbjlevel']) else None,
                 'S_STUPO_HOURS': safe_numeric(row['numCurr']),
                 'S_SCHEDULE_HOURS': safe_numeric(row['numSchd']),
                 'S_COMMENT': str(row['sbjNotes']) if not pd.isna(row['sbjNotes']) else None,
@@ -30,6 +30,11 @@ class TeacherExtractor(DataExtractor):
         """Return list of table names this extractor depends on, aka all foreign key references"""
         return ['DEPARTMENT']
     
+    @property
+    def source_columns(self) -> Dict[str, List[str]]:
+        """Return the CSV columns this extractor reads, per source"""
+        return {'OfferedCourses': ['lecNo', 'lec1stn', 'lecName', 'lecDept', 'lecNotes', 'isprof'], 'WorkLoad': []}
+    
     def extract(self, OfferedCourses: pd.DataFrame, WorkLoad: pd.DataFrame, **kwargs) -> List[Dict[str, Any]]:
         """
         Extract data for TEACHER table.
@@ -44,16 +49,16 @@ class TeacherExtractor(DataExtractor):
         Returns:
             List of dictionaries representing TEACHER table records
         """
-        teachersDF = OfferedCourses[[
+        teachersDF = self.distinct(OfferedCourses, [
             'lecNo', 'lec1stn', 'lecName', 'lecDept', 'lecNotes', 'isprof'
-        ]].drop_duplicates()
+        ], **kwargs)
             
         teachers = []
         for index, row in teachersDF.iterrows():
             if pd.isna(row['lecNo']):
                 continue
             teacher = {
-                'T_ID': int(row['lecNo']),
+                'T_ID': int(float(row['lecNo'])),
                 'T_NAME': str(row['lec1stn']) if not pd.isna(row['lec1stn']) else None,
                 'T_LASTNAME': str(row['lecName']) if not pd.isna(row['lecName']) else None,
                 'T_DEPARTMENT': str(row['lecDept']) if not pd.isna(row['lecDept']) else None,
@@ -61,5 +66,5 @@ class TeacherExtractor(DataExtractor):
                 'T_ISPROFESSOR': row['isprof'] == 'WAHR'
                 # Add more columns as needed
             }
-            teacher.append(teacher)
+            teachers.append(teacher)
         return teachers
@@ -17,7 +17,6 @@ python3 extractor_generator.py SUBJECT --csv OfferedCourses --deps STUDY_PROGRAM
 
 # 3. Level 2/3 - Zuordnungen und komplexe Planungsdaten
 python3 extractor_generator.py POSITION_PROFESSOR --csv WorkLoad --deps PROFESSOR,POSITION,SEMESTER_PLANNING
-python3 extractor_generator.py DEPUTAT_ACCOUNT --deps TEACHER,SEMESTER_PLANNING
 python3 extractor_generator.py OFFERING --csv OfferedCourses --deps SUBJECT,SEMESTER_PLANNING
 python3 extractor_generator.py SERVICE_REQUEST --csv OfferedCourses --deps SUBJECT,SEMESTER_PLANNING,DEPARTMENT
 python3 extractor_generator.py PROGRAMM_SUBJECT_REQUIREMENT --csv OfferedCourses --deps STUDY_PROGRAM,SUBJECT,SEMESTER_PLANNING
@@ -26,4 +25,7 @@ python3 extractor_generator.py PROGRAMM_SUBJECT_REQUIREMENT --csv OfferedCourses
 python3 extractor_generator.py OFFERING_ASSIGNMENT --csv OfferedCourses --deps OFFERING,TEACHER
 python3 extractor_generator.py COURSE --csv OfferedCourses --deps OFFERING,TEACHER,SUBJECT
 
+# 5. Level 5 - Deputatkonten aus Ist-Daten und Ermäßigungen
+python3 extractor_generator.py DEPUTAT_ACCOUNT --deps TEACHER,SEMESTER_PLANNING,COURSE,POSITION_PROFESSOR
+
 echo "--- Generierung abgeschlossen. Extractor-Dateien basierend auf dem ERD wurden erstellt. ---"
@@ -0,0 +1,207 @@
+"""
+Reference-counted, memory-budgeted store for extractor outputs.
+
+Every dependency output is only needed until its last consumer in the DAG
+has run (e.g. STUDY_PROGRAM only by SUBJECT and PROGRAMM_SUBJECT_REQUIREMENT).
+The OutputStore counts the remaining consumers of each output and drops it
+after the last one releases it. When the estimated size of the resident
+outputs exceeds the configured budget, the largest outputs are spilled to a
+compact on-disk format (column lists, pickled and zlib-compressed) and read
+back on demand. Term-scoped tables are spilled one file per term (see
+term_partitions), so a consumer asking for a single term reads only that
+partition.
+
+A retaining store (retain=True) ignores releases and keeps every output,
+which long-running modes such as watch mode use to re-run only some
+extractors against the outputs of the others.
+
+Outputs are stored as the populator puts them, normally as read-only
+ColumnarTables (extractors/columnar.py); spilled outputs are read back as
+ColumnarTables as well.
+"""
+
+import re
+import sys
+import zlib
+import pickle
+import shutil
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+# Records sampled to estimate the size of an output
+SIZE_SAMPLE = 100
+
+SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like '512M', '2G' or '1048576' into bytes"""
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*$', str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def estimate_size(records: List[Dict[str, Any]]) -> int:
+    """Estimate the memory held by a list of record dicts (or a ColumnarTable) from a sample"""
+    if hasattr(records, 'nbytes'):
+        return records.nbytes
+    if not records:
+        return sys.getsizeof(records)
+    step = max(len(records) // SIZE_SAMPLE, 1)
+    sample = records[::step][:SIZE_SAMPLE]
+    per_record = sum(
+        sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values()) for r in sample
+    ) / len(sample)
+    return int(sys.getsizeof(records) + per_record * len(records))
+
+
+def encode_records(records: List[Dict[str, Any]]) -> bytes:
+    """Columnar, compressed serialization of a record list"""
+    columns: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    names = list(columns)
+    payload = (names, [[record.get(name) for record in records] for name in names], len(records))
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def decode_records(data: bytes) -> List[Dict[str, Any]]:
+    names, values, count = pickle.loads(zlib.decompress(data))
+    if not names:
+        return [{} for _ in range(count)]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+class OutputStore:
+    """
+    Holds extractor outputs until their last consumer is done.
+
+    Thread-safe: worker threads read outputs while the coordinating thread
+    puts and releases them.
+    """
+
+    def __init__(self, consumers: Dict[str, int], budget_bytes: Optional[int] = None,
+                 spill_dir: Optional[str] = None, retain: bool = False):
+        self._remaining = dict(consumers)
+        self.retain = retain
+        self.budget_bytes = budget_bytes
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[Path] = None
+        self._resident: Dict[str, List[Dict[str, Any]]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Set[str] = set()
+        self._cache = None
+        self._resolver = None
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.peak_bytes = 0
+        self.spill_count = 0
+
+    def put(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """Keep an output for its consumers (outputs without consumers are not kept)"""
+        with self._lock:
+            if not self.retain and self._remaining.get(table, 0) <= 0:
+                return
+            self._discard(table)
+            if table == 'SEMESTER_PLANNING':
+                from term_partitions import TermResolver
+                self._resolver = TermResolver.from_records(records)
+            size = estimate_size(records)
+            self._resident[table] = records
+            self._sizes[table] = size
+            self.current_bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+            self._enforce_budget(keep=table)
+
+    def get(self, table: str, terms: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Return an output, reading it back from disk if it was spilled.
+
+        Args:
+            terms: Only the rows of these terms (term-scoped tables only);
+                of a spilled table only these partitions are read
+        """
+        from term_partitions import partition_records, partition_name
+        from columnar import ColumnarTable
+
+        with self._lock:
+            records = self._resident.get(table)
+            spilled = table in self._spilled
+            resolver = self._resolver
+        if records is not None:
+            if terms is None:
+                return records
+            partitions = partition_records(table, records, resolver)
+            return ColumnarTable.from_records(
+                [r for term in dict.fromkeys(map(partition_name, terms)) for r in partitions.get(term, [])])
+        if not spilled:
+            raise KeyError(f"No output stored for {table}")
+        return ColumnarTable.from_records(self._cache.read(table, terms))
+
+    def __contains__(self, table: str) -> bool:
+        with self._lock:
+            return table in self._resident or table in self._spilled
+
+    def release(self, table: str) -> None:
+        """One consumer of table is done; drop the output after the last one"""
+        with self._lock:
+            if self.retain or table not in self._remaining:
+                return
+            self._remaining[table] -= 1
+            if self._remaining[table] > 0:
+                return
+            del self._remaining[table]
+            self._discard(table)
+            logger.debug(f"Released output of {table}")
+
+    def close(self) -> None:
+        """Drop everything and remove the spill directory"""
+        with self._lock:
+            self._resident.clear()
+            self._spilled.clear()
+            self.current_bytes = 0
+            self._cache = None
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    def _discard(self, table: str) -> None:
+        if table in self._resident:
+            del self._resident[table]
+            self.current_bytes -= self._sizes.pop(table)
+        if table in self._spilled:
+            self._spilled.discard(table)
+            self._cache.drop(table)
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Spill the largest resident outputs until the budget is met"""
+        if self.budget_bytes is None:
+            return
+        while self.current_bytes > self.budget_bytes:
+            candidates = [t for t in self._resident if t != keep] or [keep]
+            table = max(candidates, key=lambda t: self._sizes[t])
+            self._spill(table)
+            if table == keep:
+                break
+
+    def _spill(self, table: str) -> None:
+        from term_partitions import PartitionedRecordCache
+
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix='populator-spill-', dir=self._spill_root))
+            self._cache = PartitionedRecordCache(self._spill_dir)
+        self._cache.resolver = self._resolver or self._cache.resolver
+        partitions = self._cache.write_table(table, self._resident.pop(table))
+        self._spilled.add(table)
+        self.current_bytes -= self._sizes.pop(table)
+        self.spill_count += 1
+        size = sum(path.stat().st_size for path in (self._spill_dir / table).glob('*.bin'))
+        logger.info(f"Spilled output of {table} to {self._spill_dir / table} "
+                    f"({len(partitions)} partitions, {size / 1024:.0f} KiB)")
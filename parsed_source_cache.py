@@ -0,0 +1,102 @@
+"""
+On-disk cache of parsed CSV sources.
+
+Parsing (and, for .gz/.zst exports, decompressing) the sources dominates
+the start of every run although the exports rarely change. The cache
+stores the parsed DataFrame of every (source file, column selection) as a
+pickle, keyed by a fingerprint of the file's bytes as delivered, i.e. of
+the compressed archive. An unchanged archive is therefore never
+decompressed or parsed again; a changed one simply misses the cache.
+
+Fingerprints are memoized per (path, size, mtime) within the process, so
+lazily loaded columns of the same source do not re-hash the file.
+"""
+
+import json
+import pickle
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSE_CACHE_DIR = '.populator/parsed'
+
+# Bump when the parsing options change, so old entries are not reused
+CACHE_VERSION = 1
+
+
+class ParsedSourceCache:
+    """Pickled parse results keyed by source fingerprint and column selection"""
+
+    def __init__(self, root: str = DEFAULT_PARSE_CACHE_DIR):
+        self.root = Path(root)
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def fingerprint(self, path: Path, chunk_size: int = 1 << 20) -> str:
+        """SHA-1 of the file bytes as stored (compressed sources are not decompressed)"""
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._fingerprints.get(memo_key)
+        if cached is not None:
+            return cached
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        with self._lock:
+            self._fingerprints[memo_key] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def get(self, name: str, path: Path, options: Dict[str, Any]):
+        """Return the cached parse of path with options, or None"""
+        entry = self._entry_path(name, path, options)
+        try:
+            with open(entry, 'rb') as handle:
+                frame = pickle.load(handle)
+        except FileNotFoundError:
+            self.stats['misses'] += 1
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Discarding unreadable parse cache entry {entry.name}: {e}")
+            entry.unlink(missing_ok=True)
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        logger.debug(f"Parse cache hit for {path.name} ({entry.name})")
+        return frame
+
+    def put(self, name: str, path: Path, options: Dict[str, Any], frame) -> None:
+        """Store a parse result and drop the entries of older versions of the source"""
+        entry = self._entry_path(name, path, options)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_name(f".{entry.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as handle:
+            pickle.dump(frame, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(entry)
+
+        fingerprint = entry.name.split('-')[1]
+        for stale in entry.parent.glob(f"{name}-*.pkl"):
+            if stale.name.split('-')[1] != fingerprint:
+                stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for entry in self.root.glob('*/*.pkl'):
+            entry.unlink(missing_ok=True)
+
+    def _entry_path(self, name: str, path: Path, options: Dict[str, Any]) -> Path:
+        selection = json.dumps({'version': CACHE_VERSION, 'file': path.name, 'options': options},
+                               sort_keys=True, default=str)
+        selection_hash = hashlib.sha1(selection.encode('utf-8')).hexdigest()[:12]
+        # One directory per data directory, so datasets of a batch do not evict each other
+        directory = hashlib.sha1(str(path.parent.resolve()).encode('utf-8')).hexdigest()[:12]
+        return self.root / directory / f"{name}-{self.fingerprint(path)[:16]}-{selection_hash}.pkl"
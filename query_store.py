@@ -0,0 +1,264 @@
+"""
+In-memory indexed query store over the extracted Planning_Tool tables.
+
+Builds a read-only store from the extractor outputs (table name -> list of
+record dicts) with hash indexes on the primary and foreign keys declared in
+the schema (the cached model of dbschema/schema.dbs, see schema_model), plus
+composite secondary indexes on (teacher, term) and (subject, term). Point
+lookups are single dict probes; range lookups use lazily built sorted
+indexes and bisection, so neither ever scans a table.
+Service hours between departments are read from a provider x client x
+term matrix (extractors/service_matrix.py) built once from SERVICE_REQUEST,
+program requirements from a sparse index (extractors/requirement_index.py),
+term order and ranges from the term calendar (term_calendar.py).
+
+Example:
+    store = QueryStore(results)
+    store.teacher_load(86, 'WS1516')
+    store.offerings_of_subject('1051001-SWB')
+    store.service_hours('G', 'IT')
+    store.required_subjects('SWB', 'WS1516')
+    store.last_terms(2)
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Mapping
+from schema_model import SchemaModel, load_schema
+
+logger = logging.getLogger(__name__)
+
+# Composite secondary indexes: name -> (table, columns)
+SECONDARY_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'course_by_teacher_term': ('COURSE', ('C_TEACHER', 'C_SEMESTER')),
+    'course_by_subject_term': ('COURSE', ('C_SUBJECT', 'C_SEMESTER')),
+    'offering_by_subject_term': ('OFFERING', ('FK_SUBJECT', 'FK_SEMESTER_PLANNING')),
+    'account_by_teacher_term': ('DEPUTAT_ACCOUNT', ('FK_TEACHER', 'FK_SEMESTER_PLANNING')),
+    'service_by_provider_client': ('SERVICE_REQUEST', ('SR_EXPORTING_FACULTY', 'SR_IMPORTING_FACULTY')),
+}
+
+
+class HashIndex:
+    """Immutable hash index mapping a key (scalar or tuple) to row positions"""
+
+    def __init__(self, rows: List[Mapping[str, Any]], columns: Tuple[str, ...]):
+        self.columns = columns
+        buckets: Dict[Any, List[int]] = {}
+        if len(columns) == 1:
+            column = columns[0]
+            for position, row in enumerate(rows):
+                buckets.setdefault(row.get(column), []).append(position)
+        else:
+            for position, row in enumerate(rows):
+                buckets.setdefault(tuple(row.get(c) for c in columns), []).append(position)
+        self._buckets = {key: tuple(positions) for key, positions in buckets.items()}
+
+    def positions(self, key: Any) -> Tuple[int, ...]:
+        return self._buckets.get(key, ())
+
+    def keys(self) -> Iterable[Any]:
+        return self._buckets.keys()
+
+
+class SortedIndex:
+    """Sorted column index for range lookups via bisection (None values are skipped)"""
+
+    def __init__(self, rows: List[Mapping[str, Any]], column: str):
+        pairs = sorted(
+            ((row.get(column), position) for position, row in enumerate(rows) if row.get(column) is not None),
+            key=lambda pair: pair[0]
+        )
+        self._keys = [key for key, _ in pairs]
+        self._positions = [position for _, position in pairs]
+
+    def positions(self, low: Any = None, high: Any = None) -> List[int]:
+        """Return row positions with low <= key <= high (open bounds when None)"""
+        start = 0 if low is None else bisect_left(self._keys, low)
+        stop = len(self._keys) if high is None else bisect_right(self._keys, high)
+        return self._positions[start:stop]
+
+
+class QueryStore:
+    """
+    Read-only, indexed view over one populator run.
+
+    Records are frozen into read-only mappings; all lookups return tuples of
+    these mappings and never copy the underlying data.
+    """
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]], schema: Optional[SchemaModel] = None):
+        """
+        Args:
+            tables: Table name -> extracted records
+            schema: Schema the key indexes are taken from (default: load_schema())
+        """
+        schema = schema if schema is not None else load_schema()
+        self.primary_keys: Dict[str, Tuple[str, ...]] = {
+            name: tuple(columns) for name, columns in schema.primary_keys().items()}
+        self.foreign_keys: Dict[str, Tuple[str, ...]] = {
+            name: tuple(columns) for name, columns in schema.foreign_key_columns().items()}
+        self._rows: Dict[str, List[Mapping[str, Any]]] = {
+            name: [MappingProxyType(dict(record)) for record in records]
+            for name, records in tables.items()
+        }
+        self._pk: Dict[str, HashIndex] = {}
+        self._fk: Dict[Tuple[str, str], HashIndex] = {}
+        self._secondary: Dict[str, HashIndex] = {}
+        self._sorted: Dict[Tuple[str, str], SortedIndex] = {}
+        self._service_matrix = None
+        self._requirement_index = None
+
+        for name, rows in self._rows.items():
+            if name in self.primary_keys:
+                self._pk[name] = HashIndex(rows, self.primary_keys[name])
+            for column in self.foreign_keys.get(name, ()):
+                self._fk[(name, column)] = HashIndex(rows, (column,))
+
+        for index_name, (name, columns) in SECONDARY_INDEXES.items():
+            if name in self._rows:
+                self._secondary[index_name] = HashIndex(self._rows[name], columns)
+
+        # Terms appear as codes (COURSE.C_SEMESTER) and as SP_IDs (FK columns)
+        semesters = self._rows.get('SEMESTER_PLANNING', [])
+        self._term_to_id = {sem.get('SP_TERM'): sem.get('SP_ID') for sem in semesters}
+        self._id_to_term = {sp_id: term for term, sp_id in self._term_to_id.items()}
+        self._calendar = None
+
+        logger.info(f"QueryStore indexed {sum(len(r) for r in self._rows.values())} records "
+                    f"in {len(self._rows)} tables")
+
+    # ------------------------------------------------------------------
+    # Generic lookups
+    # ------------------------------------------------------------------
+
+    def tables(self) -> List[str]:
+        return sorted(self._rows)
+
+    def count(self, table: str) -> int:
+        return len(self._rows.get(table, ()))
+
+    def get(self, table: str, *key: Any) -> Optional[Mapping[str, Any]]:
+        """
+        Point lookup by primary key; composite keys are passed positionally.
+
+        Raises:
+            KeyError: If the table has no primary key index
+            ValueError: If several rows share the key (the extracted table
+                violates its primary key)
+        """
+        index = self._pk.get(table)
+        if index is None:
+            raise KeyError(f"No primary key index for table {table}")
+        key = key[0] if len(key) == 1 else tuple(key)
+        positions = index.positions(key)
+        if len(positions) > 1:
+            raise ValueError(f"Primary key {key!r} of {table} is not unique ({len(positions)} rows)")
+        return self._rows[table][positions[0]] if positions else None
+
+    def where(self, table: str, column: str, value: Any) -> Tuple[Mapping[str, Any], ...]:
+        """Equality lookup on an indexed primary or foreign key column"""
+        index = self._fk.get((table, column))
+        if index is None:
+            pk = self._pk.get(table)
+            if pk is None or pk.columns != (column,):
+                raise KeyError(f"Column {table}.{column} is not indexed")
+            index = pk
+        return self._take(table, index.positions(value))
+
+    def range(self, table: str, column: str, low: Any = None, high: Any = None) -> Tuple[Mapping[str, Any], ...]:
+        """Range lookup low <= column <= high on any column (index built on first use)"""
+        if table not in self._rows:
+            raise KeyError(f"Unknown table {table}")
+        index = self._sorted.get((table, column))
+        if index is None:
+            index = self._sorted[(table, column)] = SortedIndex(self._rows[table], column)
+        return self._take(table, index.positions(low, high))
+
+    def secondary(self, index_name: str, *key: Any) -> Tuple[Mapping[str, Any], ...]:
+        """Lookup on one of the composite SECONDARY_INDEXES"""
+        index = self._secondary.get(index_name)
+        if index is None:
+            raise KeyError(f"Unknown secondary index {index_name}")
+        table = SECONDARY_INDEXES[index_name][0]
+        return self._take(table, index.positions(tuple(key)))
+
+    # ------------------------------------------------------------------
+    # Planner queries
+    # ------------------------------------------------------------------
+
+    def teacher_load(self, teacher_id: int, term: Any) -> float:
+        """Credited hours of a teacher in a term (term as code or SP_ID)"""
+        courses = self.secondary('course_by_teacher_term', teacher_id, self.term_code(term))
+        return float(sum(c.get('C_CREDITED_HOURS') or 0.0 for c in courses))
+
+    def courses_of_teacher(self, teacher_id: int, term: Any = None) -> Tuple[Mapping[str, Any], ...]:
+        if term is None:
+            return self.where('COURSE', 'C_TEACHER', teacher_id)
+        return self.secondary('course_by_teacher_term', teacher_id, self.term_code(term))
+
+    def offerings_of_subject(self, subject: Any, term: Any = None) -> Tuple[Mapping[str, Any], ...]:
+        """
+        All offerings of a subject, optionally restricted to one term.
+
+        subject is the subject number (SUBJECT.S_NR), which OFFERING.FK_SUBJECT
+        references; a SUBJECT record is accepted as well.
+        """
+        if isinstance(subject, Mapping):
+            subject = subject['S_NR']
+        if term is None:
+            return self.where('OFFERING', 'FK_SUBJECT', subject)
+        return self.secondary('offering_by_subject_term', subject, self.term_id(term))
+
+    def service_hours(self, provider: str, client: str, term: Any = None) -> float:
+        """Weekly service hours the provider department delivers to the client department"""
+        return self.service_matrix.hours(provider, client, None if term is None else self.term_id(term))
+
+    @property
+    def service_matrix(self):
+        """Provider x client x term service hours (see service_matrix), built on first use"""
+        if self._service_matrix is None:
+            from service_matrix import ServiceMatrix
+            self._service_matrix = ServiceMatrix.from_records(self._rows.get('SERVICE_REQUEST', []))
+        return self._service_matrix
+
+    def required_subjects(self, program: str, term: Any) -> Tuple[Any, ...]:
+        """Subjects (S_NR) the study program requires in a term (term as code or SP_ID)"""
+        return self.requirement_index.subjects(program, self.term_id(term))
+
+    def requiring_programs(self, subject: Any, term: Any) -> Tuple[Any, ...]:
+        """Study programs requiring a subject in a term (term as code or SP_ID)"""
+        return self.requirement_index.programs(subject, self.term_id(term))
+
+    @property
+    def requirement_index(self):
+        """Sparse program x subject x term index (see requirement_index), built on first use"""
+        if self._requirement_index is None:
+            from requirement_index import RequirementIndex
+            self._requirement_index = RequirementIndex.from_records(
+                self._rows.get('PROGRAMM_SUBJECT_REQUIREMENT', []))
+        return self._requirement_index
+
+    def last_terms(self, count: int, until: Any = None) -> List[Any]:
+        """SP_IDs of the count latest terms up to until (code or SP_ID; default: the latest term)"""
+        return self.calendar.last(count, None if until is None else self.term_id(until))
+
+    @property
+    def calendar(self):
+        """Chronological SEMESTER_PLANNING terms (see term_calendar), built on first use"""
+        if self._calendar is None:
+            from term_calendar import TermCalendar
+            self._calendar = TermCalendar.from_records(self._rows.get('SEMESTER_PLANNING', []))
+        return self._calendar
+
+    def term_id(self, term: Any) -> Any:
+        """Resolve a term code to its SP_ID (SP_IDs pass through)"""
+        return self._term_to_id.get(term, term)
+
+    def term_code(self, term: Any) -> Any:
+        """Resolve an SP_ID to its term code (codes pass through)"""
+        return self._id_to_term.get(term, term)
+
+    def _take(self, table: str, positions: Iterable[int]) -> Tuple[Mapping[str, Any], ...]:
+        rows = self._rows[table]
+        return tuple(rows[p] for p in positions)
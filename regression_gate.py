@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Performance-Regression Gate
+
+Runs two implementations of extractors on the same synthetic input and
+checks that they produce the same rows and that the candidate is not
+slower or hungrier than the stored baseline.
+
+An implementation is given as one of:
+- a git revision (e.g. HEAD~1, main): the extractors folder at that revision
+- a directory: an extractors folder
+- FILE.py[:Class]: a single extractor module replacing the table's extractor
+  in the working extractors folder (to compare two implementations side by side)
+
+Every implementation runs in its own Python process, so modules of equal
+names from different revisions never mix and the memory numbers are not
+polluted by the other side.
+
+Architecture:
+- ImplementationSpec: Parses and materializes an implementation (Strategy Pattern)
+- diff_records: Order-insensitive, rounding-tolerant row comparison
+- BaselineStore: Stored per-row timings and peak memory per table
+- RegressionGate: Runs both sides and applies the thresholds (Facade Pattern)
+- RegressionGateCLI: User interface with validation (Command Pattern)
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import pickle
+import tarfile
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE_PATH = '.populator/regression_baseline.json'
+DEFAULT_ROWS = 20_000
+DEFAULT_REPEAT = 3
+
+
+@dataclass
+class ImplementationSpec:
+    """One side of a comparison"""
+    kind: str  # 'revision', 'folder' or 'module'
+    value: str
+    class_name: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> 'ImplementationSpec':
+        path_part, _, class_name = spec.partition(':')
+        if path_part.endswith('.py'):
+            if not Path(path_part).is_file():
+                raise ValueError(f"Extractor module not found: {path_part}")
+            return cls('module', str(Path(path_part).resolve()), class_name or None)
+        if Path(spec).is_dir():
+            return cls('folder', str(Path(spec).resolve()))
+        return cls('revision', spec)
+
+    def materialize(self, extractors_folder: str, workdir: Path) -> Tuple[str, Optional[str]]:
+        """
+        Return (extractors folder, override module) for this implementation.
+
+        Revisions are exported with git archive into workdir.
+        """
+        if self.kind == 'folder':
+            return self.value, None
+        if self.kind == 'module':
+            return str(Path(extractors_folder).resolve()), self.value
+
+        folder = Path(extractors_folder).resolve()
+        toplevel = Path(self._git('rev-parse', '--show-toplevel').strip())
+        relative = folder.relative_to(toplevel).as_posix()
+        target = workdir / self.value.replace('/', '_').replace('~', '-').replace('^', '-')
+        target.mkdir(parents=True, exist_ok=True)
+        archive = subprocess.run(['git', 'archive', '--format=tar', self.value, relative],
+                                 cwd=toplevel, capture_output=True, check=False)
+        if archive.returncode != 0:
+            raise ValueError(f"Cannot export {relative} at {self.value}: {archive.stderr.decode().strip()}")
+        with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+            tar.extractall(target, filter='data')
+        return str(target / relative), None
+
+    def __str__(self) -> str:
+        return self.value + (f":{self.class_name}" if self.class_name else '')
+
+    @staticmethod
+    def _git(*args: str) -> str:
+        return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout
+
+
+@dataclass
+class TableMeasurement:
+    """Output and cost of one table on one side"""
+    table_name: str
+    records: List[Dict[str, Any]]
+    seconds: float
+    peak_bytes: int
+    input_rows: int
+    error: Optional[str] = None
+
+    @property
+    def rate(self) -> float:
+        """Seconds per input row"""
+        return self.seconds / max(self.input_rows, 1)
+
+
+# ----------------------------------------------------------------------
+# Worker (runs in a separate process per implementation)
+# ----------------------------------------------------------------------
+
+def _load_override(module_path: str, class_name: Optional[str], table_name: str):
+    import importlib.util
+    import inspect
+
+    spec = importlib.util.spec_from_file_location(f"candidate_{Path(module_path).stem}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    base_class = sys.modules['base_extractor'].DataExtractor
+    for name, cls in inspect.getmembers(module, inspect.isclass):
+        if not issubclass(cls, base_class) or cls is base_class or inspect.isabstract(cls):
+            continue
+        if class_name and name != class_name:
+            continue
+        extractor = cls()
+        if extractor.table_name == table_name:
+            return extractor
+        if class_name:
+            raise ValueError(f"{class_name} in {module_path} extracts {extractor.table_name}, not {table_name}")
+    raise ValueError(f"No extractor for {table_name} in {module_path}")
+
+
+def run_worker(extractors_folder: str, override: Optional[str], class_name: Optional[str],
+               tables: List[str], rows: int, repeat: int, seed: int, data_dir: str) -> Dict[str, TableMeasurement]:
+    """Run the requested tables (and their dependencies) of one implementation"""
+    import inspect
+    from extractor_benchmark import synthetic_sources
+    from extractor_dag import ExtractorGraph
+    from simple_db_populator import ExtractorRegistry
+
+    extractors = ExtractorRegistry(extractors_folder).discover()
+    if override:
+        for table in tables:
+            extractors[table] = _load_override(override, class_name, table)
+    graph = ExtractorGraph({t: e.dependencies for t, e in extractors.items()})
+    sources = synthetic_sources(data_dir, rows, seed)
+    needed = graph.ancestors(tables) | set(tables)
+
+    outputs: Dict[str, List[Dict[str, Any]]] = {}
+    measurements: Dict[str, TableMeasurement] = {}
+    for table in graph.topological_order():
+        if table not in needed:
+            continue
+        extractor = extractors[table]
+        missing = [dep for dep in extractor.dependencies if dep not in outputs]
+        if missing:
+            if table in tables:
+                measurements[table] = TableMeasurement(table, [], 0.0, 0, 0,
+                                                       f"dependency failed: {', '.join(missing)}")
+            continue
+        kwargs = dict(sources)
+        kwargs.update({dep.lower(): outputs[dep] for dep in extractor.dependencies})
+        parameters = inspect.signature(extractor.extract).parameters
+        input_rows = sum(len(sources[n]) for n in ([n for n in sources if n in parameters] or sources))
+        try:
+            if table not in tables:
+                outputs[table] = extractor.extract(**kwargs)
+                continue
+            timings = []
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                records = extractor.extract(**kwargs)
+                timings.append(time.perf_counter() - started)
+            tracemalloc.start()
+            extractor.extract(**kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            if table in tables:
+                measurements[table] = TableMeasurement(table, [], 0.0, 0, input_rows, str(e))
+            continue
+        outputs[table] = records
+        measurements[table] = TableMeasurement(table, records, min(timings), peak, input_rows)
+    return measurements
+
+
+# ----------------------------------------------------------------------
+# Output comparison
+# ----------------------------------------------------------------------
+
+def normalize_value(value: Any, decimals: int) -> Any:
+    """Comparable form of a value: native scalars, NaN as None, floats rounded"""
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        value = round(value, decimals)
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def normalize_record(record: Dict[str, Any], decimals: int, ignore: Tuple[str, ...] = ()) -> Tuple:
+    return tuple(sorted((k, normalize_value(v, decimals)) for k, v in record.items() if k not in ignore))
+
+
+@dataclass
+class RecordDiff:
+    """Multiset difference between two outputs"""
+    only_base: List[Tuple] = field(default_factory=list)
+    only_candidate: List[Tuple] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return not self.only_base and not self.only_candidate
+
+
+def diff_records(base: List[Dict[str, Any]], candidate: List[Dict[str, Any]], decimals: int = 2,
+                 ignore: Tuple[str, ...] = ()) -> RecordDiff:
+    """Compare two record lists ignoring row order and rounding below decimals"""
+    base_rows = Counter(normalize_record(r, decimals, ignore) for r in base)
+    candidate_rows = Counter(normalize_record(r, decimals, ignore) for r in candidate)
+    return RecordDiff(
+        only_base=sorted((base_rows - candidate_rows).elements(), key=repr),
+        only_candidate=sorted((candidate_rows - base_rows).elements(), key=repr),
+    )
+
+
+# ----------------------------------------------------------------------
+# Baseline
+# ----------------------------------------------------------------------
+
+class BaselineStore:
+    """JSON file with the accepted per-row timing and peak memory per table"""
+
+    def __init__(self, path: str = DEFAULT_BASELINE_PATH):
+        self.path = Path(path)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8')).get('tables', {})
+        except FileNotFoundError:
+            return {}
+
+    def update(self, measurements: Dict[str, TableMeasurement], spec: str) -> None:
+        tables = self.load()
+        for table, m in measurements.items():
+            if m.error:
+                continue
+            tables[table] = {
+                'rate': m.rate,
+                'peak_bytes_per_row': m.peak_bytes / max(m.input_rows, 1),
+                'input_rows': m.input_rows,
+                'implementation': spec,
+                'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write next to the baseline and swap it in, so an interrupted update keeps the old file
+        with tempfile.NamedTemporaryFile('w', dir=self.path.parent, prefix=f'.{self.path.name}.',
+                                         suffix='.tmp', delete=False, encoding='utf-8') as handle:
+            handle.write(json.dumps({'tables': tables}, indent=2, sort_keys=True))
+        os.replace(handle.name, self.path)
+
+
+# ----------------------------------------------------------------------
+# Gate
+# ----------------------------------------------------------------------
+
+@dataclass
+class TableVerdict:
+    table_name: str
+    problems: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.problems
+
+
+class RegressionGate:
+    """
+    Compares a candidate implementation against a base implementation.
+
+    Facade over the worker processes, the output diff and the baseline.
+    """
+
+    def __init__(self, base: ImplementationSpec, candidate: ImplementationSpec,
+                 extractors_folder: str = 'extractors', data_dir: str = 'data',
+                 rows: int = DEFAULT_ROWS, repeat: int = DEFAULT_REPEAT, seed: int = 0,
+                 decimals: int = 2, ignore_columns: Tuple[str, ...] = (),
+                 max_slowdown: float = 1.10, max_memory_growth: float = 1.25,
+                 min_seconds: float = 0.01, baseline: Optional[BaselineStore] = None):
+        self.base = base
+        self.candidate = candidate
+        self.extractors_folder = extractors_folder
+        self.data_dir = str(Path(data_dir).resolve())
+        self.rows = rows
+        self.repeat = repeat
+        self.seed = seed
+        self.decimals = decimals
+        self.ignore_columns = tuple(ignore_columns)
+        self.max_slowdown = max_slowdown
+        self.max_memory_growth = max_memory_growth
+        self.min_seconds = min_seconds
+        self.baseline = baseline
+
+    def run(self, tables: List[str]) -> Tuple[List[TableVerdict], Dict[str, TableMeasurement]]:
+        with tempfile.TemporaryDirectory(prefix='regression-gate-') as workdir:
+            base = self._measure(self.base, tables, Path(workdir))
+            candidate = self._measure(self.candidate, tables, Path(workdir))
+
+        stored = self.baseline.load() if self.baseline else {}
+        verdicts = [self._judge(t, base.get(t), candidate.get(t), stored.get(t)) for t in tables]
+        return verdicts, candidate
+
+    def _judge(self, table: str, base: Optional[TableMeasurement], candidate: Optional[TableMeasurement],
+               stored: Optional[Dict[str, Any]]) -> TableVerdict:
+        verdict = TableVerdict(table)
+        for side, m in (('base', base), ('candidate', candidate)):
+            if m is None:
+                verdict.problems.append(f"no {table} extractor in {side}")
+            elif m.error:
+                verdict.problems.append(f"{side} failed: {m.error}")
+        if not verdict.passed:
+            return verdict
+
+        diff = diff_records(base.records, candidate.records, self.decimals, self.ignore_columns)
+        if not diff.identical:
+            verdict.problems.append(
+                f"outputs differ: {len(diff.only_base)} rows only in base, "
+                f"{len(diff.only_candidate)} only in candidate")
+            for row in diff.only_base[:3]:
+                verdict.notes.append(f"- {dict(row)}")
+            for row in diff.only_candidate[:3]:
+                verdict.notes.append(f"+ {dict(row)}")
+
+        # Without a stored baseline the base implementation is the reference
+        reference_rate = stored['rate'] if stored else base.rate
+        reference_memory = (stored['peak_bytes_per_row'] * candidate.input_rows if stored else base.peak_bytes)
+        source = 'stored baseline' if stored else 'base'
+        slowdown = candidate.rate / reference_rate if reference_rate > 0 else 1.0
+        growth = candidate.peak_bytes / reference_memory if reference_memory > 0 else 1.0
+        verdict.notes.append(
+            f"time {candidate.seconds * 1000:.1f} ms (base {base.seconds * 1000:.1f} ms), "
+            f"{slowdown:.2f}x {source}; peak memory {candidate.peak_bytes / 1024:.0f} KiB "
+            f"(base {base.peak_bytes / 1024:.0f} KiB), {growth:.2f}x {source}")
+        if candidate.seconds < self.min_seconds:
+            verdict.notes.append(f"below {self.min_seconds * 1000:.0f} ms, timing not gated (raise --rows)")
+        elif slowdown > self.max_slowdown:
+            verdict.problems.append(f"slower than {source}: {slowdown:.2f}x > {self.max_slowdown:.2f}x")
+        if growth > self.max_memory_growth:
+            verdict.problems.append(f"more memory than {source}: {growth:.2f}x > {self.max_memory_growth:.2f}x")
+        return verdict
+
+    def _measure(self, spec: ImplementationSpec, tables: List[str], workdir: Path) -> Dict[str, TableMeasurement]:
+        """Run one implementation in a fresh interpreter and collect its measurements"""
+        folder, override = spec.materialize(self.extractors_folder, workdir)
+        handle, result_path = tempfile.mkstemp(suffix='.pickle', dir=workdir)
+        os.close(handle)
+        result_path = Path(result_path)
+        command = [sys.executable, str(Path(__file__).resolve()), '_worker',
+                   '--extractors-folder', folder, '--rows', str(self.rows), '--repeat', str(self.repeat),
+                   '--seed', str(self.seed), '--data-dir', self.data_dir, '--output', str(result_path)]
+        if override:
+            command += ['--override', override]
+        if spec.class_name:
+            command += ['--class-name', spec.class_name]
+        command += tables
+
+        logger.info(f"Running {', '.join(tables)} with {spec}")
+        completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{spec} worker failed:\n{completed.stderr.strip()[-2000:]}")
+        with open(result_path, 'rb') as handle:
+            return {table: TableMeasurement(**fields) for table, fields in pickle.load(handle).items()}
+
+
+class RegressionGateCLI:
+    """
+    Command-line interface for the regression gate.
+    Implements Command Pattern with comprehensive validation.
+    """
+
+    def run(self, argv: Optional[List[str]] = None) -> int:
+        """Main entry point that returns exit code"""
+        argv = list(sys.argv[1:] if argv is None else argv)
+        if argv and argv[0] == '_worker':
+            return self._worker(argv[1:])
+        try:
+            args = self._parse_arguments(argv)
+            return self._compare(args)
+        except Exception as e:
+            logger.error(f"CLI error: {str(e)}")
+            print(f"\n💥 Error: {str(e)}")
+            return 2
+
+    def _compare(self, args: argparse.Namespace) -> int:
+        base = ImplementationSpec.parse(args.base)
+        candidate = ImplementationSpec.parse(args.candidate)
+        tables = [t.strip().upper() for t in args.tables.split(',')] if args.tables else self._all_tables(args)
+        baseline = BaselineStore(args.baseline)
+        gate = RegressionGate(
+            base, candidate, args.extractors_folder, args.data_dir, rows=args.rows, repeat=args.repeat,
+            seed=args.seed, decimals=args.decimals,
+            ignore_columns=tuple(c.strip() for c in args.ignore_columns.split(',')) if args.ignore_columns else (),
+            max_slowdown=args.max_slowdown, max_memory_growth=args.max_memory_growth,
+            min_seconds=args.min_seconds, baseline=None if args.ignore_baseline else baseline
+        )
+        verdicts, measurements = gate.run(tables)
+
+        print("\n" + "=" * 60)
+        print(f"REGRESSION GATE: {base} -> {candidate} ({args.rows} synthetic rows per source)")
+        print("=" * 60)
+        for verdict in verdicts:
+            print(f"  {'✓' if verdict.passed else '❌'} {verdict.table_name}")
+            for problem in verdict.problems:
+                print(f"      {problem}")
+            for note in verdict.notes:
+                print(f"      {note}")
+        print("=" * 60)
+
+        passed = all(v.passed for v in verdicts)
+        if args.update_baseline:
+            if passed or args.force:
+                baseline.update(measurements, str(candidate))
+                print(f"📁 Baseline updated: {baseline.path}")
+            else:
+                print("Baseline not updated, the gate failed (use --force to accept anyway)")
+        return 0 if passed else 1
+
+    @staticmethod
+    def _all_tables(args: argparse.Namespace) -> List[str]:
+        from extractor_dag import scan_extractors
+        return sorted(scan_extractors(args.extractors_folder))
+
+    @staticmethod
+    def _worker(argv: List[str]) -> int:
+        parser = argparse.ArgumentParser(prog='regression_gate.py _worker')
+        parser.add_argument('tables', nargs='+')
+        parser.add_argument('--extractors-folder', required=True)
+        parser.add_argument('--override', default=None)
+        parser.add_argument('--class-name', default=None)
+        parser.add_argument('--rows', type=int, required=True)
+        parser.add_argument('--repeat', type=int, required=True)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--data-dir', required=True)
+        parser.add_argument('--output', required=True)
+        args = parser.parse_args(argv)
+
+        logging.getLogger().setLevel(logging.WARNING)
+        measurements = run_worker(args.extractors_folder, args.override, args.class_name, args.tables,
+                                  args.rows, args.repeat, args.seed, args.data_dir)
+        # Plain dicts: the parent may not know this module as __main__
+        with open(args.output, 'wb') as handle:
+            pickle.dump({table: asdict(m) for table, m in measurements.items()}, handle,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        return 0
+
+    def _parse_arguments(self, argv: List[str]) -> argparse.Namespace:
+        parser = argparse.ArgumentParser(
+            description="Compare two extractor implementations for identical output and performance",
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog="""
+Examples:
+  # Working tree against the last commit, all tables
+  python3 regression_gate.py --base HEAD --candidate extractors
+
+  # A vectorized rewrite of one extractor against the current one
+  python3 regression_gate.py --tables OFFERING --base extractors --candidate offering_vectorized.py
+
+  # Accept the current numbers as the new baseline
+  python3 regression_gate.py --base HEAD --candidate extractors --update-baseline
+            """
+        )
+        parser.add_argument('--base', default='HEAD',
+                            help='Reference implementation: git revision, extractors folder or FILE.py[:Class]')
+        parser.add_argument('--candidate', default='extractors',
+                            help='Implementation under test (same forms as --base, default: extractors)')
+        parser.add_argument('--tables', default=None,
+                            help='Comma-separated tables to compare (default: all)')
+        parser.add_argument('--extractors-folder', default='extractors',
+                            help='Path to extractors folder (default: extractors)')
+        parser.add_argument('--data-dir', default='data',
+                            help='CSV exports the synthetic input is sampled from (default: data)')
+        parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                            help=f'Rows per synthetic CSV source (default: {DEFAULT_ROWS})')
+        parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                            help=f'Timed runs per table, the best counts (default: {DEFAULT_REPEAT})')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic input')
+        parser.add_argument('--decimals', type=int, default=2,
+                            help='Decimal places compared for floating point values (default: 2)')
+        parser.add_argument('--ignore-columns', default=None,
+                            help='Comma-separated columns left out of the comparison, e.g. surrogate IDs')
+        parser.add_argument('--max-slowdown', type=float, default=1.10,
+                            help='Allowed time per row relative to the baseline (default: 1.10)')
+        parser.add_argument('--max-memory-growth', type=float, default=1.25,
+                            help='Allowed peak memory relative to the baseline (default: 1.25)')
+        parser.add_argument('--min-seconds', type=float, default=0.01,
+                            help='Timings below this are too noisy to gate (default: 0.01)')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH,
+                            help=f'Baseline file (default: {DEFAULT_BASELINE_PATH})')
+        parser.add_argument('--ignore-baseline', action='store_true',
+                            help='Compare performance against the base implementation only')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Store the candidate numbers as the new baseline if the gate passes')
+        parser.add_argument('--force', action='store_true',
+                            help='With --update-baseline: store the numbers even if the gate fails')
+        return parser.parse_args(argv)
+
+
+def main():
+    """Main entry point"""
+    cli = RegressionGateCLI()
+    sys.exit(cli.run())
+
+
+if __name__ == "__main__":
+    main()
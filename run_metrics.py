@@ -0,0 +1,100 @@
+"""
+Persistent per-extractor run metrics.
+
+After every populator run the wall time, input rows and output rows of each
+extractor are stored as JSON. Timings are kept as a smoothed cost per input
+row, so estimates for a new run scale linearly with the current input size.
+A store may be shared by concurrent runs (batch mode); access is locked.
+"""
+
+import json
+import time
+import statistics
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_PATH = '.populator/metrics.json'
+
+# Weight of the newest run in the smoothed per-row rate
+SMOOTHING = 0.5
+
+
+class RunMetricsStore:
+    """JSON-backed store of extractor timings from earlier runs"""
+
+    def __init__(self, path: str = DEFAULT_METRICS_PATH):
+        self.path = Path(path)
+        self._metrics: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return table -> metrics, empty when no run was recorded yet"""
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._metrics is None:
+            try:
+                self._metrics = json.loads(self.path.read_text(encoding='utf-8')).get('tables', {})
+            except FileNotFoundError:
+                self._metrics = {}
+            except (ValueError, OSError) as e:
+                logger.warning(f"Ignoring unreadable metrics file {self.path}: {e}")
+                self._metrics = {}
+        return self._metrics
+
+    def record(self, timings: Dict[str, float], input_rows: Dict[str, int],
+               output_rows: Dict[str, int]) -> None:
+        """Merge the timings of a finished run into the store and save it"""
+        with self._lock:
+            metrics = self._load()
+            now = time.strftime('%Y-%m-%d %H:%M:%S')
+            for table, seconds in timings.items():
+                rows = max(int(input_rows.get(table, 0)), 1)
+                rate = seconds / rows
+                previous = metrics.get(table)
+                if previous and previous.get('rate') is not None:
+                    rate = SMOOTHING * rate + (1 - SMOOTHING) * previous['rate']
+                metrics[table] = {
+                    'seconds': round(seconds, 6),
+                    'rate': rate,
+                    'input_rows': rows,
+                    'output_rows': int(output_rows.get(table, 0)),
+                    'runs': (previous or {}).get('runs', 0) + 1,
+                    'recorded_at': now,
+                }
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({'tables': self._load()}, indent=2, sort_keys=True), encoding='utf-8')
+            tmp_path.replace(self.path)
+
+    def estimate(self, table: str, input_rows: int) -> Optional[float]:
+        """Estimated seconds for table at the given input size, None without history"""
+        metrics = self.load().get(table)
+        if not metrics or metrics.get('rate') is None:
+            return None
+        return metrics['rate'] * max(int(input_rows), 1)
+
+    def estimates(self, input_rows: Dict[str, int]) -> Dict[str, Optional[float]]:
+        """
+        Estimated seconds for every table in input_rows.
+
+        Tables without history are estimated with the median per-row rate of
+        the tables that have one; without any history all estimates are None.
+        """
+        estimates = {table: self.estimate(table, rows) for table, rows in input_rows.items()}
+        known_rates = [estimates[t] / max(input_rows[t], 1) for t in estimates if estimates[t] is not None]
+        if known_rates:
+            fallback_rate = statistics.median(known_rates)
+            for table, estimate in estimates.items():
+                if estimate is None:
+                    estimates[table] = fallback_rate * max(input_rows[table], 1)
+        return estimates
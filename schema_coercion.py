@@ -0,0 +1,154 @@
+"""
+Schema-aware coercion of extracted records before they are written.
+
+Extractors emit whatever Python values their source columns produce: float
+NaN foreign keys, bools in INT columns, unrounded hours, strings longer than
+their VARCHAR. Written as they are, such rows only fail (or silently
+diverge) at the database, one row at a time.
+
+SchemaCoercer takes the column definitions of dbschema/schema.dbs from the
+schema model and coerces every table column by column in one vectorized
+pass: INT columns become integers, DECIMAL(p,s) columns are rounded to s
+places and range checked, VARCHAR(n) columns are converted to strings and
+length checked, BOOLEAN columns are mapped from the export spellings
+(WAHR/FALSCH, 1/0).
+Rows violating a definition, including missing mandatory values, are not
+written but routed to a reject set with the reasons.
+
+Columns and tables the schema does not define are passed through unchanged.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any
+
+from schema_model import Column, DEFAULT_SCHEMA_PATH, load_schema
+
+logger = logging.getLogger(__name__)
+
+# Export spellings of boolean values
+BOOLEAN_VALUES = {
+    'true': True, 'wahr': True, 'yes': True, 'y': True, '1': True,
+    'false': False, 'falsch': False, 'no': False, 'n': False, '0': False,
+}
+
+
+@dataclass
+class RejectedRow:
+    """A record that violates its table definition"""
+    table: str
+    row: int
+    reasons: List[str]
+    record: Dict[str, Any]
+
+
+@dataclass
+class CoercionResult:
+    """Coerced records of one table and the rows that were rejected"""
+    records: List[Dict[str, Any]]
+    rejects: List[RejectedRow] = field(default_factory=list)
+
+
+def load_column_specs(schema_path: str = DEFAULT_SCHEMA_PATH) -> Dict[str, Dict[str, Column]]:
+    """
+    Column definitions of every table (see schema_model).
+
+    Returns:
+        Dictionary of table name -> column name -> Column
+    """
+    return {table.name: {column.name: column for column in table.columns}
+            for table in load_schema(schema_path).tables}
+
+
+def load_primary_keys(schema_path: str = DEFAULT_SCHEMA_PATH) -> Dict[str, List[str]]:
+    """Primary key columns of every table, in index order (see schema_model)"""
+    return load_schema(schema_path).primary_keys()
+
+
+class SchemaCoercer:
+    """Coerces extracted tables to their schema column types"""
+
+    def __init__(self, specs: Dict[str, Dict[str, Column]]):
+        self.specs = specs
+
+    @classmethod
+    def from_schema(cls, schema_path: str = DEFAULT_SCHEMA_PATH) -> 'SchemaCoercer':
+        return cls(load_column_specs(schema_path))
+
+    def coerce(self, table: str, records: List[Dict[str, Any]]) -> CoercionResult:
+        """Coerce the records of table; rows with violations are moved to the rejects"""
+        import pandas as pd
+
+        columns = self.specs.get(table)
+        if not columns or not records:
+            return CoercionResult(records)
+
+        frame = pd.DataFrame.from_records(records)
+        reasons = pd.Series('', index=frame.index, dtype=object)
+        for name, spec in columns.items():
+            if name not in frame.columns:
+                continue
+            original = frame[name]
+            coerced, invalid = self._coerce_column(original, spec)
+            frame[name] = coerced
+            if invalid.any():
+                reasons[invalid] += [self._reason(spec, value) + '; ' for value in original[invalid]]
+
+        rejected = reasons != ''
+        clean = frame[~rejected].astype(object)
+        clean = clean.where(clean.notna(), None)
+        result = CoercionResult(clean.to_dict('records'))
+        for row in rejected[rejected].index:
+            result.rejects.append(RejectedRow(table, int(row), reasons[row].rstrip('; ').split('; '),
+                                              records[row]))
+        if result.rejects:
+            logger.warning(f"{table}: {len(result.rejects)} of {len(records)} rows rejected, "
+                           f"first: {'; '.join(result.rejects[0].reasons)}")
+        return result
+
+    def _coerce_column(self, series, spec: Column):
+        """Return the coerced column and a mask of the values violating spec"""
+        import pandas as pd
+
+        missing = series.isna()
+        if spec.type == 'VARCHAR':
+            coerced = series.where(missing, series.astype(str))
+            invalid = pd.Series(False, index=series.index)
+            if spec.length is not None:
+                invalid = ~missing & (coerced.str.len() > spec.length)
+        elif spec.type == 'BOOLEAN':
+            text = series.where(missing, series.astype(str).str.strip().str.lower())
+            coerced = text.map(BOOLEAN_VALUES)
+            invalid = ~missing & coerced.isna()
+        elif spec.type in ('INT', 'DECIMAL'):
+            values = series.astype(int) if series.dtype == bool else series
+            numbers = pd.to_numeric(values, errors='coerce').astype(float)
+            retry = ~missing & numbers.isna()
+            if retry.any():
+                # Hours are exported with a comma as decimal separator
+                numbers[retry] = pd.to_numeric(values[retry].astype(str).str.replace(',', '.', regex=False),
+                                               errors='coerce')
+            invalid = ~missing & numbers.isna()
+            if spec.type == 'INT':
+                invalid |= numbers.notna() & (numbers != numbers.round())
+                coerced = numbers.where(~invalid).astype('Int64')
+            else:
+                scale = spec.decimal or 0
+                coerced = numbers.round(scale)
+                if spec.length is not None:
+                    invalid |= coerced.abs() >= 10.0 ** (spec.length - scale)
+        else:
+            return series, pd.Series(False, index=series.index)
+
+        if spec.mandatory:
+            invalid |= missing
+        return coerced, invalid
+
+    @staticmethod
+    def _reason(spec: Column, value: Any) -> str:
+        if value is None or value != value:
+            return f"{spec.name} is mandatory"
+        size = ''
+        if spec.length is not None:
+            size = f"({spec.length},{spec.decimal})" if spec.decimal is not None else f"({spec.length})"
+        return f"{spec.name} {value!r} is not a valid {spec.type}{size}"
@@ -0,0 +1,295 @@
+"""
+Compiled, cached model of the Planning_Tool schema (dbschema/schema.dbs).
+
+The DbSchema project file is the single source of truth for tables,
+columns, primary key indexes and foreign keys. parse_schema() turns the XML
+into an immutable SchemaModel; load_schema() memoizes it per process and
+keeps a pickled snapshot in the repository's .populator directory, so
+tools (the extractor generator, schema coercion, the upsert sink) get the
+model without parsing XML again. The snapshot is reused while the schema
+file's mtime and size are unchanged, or while its content hash still
+matches after a touch.
+
+The repository also carries an older root-level schema.dbs (and a .bak of
+it). Loading the canonical dbschema/schema.dbs warns once when the root
+copy has drifted from it. Schema changes are recorded in
+dbschema/CHANGELOG.md.
+"""
+
+import pickle
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Mapping
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# Resolved from this file, so the tools also find the schema when run from another directory
+REPO_ROOT = Path(__file__).resolve().parent
+DEFAULT_SCHEMA_PATH = str(REPO_ROOT / 'dbschema' / 'schema.dbs')
+ROOT_SCHEMA_PATH = str(REPO_ROOT / 'schema.dbs')
+DEFAULT_SNAPSHOT_DIR = str(REPO_ROOT / '.populator')
+
+# Bump when the model classes change, so old snapshots are not unpickled
+MODEL_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Column:
+    """Type definition of one schema column"""
+    name: str
+    type: str
+    length: Optional[int] = None
+    decimal: Optional[int] = None
+    mandatory: bool = False
+
+
+@dataclass(frozen=True)
+class Index:
+    name: str
+    columns: Tuple[str, ...]
+    unique: Optional[str] = None
+
+    @property
+    def is_primary_key(self) -> bool:
+        return self.unique == 'PRIMARY_KEY'
+
+    @property
+    def is_unique_key(self) -> bool:
+        return self.unique == 'UNIQUE_KEY'
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """columns of the owning table reference ref_columns of to_table"""
+    name: str
+    to_table: str
+    columns: Tuple[str, ...]
+    ref_columns: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Table:
+    name: str
+    columns: Tuple[Column, ...]
+    indexes: Tuple[Index, ...] = ()
+    foreign_keys: Tuple[ForeignKey, ...] = ()
+    comment: str = ''
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return tuple(column.name for column in self.columns)
+
+    @property
+    def primary_key(self) -> Tuple[str, ...]:
+        for index in self.indexes:
+            if index.is_primary_key:
+                return index.columns
+        return ()
+
+    @property
+    def natural_key(self) -> Tuple[str, ...]:
+        """Columns of the first unique (non primary) key, e.g. the business key behind a surrogate ID"""
+        for index in self.indexes:
+            if index.is_unique_key:
+                return index.columns
+        return ()
+
+    def column(self, name: str) -> Column:
+        """
+        Raises:
+            KeyError: If the table has no such column
+        """
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise KeyError(f"{self.name} has no column {name}")
+
+
+@dataclass(frozen=True)
+class SchemaModel:
+    name: str
+    tables: Tuple[Table, ...]
+    _by_name: Mapping[str, Table] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_by_name', MappingProxyType({table.name: table for table in self.tables}))
+
+    def __reduce__(self):
+        # MappingProxyType cannot be pickled; it is rebuilt from the tables
+        return (SchemaModel, (self.name, self.tables))
+
+    def __contains__(self, table: str) -> bool:
+        return table in self._by_name
+
+    def table(self, name: str) -> Table:
+        """
+        Raises:
+            KeyError: If the schema has no such table
+        """
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise KeyError(f"Table {name} is not defined in the schema") from None
+
+    @property
+    def table_names(self) -> Tuple[str, ...]:
+        return tuple(self._by_name)
+
+    def primary_keys(self) -> Dict[str, List[str]]:
+        return {table.name: list(table.primary_key) for table in self.tables if table.primary_key}
+
+    def natural_keys(self) -> Dict[str, List[str]]:
+        return {table.name: list(table.natural_key) for table in self.tables if table.natural_key}
+
+    def foreign_key_columns(self) -> Dict[str, List[str]]:
+        """Referencing columns of every table, in declaration order"""
+        columns = {}
+        for table in self.tables:
+            names = []
+            for fk in table.foreign_keys:
+                names.extend(c for c in fk.columns if c not in names)
+            if names:
+                columns[table.name] = names
+        return columns
+
+
+def parse_schema(schema_path: str = DEFAULT_SCHEMA_PATH) -> SchemaModel:
+    """
+    Parse a DbSchema project file into a SchemaModel.
+
+    Raises:
+        FileNotFoundError: If the schema file does not exist
+    """
+    path = Path(schema_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Schema not found: {path}")
+
+    root = ET.parse(path).getroot()
+    schema = root.find('schema')
+    tables = []
+    for table in root.iter('table'):
+        columns = []
+        for column in table.findall('column'):
+            length = column.get('length')
+            decimal = column.get('decimal')
+            columns.append(Column(
+                name=column.get('name'),
+                type=(column.get('type') or '').upper(),
+                length=int(length) if length else None,
+                decimal=int(decimal) if decimal else None,
+                mandatory=column.get('mandatory') == 'y',
+            ))
+        indexes = tuple(
+            Index(index.get('name'), tuple(c.get('name') for c in index.findall('column')), index.get('unique'))
+            for index in table.findall('index')
+        )
+        foreign_keys = tuple(
+            ForeignKey(fk.get('name'), fk.get('to_table'),
+                       tuple(c.get('name') for c in fk.findall('fk_column')),
+                       tuple(c.get('pk') for c in fk.findall('fk_column')))
+            for fk in table.findall('fk')
+        )
+        comment = table.find('comment')
+        tables.append(Table(table.get('name'), tuple(columns), indexes, foreign_keys,
+                            (comment.text or '').strip() if comment is not None else ''))
+    return SchemaModel(schema.get('name') if schema is not None else root.get('name', ''), tuple(tables))
+
+
+_models: Dict[Tuple[str, int, int], SchemaModel] = {}
+_lock = threading.Lock()
+_checked_copies = False
+
+
+def load_schema(schema_path: str = DEFAULT_SCHEMA_PATH,
+                snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR) -> SchemaModel:
+    """
+    Return the SchemaModel of schema_path, from memory, the snapshot or the XML.
+
+    Args:
+        schema_path: DbSchema project file
+        snapshot_dir: Directory of the pickled snapshot (None: no snapshot)
+    """
+    path = Path(schema_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Schema not found: {path}")
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        model = _models.get(memo_key)
+    if model is not None:
+        return model
+
+    if path.resolve() == Path(DEFAULT_SCHEMA_PATH).resolve():
+        check_schema_copies(DEFAULT_SCHEMA_PATH, ROOT_SCHEMA_PATH)
+
+    snapshot = None
+    if snapshot_dir is not None:
+        snapshot = Path(snapshot_dir) / f"schema-{hashlib.sha1(memo_key[0].encode('utf-8')).hexdigest()[:12]}.pickle"
+    model = _read_snapshot(snapshot, path, stat) if snapshot is not None else None
+    if model is None:
+        model = parse_schema(path)
+        logger.debug(f"Parsed {path}: {len(model.tables)} tables")
+        if snapshot is not None:
+            _write_snapshot(snapshot, path, stat, model)
+
+    with _lock:
+        _models[memo_key] = model
+    return model
+
+
+def check_schema_copies(canonical: str = DEFAULT_SCHEMA_PATH, copy: str = ROOT_SCHEMA_PATH) -> bool:
+    """Warn (once per process) if the copy of the schema differs from the canonical file"""
+    global _checked_copies
+    if _checked_copies:
+        return True
+    _checked_copies = True
+    canonical_path, copy_path = Path(canonical), Path(copy)
+    if not canonical_path.exists() or not copy_path.exists():
+        return True
+    if _file_hash(canonical_path) == _file_hash(copy_path):
+        return True
+    logger.warning(f"{copy_path} differs from {canonical_path}; {canonical_path} is used, "
+                   f"update or remove the outdated copy")
+    return False
+
+
+def _read_snapshot(snapshot: Path, path: Path, stat) -> Optional[SchemaModel]:
+    try:
+        with open(snapshot, 'rb') as handle:
+            payload = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable schema snapshot {snapshot}: {e}")
+        return None
+    if payload.get('version') != MODEL_VERSION:
+        return None
+    if (payload.get('mtime_ns'), payload.get('size')) == (stat.st_mtime_ns, stat.st_size):
+        return payload['model']
+    # Touched but possibly unchanged (e.g. after a checkout): compare the content
+    if payload.get('sha1') == _file_hash(path):
+        _write_snapshot(snapshot, path, stat, payload['model'])
+        return payload['model']
+    return None
+
+
+def _write_snapshot(snapshot: Path, path: Path, stat, model: SchemaModel) -> None:
+    payload = {'version': MODEL_VERSION, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+               'sha1': _file_hash(path), 'model': model}
+    try:
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot.with_name(f".{snapshot.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(snapshot)
+    except OSError as e:
+        logger.debug(f"Could not write schema snapshot {snapshot}: {e}")
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
@@ -0,0 +1,221 @@
+"""
+Shared-memory transport of the CSV source frames to worker processes.
+
+Extractors running in a process pool would otherwise receive the source
+DataFrames pickled into every task. SharedSources publishes every parsed
+source once: all its columns are laid out in one
+multiprocessing.shared_memory block per source, numeric and bool columns
+as their raw arrays, all other columns dictionary encoded (integer codes in
+the block, the distinct values in the small picklable SharedFrame handle).
+Interned columns (see csv_loader) keep their shared dictionaries.
+
+A worker attaches to the blocks by name and rebuilds the frames around
+read-only views of the shared memory, without copying; dictionary-encoded
+columns come back as categoricals. Attachments are cached per worker
+process, so many tasks and many workers cost one copy of the data.
+
+Sources loaded with only some columns (LazySourceFrame) are rebuilt as
+LazySourceFrames with a loader of their own, seeded with the shared
+dictionaries, so undeclared columns still load on first access.
+"""
+
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Column offsets in a block are aligned for every dtype
+ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class SharedColumn:
+    """Location of one column in its source's shared block"""
+    name: str
+    dtype: str
+    offset: int
+    categories: Optional[Tuple[Any, ...]] = None
+
+    @property
+    def encoded(self) -> bool:
+        return self.categories is not None
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Picklable handle of a published source frame"""
+    source: str
+    block: str
+    rows: int
+    columns: Tuple[SharedColumn, ...]
+    header: Optional[Tuple[str, ...]] = None
+
+
+@dataclass(frozen=True)
+class SharedLoaderConfig:
+    """What a worker needs to lazily load columns that were not published"""
+    data_dir: str
+    intern: bool
+    cache_dir: Optional[str]
+    dictionaries: Dict[str, Tuple[Any, ...]]
+
+
+class SharedSources:
+    """
+    Publishes source frames into shared memory and owns the blocks.
+
+    Usage:
+        with SharedSources.publish(sources) as shared:
+            pool.submit(work, shared.handles, ...)   # worker: attach(handles)
+    """
+
+    def __init__(self):
+        self.frames: Dict[str, SharedFrame] = {}
+        self.loader: Optional[SharedLoaderConfig] = None
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    @classmethod
+    def publish(cls, sources: Dict[str, pd.DataFrame]) -> 'SharedSources':
+        shared = cls()
+        try:
+            for name, frame in sources.items():
+                shared.frames[name] = shared._publish_frame(name, frame)
+                loader = getattr(frame, '_lazy_loader', None)
+                if loader is not None and shared.loader is None:
+                    shared.loader = SharedLoaderConfig(
+                        str(loader.data_dir), loader.intern,
+                        str(loader.cache.root) if loader.cache is not None else None,
+                        {dictionary: tuple(dtype.categories) for dictionary, dtype in loader.dictionaries.items()})
+        except BaseException:
+            shared.close()
+            raise
+        size = sum(block.size for block in shared._blocks)
+        logger.info(f"Published {len(shared.frames)} sources to shared memory ({size / 1024:.0f} KiB)")
+        return shared
+
+    @property
+    def handles(self) -> Tuple[Dict[str, SharedFrame], Optional[SharedLoaderConfig]]:
+        """Everything a worker passes to attach()"""
+        return self.frames, self.loader
+
+    def close(self) -> None:
+        """Release and remove the blocks (workers keep their mappings until they exit)"""
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+    def __enter__(self) -> 'SharedSources':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _publish_frame(self, name: str, frame: pd.DataFrame) -> SharedFrame:
+        arrays = []
+        for column in frame.columns:
+            series = frame[column]
+            values, categories = self._encode(series)
+            arrays.append((column, values, categories))
+
+        layout, offset = [], 0
+        for column, values, categories in arrays:
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            layout.append(SharedColumn(column, values.dtype.str, offset, categories))
+            offset += values.nbytes
+
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self._blocks.append(block)
+        for spec, (_, values, _) in zip(layout, arrays):
+            target = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf, offset=spec.offset)
+            target[...] = values
+        del target
+
+        header = getattr(frame, '_lazy_header', None)
+        return SharedFrame(name, block.name, len(frame), tuple(layout),
+                           tuple(header) if header is not None else None)
+
+    @staticmethod
+    def _encode(series: pd.Series) -> Tuple[np.ndarray, Optional[Tuple[Any, ...]]]:
+        """Raw values of numeric columns, (codes, categories) of all others"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufmM':
+            return np.ascontiguousarray(series.to_numpy()), None
+        else:
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+        codes = np.asarray(codes, dtype=_code_dtype(len(categories)))
+        return codes, tuple(categories.tolist())
+
+
+def _code_dtype(size: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# Per worker process: block names -> (frames, attached blocks)
+_attached: Dict[Tuple[str, ...], Tuple[Dict[str, pd.DataFrame], List[shared_memory.SharedMemory]]] = {}
+_attach_lock = threading.Lock()
+
+
+def block_key(frames: Dict[str, SharedFrame]) -> Tuple[str, ...]:
+    """Identity of a published set of sources: its shared-memory block names"""
+    return tuple(sorted(frame.block for frame in frames.values()))
+
+
+def attach(frames: Dict[str, SharedFrame],
+           loader_config: Optional[SharedLoaderConfig] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Rebuild the published source frames on top of the shared blocks.
+
+    Repeated calls with the same handles return the same frames.
+    """
+    key = block_key(frames)
+    with _attach_lock:
+        cached = _attached.get(key)
+        if cached is not None:
+            return cached[0]
+
+        loader = _worker_loader(loader_config) if loader_config is not None else None
+        sources, blocks = {}, []
+        for name, spec in frames.items():
+            block = shared_memory.SharedMemory(name=spec.block)
+            blocks.append(block)
+            frame = pd.DataFrame({column.name: _column(block, spec.rows, column) for column in spec.columns},
+                                 index=pd.RangeIndex(spec.rows), copy=False)
+            if spec.header is not None and loader is not None:
+                from csv_loader import LazySourceFrame
+                frame = LazySourceFrame.wrap(frame, loader, name, list(spec.header))
+            sources[name] = frame
+        _attached[key] = (sources, blocks)
+        return sources
+
+
+def _column(block: shared_memory.SharedMemory, rows: int, spec: SharedColumn):
+    values = np.ndarray(rows, dtype=np.dtype(spec.dtype), buffer=block.buf, offset=spec.offset)
+    values.flags.writeable = False
+    if not spec.encoded:
+        return values
+    return pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(list(spec.categories)))
+
+
+def _worker_loader(config: SharedLoaderConfig):
+    from csv_loader import CsvSourceLoader
+    from parsed_source_cache import ParsedSourceCache
+
+    loader = CsvSourceLoader(config.data_dir, intern=config.intern,
+                             cache=ParsedSourceCache(config.cache_dir) if config.cache_dir else None)
+    # Lazily loaded columns extend the publisher's dictionaries, keeping codes consistent
+    loader.dictionaries = {dictionary: pd.CategoricalDtype(list(categories))
+                           for dictionary, categories in config.dictionaries.items()}
+    return loader
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Simple Database Populator
+
+Runs every extractor in the extractors folder in dependency order and writes
+the extracted records into the Planning_Tool SQLite database.
+
+Architecture:
+- ExtractorRegistry: Discovers DataExtractor implementations (Registry Pattern)
+- DependencyResolver: Orders extractors topologically by their dependencies
+- CriticalPathScheduler: Starts the longest remaining dependency chain first
+- OutputStore: Frees dependency outputs after their last consumer, spills over budget
+- DatabasePopulator: Coordinates loading, extraction and writing (Facade Pattern)
+- BatchPopulator: Populates many datasets concurrently on one shared worker pool
+- WatchMode: Re-runs the affected extractors whenever a CSV export changes
+- PopulatorCLI: User interface with validation (Command Pattern)
+"""
+
+import os
+import sys
+import time
+import inspect
+import logging
+import argparse
+import importlib
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+from contextlib import nullcontext
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from extractor_dag import ExtractorGraph
+from extractor_scheduler import CriticalPathScheduler
+from output_store import OutputStore, parse_size
+from run_metrics import RunMetricsStore, DEFAULT_METRICS_PATH
+from trace_recorder import TraceRecorder, span, counter, active as active_recorder
+from schema_coercion import SchemaCoercer, DEFAULT_SCHEMA_PATH
+from schema_model import load_schema
+from parsed_source_cache import ParsedSourceCache, DEFAULT_PARSE_CACHE_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PopulationResult:
+    """Outcome of a single populator run"""
+    row_counts: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    input_rows: Dict[str, int] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    rejected: Dict[str, int] = field(default_factory=dict)
+    peak_output_bytes: int = 0
+    spilled_outputs: int = 0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed and not self.skipped
+
+
+class ExtractorRegistry:
+    """
+    Discovers DataExtractor subclasses in the extractors folder.
+    Implements Registry Pattern keyed by target table name.
+    """
+
+    def __init__(self, extractors_folder: str = "extractors"):
+        self.extractors_folder = Path(extractors_folder).resolve()
+        self.extractors: Dict[str, Any] = {}
+        self.classes: Dict[str, type] = {}
+
+    def discover(self) -> Dict[str, Any]:
+        """Import every extractor module and instantiate its extractor classes"""
+        # Extractors import their helpers as top-level modules (from base_extractor import ...)
+        if str(self.extractors_folder) not in sys.path:
+            sys.path.insert(0, str(self.extractors_folder))
+        base_class = importlib.import_module('base_extractor').DataExtractor
+
+        for module_path in sorted(self.extractors_folder.glob('*.py')):
+            try:
+                module = importlib.import_module(module_path.stem)
+            except Exception as e:
+                logger.error(f"Could not import {module_path.name}: {e}")
+                continue
+
+            for _, cls in inspect.getmembers(module, inspect.isclass):
+                if (issubclass(cls, base_class) and cls is not base_class
+                        and cls.__module__ == module.__name__ and not inspect.isabstract(cls)):
+                    extractor = cls()
+                    if extractor.table_name in self.extractors:
+                        raise ValueError(f"Duplicate extractor for table {extractor.table_name}")
+                    self.extractors[extractor.table_name] = extractor
+                    self.classes[extractor.table_name] = cls
+
+        logger.info(f"Discovered {len(self.extractors)} extractors: {', '.join(sorted(self.extractors))}")
+        return self.extractors
+
+    def instantiate(self) -> Dict[str, Any]:
+        """Fresh extractor instances from the already imported classes (one set per concurrent run)"""
+        return {table: cls() for table, cls in self.classes.items()}
+
+
+class DependencyResolver:
+    """Resolves the extractor dependency graph into a topological order"""
+
+    @staticmethod
+    def order(extractors: Dict[str, Any]) -> List[str]:
+        """
+        Return table names so that every table comes after its dependencies.
+
+        Raises:
+            ValueError: On unknown dependencies or dependency cycles
+        """
+        graph = ExtractorGraph({table: e.dependencies for table, e in extractors.items()})
+        return graph.topological_order()
+
+
+def parse_baseline_hours(value: str) -> Dict[bool, float]:
+    """Parse '18' or '18,4' (professors[, lecturers]) into hours by T_ISPROFESSOR"""
+    try:
+        hours = [float(part) for part in str(value).split(',')]
+    except ValueError:
+        hours = []
+    if not 1 <= len(hours) <= 2 or any(h < 0 for h in hours):
+        raise ValueError(f"Invalid baseline hours: {value!r}")
+    return {True: hours[0], False: hours[1] if len(hours) == 2 else 0.0}
+
+
+# Per worker process: shared-memory block names of the sources -> projection cache
+_process_projection_caches: Dict[Tuple[str, ...], Any] = {}
+# Per worker process: trace recorder whose events go back to the parent with each result
+_process_recorder: Optional[TraceRecorder] = None
+
+
+def _init_extractor_process(extractors_folder: str) -> None:
+    """Process pool initializer: make the extractor modules importable"""
+    if extractors_folder not in sys.path:
+        sys.path.insert(0, extractors_folder)
+
+
+def _extract_in_process(extractor, handles, dependencies: Dict[str, Any], trace_origin: Optional[int] = None):
+    """
+    Run one extractor in a worker process on the shared-memory sources.
+
+    The extractor is a pickled copy, so the state extract() leaves on it
+    (e.g. DeputatAccountExtractor.engine) is returned with the records for
+    the parent to apply to its own instance. When the parent traces the
+    run (trace_origin set), the spans recorded here are returned as well.
+    """
+    global _process_recorder
+    from shared_sources import attach, block_key
+    from projection_cache import ProjectionCache
+
+    if trace_origin is not None and (_process_recorder is None or _process_recorder.origin != trace_origin):
+        _process_recorder = TraceRecorder(origin=trace_origin, process_name='extractor worker').activate()
+
+    with span(extractor.table_name, 'extractor'):
+        sources = attach(*handles)
+        # One projection cache per published set of sources, shared by the tasks of this process
+        key = block_key(handles[0])
+        projection_cache = _process_projection_caches.get(key)
+        if projection_cache is None:
+            projection_cache = _process_projection_caches[key] = ProjectionCache(sources)
+        kwargs = dict(sources)
+        kwargs.update(dependencies)
+        kwargs['projection_cache'] = projection_cache
+        started = time.perf_counter()
+        records = extractor.extract(**kwargs)
+        seconds = time.perf_counter() - started
+    events = _process_recorder.take_events() if trace_origin is not None else []
+    return records, seconds, vars(extractor), events
+
+
+class DatabasePopulator:
+    """
+    Coordinates a populator run: load CSV sources, run the extractors in
+    dependency order and hand every table to the database sink.
+    Implements Facade Pattern over loader, extractors and sink.
+    """
+
+    def __init__(self, data_dir: str = "data", extractors_folder: str = "extractors",
+                 metrics_path: Optional[str] = DEFAULT_METRICS_PATH, workers: Optional[int] = None,
+                 memory_budget: Optional[int] = None, spill_dir: Optional[str] = None,
+                 registry: Optional[ExtractorRegistry] = None, metrics: Optional[RunMetricsStore] = None,
+                 pool: Optional[Executor] = None, partition_by_term: bool = False,
+                 schema_path: Optional[str] = None, upsert: bool = False,
+                 parse_cache: Optional[str] = None, processes: int = 0,
+                 baseline_hours: Optional[Dict[bool, float]] = None):
+        """
+        Args:
+            registry: Already discovered extractors to reuse (batch mode); the
+                populator gets its own instances of the extractor classes
+            metrics: Shared metrics store, overrides metrics_path
+            pool: Shared executor for the extractor calls instead of a private one
+            partition_by_term: Store term-scoped tables as one table per term
+            schema_path: Coerce every table to the column types of this schema
+                before it is written; violating rows go to the reject set
+            upsert: Merge the tables into the database, writing only changed
+                rows (keyed by the primary keys of the schema)
+            parse_cache: Directory caching parsed CSV sources across runs
+            processes: Run the extractors in this many worker processes
+                (the sources reach them through shared memory); 0 runs
+                them on threads of this process
+            baseline_hours: Teaching obligation by T_ISPROFESSOR for the
+                DEPUTAT_ACCOUNT balances (default: deputat_balance.DEFAULT_BASELINE_HOURS)
+        """
+        self.data_dir = data_dir
+        self.processes = processes
+        self.workers = processes or max(1, workers or os.cpu_count() or 1)
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.pool = pool
+        self.partition_by_term = partition_by_term
+        self.schema_path = schema_path
+        self.upsert = upsert
+        self.parse_cache = ParsedSourceCache(parse_cache) if parse_cache else None
+        # Passed to every extract() call next to the sources and dependencies
+        self.extractor_options = {'baseline_hours': baseline_hours} if baseline_hours else {}
+        self.coercer = SchemaCoercer.from_schema(schema_path) if schema_path else None
+        self.metrics = metrics or (RunMetricsStore(metrics_path) if metrics_path else None)
+        if registry is None:
+            self.registry = ExtractorRegistry(extractors_folder)
+            self.extractors = self.registry.discover()
+        else:
+            self.registry = registry
+            self.extractors = registry.instantiate()
+        self.order = DependencyResolver.order(self.extractors)
+        self.graph = ExtractorGraph({t: e.dependencies for t, e in self.extractors.items()})
+
+    def load_sources(self, tables: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Load the CSV sources read by the given extractors (default: all).
+
+        Only the columns the extractors declare are parsed; other columns
+        are parsed on first access (see DataExtractor.source_columns).
+        """
+        from csv_loader import CsvSourceLoader
+        with span('load sources', 'csv', data_dir=str(self.data_dir)):
+            loader = CsvSourceLoader(self.data_dir, cache=self.parse_cache)
+            return loader.load(columns=self.source_columns(tables))
+
+    def source_columns(self, tables: Optional[List[str]] = None) -> Dict[str, Optional[List[str]]]:
+        """Union of the source columns the extractors read; None means all columns of a source"""
+        from source_files import SOURCE_FILES
+
+        union: Dict[str, Optional[List[str]]] = {}
+        for table in tables or self.order:
+            extractor = self.extractors[table]
+            parameters = inspect.signature(extractor.extract).parameters
+            declared = extractor.source_columns
+            for source in SOURCE_FILES:
+                if source not in parameters:
+                    continue
+                columns = None if declared is None else declared.get(source)
+                if columns is None or (source in union and union[source] is None):
+                    union[source] = None
+                else:
+                    union[source] = sorted(set(union.get(source) or []) | set(columns))
+        return union
+
+    def prime_projections(self, cache: Any, sources: Dict[str, Any], tables: List[str]) -> None:
+        """
+        Prime the projection cache with the source columns the extractors declare.
+
+        Each source is scanned once for the union of the declared column
+        sets, so the extractors' distinct() calls are served from the cache.
+        """
+        column_sets: Dict[str, List[List[str]]] = {}
+        for table in tables:
+            for source, columns in (self.extractors[table].source_columns or {}).items():
+                if columns and source in sources:
+                    column_sets.setdefault(source, []).append(list(columns))
+        for source, sets in column_sets.items():
+            with span(f"prime {source}", 'cache', column_sets=len(sets)):
+                cache.prime(sources[source], sets)
+        logger.debug(f"Primed projection cache: {cache.stats}")
+
+    def closure(self, tables: List[str]) -> List[str]:
+        """
+        The given tables plus everything they depend on, in dependency order.
+
+        Raises:
+            ValueError: On unknown table names
+        """
+        unknown = sorted(set(tables) - set(self.extractors))
+        if unknown:
+            raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+        wanted = set(tables) | self.graph.ancestors(tables)
+        return [table for table in self.order if table in wanted]
+
+    def extract_all(self, sink=None, tables: Optional[List[str]] = None,
+                    sources: Optional[Dict[str, Any]] = None,
+                    outputs: Optional[OutputStore] = None,
+                    options: Optional[Dict[str, Any]] = None) -> PopulationResult:
+        """
+        Run the extractors and write each table to the sink as soon as it is extracted.
+
+        Extractors run on a pool of worker threads. Whenever a worker is free,
+        the ready extractor with the longest estimated remaining path starts.
+        Sink writes stay on the calling thread. With processes, each worker
+        thread hands its extractor to a worker process, which attaches to
+        the sources published in shared memory (see shared_sources) and
+        receives only the dependency outputs; the state the extractor keeps
+        (engine, matrix, index, calendar) is copied back to the parent's
+        instance. Dependency outputs are kept as
+        read-only ColumnarTables only until their last consumer finished
+        (see OutputStore).
+
+        Args:
+            sink: Database sink receiving every extracted table
+            tables: Run only these extractors; their other dependencies must
+                already be present in outputs (default: all extractors)
+            sources: Preloaded CSV sources (default: load the columns the
+                scheduled extractors read from data_dir)
+            outputs: Store for dependency outputs, e.g. a retaining store
+                that keeps outputs across runs (default: reference counted)
+            options: Extra keyword arguments for the extract() calls of this
+                run, e.g. the changed_terms of a watch cycle
+        """
+        from projection_cache import ProjectionCache
+        from columnar import ColumnarTable
+
+        graph = self.graph if tables is None else self.graph.subgraph(tables)
+        sources = self.load_sources(tables) if sources is None else sources
+        extractor_options = dict(self.extractor_options, **(options or {}))
+        projection_cache = ProjectionCache(sources)
+        self.prime_projections(projection_cache, sources, list(graph.dependencies))
+        if outputs is None:
+            outputs = OutputStore(
+                {table: len(graph.dependents[table]) for table in graph.dependencies},
+                budget_bytes=self.memory_budget, spill_dir=self.spill_dir
+            )
+        result = PopulationResult()
+
+        input_rows = {t: self._input_rows(self.extractors[t], sources) for t in graph.dependencies}
+        scheduler = CriticalPathScheduler(graph, self._costs(input_rows))
+
+        shared_sources, process_pool = None, None
+        if self.processes:
+            from shared_sources import SharedSources
+            with span('publish sources', 'csv', data_dir=str(self.data_dir)):
+                shared_sources = SharedSources.publish(sources)
+            process_pool = ProcessPoolExecutor(self.processes, initializer=_init_extractor_process,
+                                               initargs=(str(self.registry.extractors_folder),))
+
+        def run_extractor(table: str):
+            extractor = self.extractors[table]
+            dependencies = {dep.lower(): outputs.get(dep) for dep in extractor.dependencies}
+            dependencies.update(extractor_options)
+            with span(table, 'extractor', data_dir=str(self.data_dir), input_rows=input_rows[table]):
+                if process_pool is not None:
+                    recorder = active_recorder()
+                    records, seconds, state, events = process_pool.submit(
+                        _extract_in_process, extractor, shared_sources.handles, dependencies,
+                        recorder.origin if recorder is not None else None).result()
+                    vars(extractor).update(state)
+                    if events:
+                        # The worker's own lane, under its pid
+                        recorder.add_events(events)
+                else:
+                    kwargs = dict(sources)
+                    kwargs.update(dependencies)
+                    kwargs['projection_cache'] = projection_cache
+                    started = time.perf_counter()
+                    records = extractor.extract(**kwargs)
+                    seconds = time.perf_counter() - started
+            if self.coercer is None:
+                return records, seconds, None
+            with span(f"coerce {table}", 'schema', rows=len(records)):
+                coerced = self.coercer.coerce(table, records)
+            return coerced.records, seconds, coerced.rejects
+
+        def release_inputs(table: str) -> None:
+            for dep in self.extractors[table].dependencies:
+                outputs.release(dep)
+
+        def fail(table: str, reason: str) -> None:
+            result.failed[table] = reason
+            for skipped in scheduler.fail(table):
+                logger.warning(f"Skipping {skipped}: dependency {table} failed")
+                result.skipped.append(skipped)
+                release_inputs(skipped)
+
+        if self.pool is None:
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extractor')
+        else:
+            executor = nullcontext(self.pool)
+        try:
+            with executor as pool:
+                running = {}
+                while not scheduler.finished():
+                    while scheduler.has_ready() and len(running) < self.workers:
+                        table = scheduler.pop()
+                        running[pool.submit(run_extractor, table)] = table
+                    counter(f"extractors {self.data_dir}", running=len(running), ready=scheduler.ready_count)
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        table = running.pop(future)
+                        release_inputs(table)
+                        try:
+                            records, seconds, rejects = future.result()
+                        except Exception as e:
+                            logger.error(f"❌ {table} extraction failed: {e}")
+                            fail(table, str(e))
+                            continue
+                        if rejects and not records:
+                            # Every row was rejected: the schema does not match the data
+                            reason = f"all {len(rejects)} rows rejected by schema coercion"
+                            logger.error(f"❌ {table}: {reason}")
+                            result.rejected[table] = len(rejects)
+                            if sink is not None:
+                                sink.write_rejects(table, rejects)
+                            fail(table, reason)
+                            continue
+
+                        outputs.put(table, ColumnarTable.from_records(records))
+                        result.timings[table] = seconds
+                        result.row_counts[table] = len(records)
+                        result.input_rows[table] = input_rows[table]
+                        if rejects:
+                            result.rejected[table] = len(rejects)
+                        if sink is not None:
+                            sink.write_table(table, records)
+                            if rejects is not None:
+                                sink.write_rejects(table, rejects)
+                        del records
+                        scheduler.complete(table)
+                    counter(f"extractors {self.data_dir}", running=len(running), ready=scheduler.ready_count)
+        finally:
+            if process_pool is not None:
+                process_pool.shutdown()
+                shared_sources.close()
+
+        result.peak_output_bytes = outputs.peak_bytes
+        result.spilled_outputs = outputs.spill_count
+        if not outputs.retain:
+            outputs.close()
+
+        if self.metrics is not None and result.timings:
+            self.metrics.record(result.timings, result.input_rows, result.row_counts)
+        return result
+
+    def _costs(self, input_rows: Dict[str, int]) -> Dict[str, float]:
+        """Estimated seconds per extractor; unit costs when there are no stored metrics"""
+        if self.metrics is None:
+            return {table: 1.0 for table in input_rows}
+        estimates = self.metrics.estimates(input_rows)
+        return {table: 1.0 if estimate is None else estimate for table, estimate in estimates.items()}
+
+    def affected_tables(self, changed_sources: List[str]) -> List[str]:
+        """Extractors reading any of the changed CSV sources plus everything downstream"""
+        direct = [table for table, extractor in self.extractors.items()
+                  if set(changed_sources) & set(inspect.signature(extractor.extract).parameters)]
+        affected = set(direct) | self.graph.descendants(direct)
+        return [table for table in self.order if table in affected]
+
+    @staticmethod
+    def _input_rows(extractor, sources: Dict[str, Any]) -> int:
+        """Rows of the CSV sources the extractor reads (all sources if it reads none directly)"""
+        parameters = inspect.signature(extractor.extract).parameters
+        used = [name for name in sources if name in parameters] or list(sources)
+        return sum(len(sources[name]) for name in used)
+
+    def create_sink(self, db_path: str, staged: bool = False):
+        """Database sink for db_path matching the staging and partitioning options"""
+        from db_sink import (SqliteSink, StagedSqliteSink, UpsertSqliteSink,
+                             PartitionedSqliteSink, PartitionedStagedSqliteSink)
+
+        if self.upsert:
+            if staged or self.partition_by_term:
+                raise ValueError("Upsert loads merge into the live tables and cannot be staged or partitioned")
+            return UpsertSqliteSink(db_path, schema=load_schema(self.schema_path or DEFAULT_SCHEMA_PATH))
+        if staged:
+            sink_class = PartitionedStagedSqliteSink if self.partition_by_term else StagedSqliteSink
+            return sink_class(db_path, expected_tables=self.order,
+                              schema=load_schema(self.schema_path or DEFAULT_SCHEMA_PATH))
+        return PartitionedSqliteSink(db_path) if self.partition_by_term else SqliteSink(db_path)
+
+    def populate(self, db_path: str, staged: bool = False,
+                 tables: Optional[List[str]] = None) -> PopulationResult:
+        """
+        Populate the database at db_path.
+
+        With staged=True all tables are written into a shadow database that
+        only replaces the live one if every extractor succeeded and the
+        shadow passes its integrity checks.
+
+        Args:
+            tables: Populate only these tables and their dependencies; the
+                other tables of the database are left as they are
+
+        Raises:
+            ValueError: If tables is combined with staged (the swap would
+                drop every table that is not re-populated)
+        """
+        if tables is not None:
+            if staged:
+                raise ValueError("A staged load must populate all tables, --tables cannot be staged")
+            tables = self.closure(tables)
+            logger.info(f"Populating {len(tables)} of {len(self.order)} tables: {', '.join(tables)}")
+
+        sink = self.create_sink(db_path, staged)
+        sink.open()
+
+        try:
+            result = self.extract_all(sink, tables=tables)
+        except BaseException:
+            sink.abort()
+            raise
+
+        if staged and not result.success:
+            sink.abort()
+        else:
+            if staged:
+                sink.input_rows.update(result.input_rows)
+            sink.commit()
+        return result
+
+
+class PopulatorCLI:
+    """
+    Command-line interface for the database populator.
+    Implements Command Pattern with comprehensive validation.
+    """
+
+    COMMANDS = ('populate', 'plan', 'watch', 'batch', 'archive')
+
+    def run(self, argv: Optional[List[str]] = None) -> int:
+        """Main entry point that returns exit code"""
+        try:
+            args = self._parse_arguments(argv)
+            if not getattr(args, 'trace', None):
+                return getattr(self, f"_command_{args.command}")(args)
+            recorder = TraceRecorder(args.trace).activate()
+            try:
+                return getattr(self, f"_command_{args.command}")(args)
+            finally:
+                recorder.deactivate()
+                print(f"\n🧭 Trace written to {recorder.save()} (open in chrome://tracing or ui.perfetto.dev)")
+        except Exception as e:
+            logger.error(f"CLI error: {str(e)}")
+            print(f"\n💥 Error: {str(e)}")
+            return 1
+
+    def _command_populate(self, args: argparse.Namespace) -> int:
+        populator = DatabasePopulator(
+            args.data_dir, args.extractors_folder, args.metrics, args.workers,
+            memory_budget=parse_size(args.memory_budget) if args.memory_budget else None,
+            spill_dir=args.spill_dir, partition_by_term=args.partition_by_term,
+            schema_path=None if args.no_coerce else args.schema, upsert=args.upsert,
+            parse_cache=None if args.no_parse_cache else args.parse_cache, processes=args.processes,
+            baseline_hours=args.baseline_hours
+        )
+        tables = [t.strip().upper() for t in args.tables.split(',') if t.strip()] if args.tables else None
+        result = populator.populate(args.db, staged=args.staged, tables=tables)
+        self._print_summary(result, args)
+        return 0 if result.success else 1
+
+    def _command_watch(self, args: argparse.Namespace) -> int:
+        from watch_mode import WatchMode
+        populator = DatabasePopulator(
+            args.data_dir, args.extractors_folder, args.metrics, args.workers,
+            memory_budget=parse_size(args.memory_budget) if args.memory_budget else None,
+            spill_dir=args.spill_dir, partition_by_term=args.partition_by_term,
+            schema_path=None if args.no_coerce else args.schema, upsert=args.upsert,
+            parse_cache=None if args.no_parse_cache else args.parse_cache,
+            baseline_hours=args.baseline_hours
+        )
+        WatchMode(populator, args.db, debounce=args.debounce, poll_interval=args.poll_interval,
+                  use_inotify=not args.poll).run()
+        return 0
+
+    def _command_batch(self, args: argparse.Namespace) -> int:
+        from batch_mode import BatchJob, BatchPopulator, read_manifest, render_batch_summary
+        jobs = [BatchJob.parse(spec) for spec in args.jobs]
+        if args.manifest:
+            jobs.extend(read_manifest(args.manifest))
+        if not jobs:
+            raise ValueError("No datasets given (pass DATA_DIR[=DB] arguments or --manifest)")
+        batch = BatchPopulator(
+            jobs, args.extractors_folder, args.metrics, args.workers, staged=args.staged,
+            memory_budget=parse_size(args.memory_budget) if args.memory_budget else None,
+            spill_dir=args.spill_dir, max_concurrent=args.max_concurrent,
+            partition_by_term=args.partition_by_term, schema_path=None if args.no_coerce else args.schema,
+            upsert=args.upsert,
+            parse_cache=None if args.no_parse_cache else args.parse_cache,
+            baseline_hours=args.baseline_hours
+        )
+        result = batch.run()
+        print("\n" + render_batch_summary(result, jobs))
+        return 0 if result.success else 1
+
+    def _command_archive(self, args: argparse.Namespace) -> int:
+        from db_sink import PartitionedSqliteSink
+        db_path = Path(args.db)
+        if not db_path.exists():
+            raise FileNotFoundError(f"Database not found: {db_path}")
+        archive_path = args.archive_db or str(db_path.with_name(f"{db_path.stem}_archive{db_path.suffix}"))
+        sink = PartitionedSqliteSink(str(db_path)).open()
+        try:
+            terms = list(args.terms)
+            if args.before:
+                from term_calendar import terms_before
+                terms += [t for t in terms_before(sink.live_terms(), args.before) if t not in terms]
+            if not terms:
+                print("Nothing to archive")
+            for term in terms:
+                tables = sink.archive_term(term, archive_path)
+                print(f"🗄  {term}: {len(tables)} partitions moved to {archive_path}")
+        finally:
+            sink.close()
+        return 0
+
+    def _command_plan(self, args: argparse.Namespace) -> int:
+        # Static only: must not import pandas or the extractors
+        from execution_plan import ExecutionPlan
+        plan = ExecutionPlan.build(args.extractors_folder, args.data_dir, args.metrics)
+        print(plan.render())
+        return 0
+
+    def _parse_arguments(self, argv: Optional[List[str]]) -> argparse.Namespace:
+        argv = list(sys.argv[1:] if argv is None else argv)
+        if not argv or argv[0] not in self.COMMANDS + ('-h', '--help'):
+            argv.insert(0, 'populate')
+
+        parser = argparse.ArgumentParser(
+            description="Populate the Planning_Tool database from the CSV exports",
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog="""
+Examples:
+  # Populate planning_tool.db from data/
+  python3 simple_db_populator.py
+
+  # Reload during working hours: build a shadow database and swap it in atomically
+  python3 simple_db_populator.py --db planning_tool.db --staged
+
+  # Populate one database per faculty export in a single process
+  python3 simple_db_populator.py batch exports/inf=inf.db exports/wiwi=wiwi.db
+
+  # Re-populate two tables (and their dependencies) without parsing unused CSV columns
+  python3 simple_db_populator.py --tables DEPARTMENT,POSITION
+
+  # Reload after a small edit, writing only the rows that changed
+  python3 simple_db_populator.py --upsert
+
+  # Store term-scoped tables per term and archive an old term
+  python3 simple_db_populator.py --partition-by-term
+  python3 simple_db_populator.py archive SS15
+  python3 simple_db_populator.py archive --before WS1516
+
+  # Keep the database up to date while the CSV exports are edited
+  python3 simple_db_populator.py watch --db planning_tool.db
+
+  # Run the extractors in 4 processes that share the parsed CSVs through shared memory
+  python3 simple_db_populator.py --processes 4
+
+  # Record a timeline of the run for chrome://tracing or Perfetto
+  python3 simple_db_populator.py --workers 4 --trace populate-trace.json
+
+  # Show the extractor DAG with cost estimates from earlier runs
+  python3 simple_db_populator.py plan
+            """
+        )
+        common = argparse.ArgumentParser(add_help=False)
+        common.add_argument('--data-dir', default='data',
+                            help='Directory containing the CSV exports (default: data)')
+        common.add_argument('--extractors-folder', default='extractors',
+                            help='Path to extractors folder (default: extractors)')
+        common.add_argument('--metrics', default=DEFAULT_METRICS_PATH,
+                            help=f'Run metrics file (default: {DEFAULT_METRICS_PATH})')
+
+        run_options = argparse.ArgumentParser(add_help=False)
+        run_options.add_argument('--workers', type=int, default=None,
+                                 help='Parallel extractor threads (default: number of CPUs)')
+        run_options.add_argument('--memory-budget', default=None,
+                                 help='Spill dependency outputs to disk above this size, e.g. 512M')
+        run_options.add_argument('--spill-dir', default=None,
+                                 help='Directory for spilled outputs (default: system temp directory)')
+        run_options.add_argument('--partition-by-term', action='store_true',
+                                 help='Store term-scoped tables as one table per term behind a view')
+        run_options.add_argument('--trace', default=None, metavar='FILE',
+                                 help='Write a Chrome trace-event timeline of the run to FILE')
+        run_options.add_argument('--upsert', action='store_true',
+                                 help='Merge into the existing tables, writing only inserted, changed and deleted rows')
+        run_options.add_argument('--parse-cache', default=DEFAULT_PARSE_CACHE_DIR, metavar='DIR',
+                                 help=f'Cache of parsed CSV sources, keyed by file content '
+                                      f'(default: {DEFAULT_PARSE_CACHE_DIR})')
+        run_options.add_argument('--no-parse-cache', action='store_true',
+                                 help='Always decompress and parse the CSV sources')
+        run_options.add_argument('--schema', default=DEFAULT_SCHEMA_PATH,
+                                 help=f'Schema the tables are coerced to before writing (default: {DEFAULT_SCHEMA_PATH})')
+        run_options.add_argument('--no-coerce', action='store_true',
+                                 help='Write the extracted values as they are, without schema coercion')
+        run_options.add_argument('--baseline-hours', type=parse_baseline_hours, default=None,
+                                 metavar='PROF[,LECTURER]',
+                                 help='Teaching obligation per term of professors and lecturers for the '
+                                      'DEPUTAT_ACCOUNT balances (default: 18,0)')
+
+        database = argparse.ArgumentParser(add_help=False)
+        database.add_argument('--db', default='planning_tool.db',
+                              help='Path of the SQLite database (default: planning_tool.db)')
+
+        commands = parser.add_subparsers(dest='command')
+        populate = commands.add_parser('populate', parents=[common, database, run_options],
+                                       help='Run the extractors and write the database (default)')
+        populate.add_argument('--processes', type=int, default=0, metavar='N',
+                              help='Run the extractors in N worker processes sharing the sources '
+                                   'through shared memory (default: threads)')
+        populate.add_argument('--staged', action='store_true',
+                              help='Write into a shadow database and swap it in atomically after verification')
+        populate.add_argument('--tables', default=None, metavar='T1,T2',
+                              help='Populate only these tables and their dependencies, parsing only the CSV '
+                                   'columns they read')
+
+        watch = commands.add_parser('watch', parents=[common, database, run_options],
+                                    help='Populate, then re-populate the affected tables whenever a CSV changes')
+        watch.add_argument('--debounce', type=float, default=1.0,
+                           help='Seconds the data directory must be quiet before a refresh (default: 1.0)')
+        watch.add_argument('--poll-interval', type=float, default=1.0,
+                           help='Seconds between checks when polling (default: 1.0)')
+        watch.add_argument('--poll', action='store_true',
+                           help='Poll file timestamps even if inotify is available')
+
+        batch = commands.add_parser('batch', parents=[common, run_options],
+                                    help='Populate one database per dataset directory in a single process')
+        batch.add_argument('jobs', nargs='*', metavar='DATA_DIR[=DB]',
+                           help='Dataset directory and target database (default: <dir name>.db)')
+        batch.add_argument('--manifest', default=None,
+                           help='File with one DATA_DIR[=DB] per line')
+        batch.add_argument('--staged', action='store_true',
+                           help='Stage and atomically swap every database after verification')
+        batch.add_argument('--max-concurrent', type=int, default=None,
+                           help='Datasets loaded and coordinated at the same time (default: workers)')
+
+        archive = commands.add_parser('archive', parents=[database],
+                                      help='Move the partitions of old terms into an archive database')
+        archive.add_argument('terms', nargs='*', metavar='TERM', help='Term codes to archive, e.g. SS15')
+        archive.add_argument('--before', default=None, metavar='TERM',
+                             help='Also archive every live term older than TERM, e.g. WS1516')
+        archive.add_argument('--archive-db', default=None,
+                             help='Archive database (default: <db>_archive.db next to the database)')
+
+        commands.add_parser('plan', parents=[common],
+                            help='Show parallel levels, critical path and cost estimates without running')
+        return parser.parse_args(argv)
+
+    def _print_summary(self, result: PopulationResult, args: argparse.Namespace) -> None:
+        print("\n" + "=" * 60)
+        print("POPULATION SUMMARY")
+        print("=" * 60)
+        for table, count in result.row_counts.items():
+            print(f"  ✓ {table:<30} {count:>8} rows  {result.timings.get(table, 0.0):8.3f}s")
+        for table, error in result.failed.items():
+            print(f"  ❌ {table:<30} {error}")
+        for table in result.skipped:
+            print(f"  ⏭  {table:<30} skipped (dependency failed)")
+        if result.rejected:
+            print(f"\n⚠  Rows rejected by schema coercion (see _REJECTED_ROWS): "
+                  + ", ".join(f"{t} {n}" for t, n in result.rejected.items()))
+        print(f"\nPeak held dependency outputs: {result.peak_output_bytes / 1024:.0f} KiB"
+              + (f", {result.spilled_outputs} spilled to disk" if result.spilled_outputs else ""))
+        if args.staged:
+            state = "swapped in" if result.success else "discarded, live database unchanged"
+            print(f"\nStaged load {state}: {args.db}")
+        print("=" * 60)
+
+
+def main():
+    """Main entry point"""
+    cli = PopulatorCLI()
+    sys.exit(cli.run())
+
+
+if __name__ == "__main__":
+    main()
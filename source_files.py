@@ -0,0 +1,102 @@
+"""
+CSV source file locations and cheap file statistics.
+
+Kept free of pandas so that tools which only need to know where the sources
+are and how large they are (e.g. the execution plan) answer instantly.
+
+Sources may be delivered compressed (offeredCourses.csv.gz / .csv.zst). They
+are read as decompressing streams, never unpacked to disk: gzip with the
+multithreaded reader of python-isal when it is installed, zstd with the
+optional zstandard package.
+"""
+
+import os
+import gzip
+from pathlib import Path
+from typing import Dict, BinaryIO, Tuple
+
+try:
+    from isal import igzip_threaded
+except ImportError:  # Optional dependency, falls back to the gzip module
+    igzip_threaded = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, only needed for .zst sources
+    zstandard = None
+
+# Extractor parameter name -> file name in the data directory
+SOURCE_FILES: Dict[str, str] = {
+    'OfferedCourses': 'offeredCourses.csv',
+    'WorkLoad': 'workload.csv',
+}
+
+
+# Accepted variants of every source file, tried in this order
+COMPRESSION_SUFFIXES: Tuple[str, ...] = ('', '.gz', '.zst')
+
+
+def source_file_names(name: str) -> Tuple[str, ...]:
+    """All file names a source may be delivered as"""
+    return tuple(SOURCE_FILES[name] + suffix for suffix in COMPRESSION_SUFFIXES)
+
+
+def source_path(data_dir: str, name: str) -> Path:
+    """
+    Return the path of a CSV source in data_dir.
+
+    The plain .csv wins over compressed variants; if none exists, the plain
+    path is returned so that callers report the expected file name.
+    """
+    if name not in SOURCE_FILES:
+        raise ValueError(f"Unknown CSV source: {name}")
+    for file_name in source_file_names(name):
+        path = Path(data_dir) / file_name
+        if path.exists():
+            return path
+    return Path(data_dir) / SOURCE_FILES[name]
+
+
+def open_source(path: Path) -> BinaryIO:
+    """
+    Open a source file as a binary stream, decompressing .gz and .zst on the fly.
+
+    Raises:
+        ImportError: For .zst files when zstandard is not installed
+    """
+    path = Path(path)
+    if path.suffix == '.gz':
+        if igzip_threaded is not None:
+            return igzip_threaded.open(path, 'rb', threads=min(4, os.cpu_count() or 1))
+        return gzip.open(path, 'rb')
+    if path.suffix == '.zst':
+        if zstandard is None:
+            raise ImportError(f"Reading {path.name} requires the zstandard package (pip install zstandard)")
+        return zstandard.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def count_rows(path: Path, chunk_size: int = 1 << 20) -> int:
+    """Count data rows (lines minus header) without parsing the file"""
+    lines = 0
+    last = b'\n'
+    with open_source(path) as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1  # Last line without trailing newline
+    return max(lines - 1, 0)
+
+
+def source_row_counts(data_dir: str) -> Dict[str, int]:
+    """Row counts of all existing sources in data_dir"""
+    counts = {}
+    for name in SOURCE_FILES:
+        path = source_path(data_dir, name)
+        if path.exists():
+            counts[name] = count_rows(path)
+    return counts
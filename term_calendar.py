@@ -0,0 +1,227 @@
+"""
+Ordered term keys and the SEMESTER_PLANNING calendar.
+
+Terms are stored as codes like SS15, WS1415 and WS1516, which do not sort
+chronologically as strings. term_key() parses a code into one integer,
+year * 2 + season with SS = 0 and WS = 1, where the year of a winter term
+is the year it starts in. WS1415 (4029) therefore comes before SS15 (4030),
+and consecutive terms have consecutive keys, so ordering, carry-over and
+range checks are plain integer comparisons.
+
+TermCalendar holds the SEMESTER_PLANNING terms ordered by key, with their
+SP_IDs. It answers range queries ("the last 4 terms"), previous and next
+term, and maps whole term columns to SP_IDs or keys in one vectorized pass.
+Every method takes a term either as code or as SP_ID.
+
+Example:
+    calendar = TermCalendar.from_records(semester_planning)
+    calendar.last(2)                 # SP_IDs of the two latest terms
+    calendar.previous('WS1516')      # SP_ID of SS15
+    calendar.map_ids(df['term'])     # term codes -> SP_IDs
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Iterable
+
+TERM_PATTERN = re.compile(r'^(SS|WS)(\d{2})(\d{2})?$')
+
+SUMMER, WINTER = 0, 1
+
+
+def term_key(term: Any) -> int:
+    """
+    Chronological integer key of a term code (year * 2 + season).
+
+    Raises:
+        ValueError: If term is not a code like SS15 or WS1415 (a winter term
+            spans two consecutive years, a summer term names one)
+    """
+    match = TERM_PATTERN.match(str(term).strip().upper())
+    if not match:
+        raise ValueError(f"Invalid term code: {term!r}")
+    season = SUMMER if match.group(1) == 'SS' else WINTER
+    second_year = match.group(3)
+    if second_year is not None and (season == SUMMER or int(second_year) != (int(match.group(2)) + 1) % 100):
+        raise ValueError(f"Invalid term code: {term!r}")
+    return (2000 + int(match.group(2))) * 2 + season
+
+
+def is_term(term: Any) -> bool:
+    """True if term is a valid term code"""
+    try:
+        term_key(term)
+    except ValueError:
+        return False
+    return True
+
+
+def term_code(key: int) -> str:
+    """Term code of a key; the inverse of term_key()"""
+    year, season = divmod(int(key), 2)
+    if season == SUMMER:
+        return f"SS{year % 100:02d}"
+    return f"WS{year % 100:02d}{(year + 1) % 100:02d}"
+
+
+def term_sort_key(term: Any) -> tuple:
+    """Sort key for mixed values: term codes chronologically, anything else after them"""
+    try:
+        return (0, term_key(term), '')
+    except ValueError:
+        return (1, 0, str(term))
+
+
+def terms_before(terms: Iterable[Any], term: Any) -> List[str]:
+    """
+    The valid codes among terms that lie strictly before term, in chronological order.
+
+    Raises:
+        ValueError: If term is not a valid term code
+    """
+    cutoff = term_key(term)
+    return [code for code in sorted(map(str, terms), key=term_sort_key)
+            if term_sort_key(code)[0] == 0 and term_key(code) < cutoff]
+
+
+def term_keys(series: pd.Series) -> pd.Series:
+    """Keys of a column of term codes (nullable Int64, invalid codes become <NA>)"""
+    keys = {}
+    for value in pd.unique(series.dropna()):
+        try:
+            keys[value] = term_key(value)
+        except ValueError:
+            pass
+    return _map_values(series, keys).astype('Int64')
+
+
+class TermCalendar:
+    """SEMESTER_PLANNING terms in chronological order"""
+
+    def __init__(self, terms: Dict[Any, str]):
+        """
+        Args:
+            terms: SP_ID -> term code
+
+        Raises:
+            ValueError: If a term code is invalid or appears twice
+        """
+        ordered = sorted(((term_key(code), sp_id, str(code)) for sp_id, code in terms.items()),
+                         key=lambda item: item[0])
+        self.keys = np.array([key for key, _, _ in ordered], dtype='int64')
+        if len(self.keys) > 1 and not (np.diff(self.keys) > 0).all():
+            raise ValueError("Term codes in SEMESTER_PLANNING must be unique")
+        self.keys.flags.writeable = False
+        self.sp_ids = [sp_id for _, sp_id, _ in ordered]
+        self.terms = [code for _, _, code in ordered]
+        self._position = {sp_id: pos for pos, sp_id in enumerate(self.sp_ids)}
+        self._ids = {code: sp_id for code, sp_id in zip(self.terms, self.sp_ids)}
+
+    @classmethod
+    def from_records(cls, semester_planning: Iterable[Dict[str, Any]]) -> 'TermCalendar':
+        return cls({sem['SP_ID']: sem['SP_TERM'] for sem in semester_planning
+                    if sem.get('SP_ID') is not None and sem.get('SP_TERM') is not None})
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[Any], first_id: int = 1) -> 'TermCalendar':
+        """Calendar of the distinct valid codes, numbered chronologically from first_id"""
+        codes = {str(t).strip().upper() for t in terms if not pd.isna(t)}
+        codes = sorted((code for code in codes if is_term(code)), key=term_key)
+        return cls({first_id + i: code for i, code in enumerate(codes)})
+
+    def __len__(self) -> int:
+        return len(self.sp_ids)
+
+    def __contains__(self, term: Any) -> bool:
+        return self.position(term) is not None
+
+    # Lookups
+
+    def sp_id(self, term: Any) -> Optional[Any]:
+        """SP_ID of a term code (SP_IDs pass through); None if unknown"""
+        position = self.position(term)
+        return None if position is None else self.sp_ids[position]
+
+    def term(self, term: Any) -> Optional[str]:
+        """Term code of an SP_ID (codes pass through); None if unknown"""
+        position = self.position(term)
+        return None if position is None else self.terms[position]
+
+    def key(self, term: Any) -> Optional[int]:
+        position = self.position(term)
+        return None if position is None else int(self.keys[position])
+
+    def position(self, term: Any) -> Optional[int]:
+        """Chronological position of a term (code or SP_ID); None if unknown"""
+        if hasattr(term, 'item') and not isinstance(term, (str, bytes)):
+            term = term.item()
+        position = self._position.get(term)
+        if position is None:
+            position = self._position.get(self._ids.get(term))
+        return position
+
+    def id_mapping(self) -> Dict[str, Any]:
+        """Term code -> SP_ID"""
+        return dict(self._ids)
+
+    # Navigation
+
+    def previous(self, term: Any, steps: int = 1) -> Optional[Any]:
+        """SP_ID of the term steps terms before term; None before the first term"""
+        return self._shift(term, -steps)
+
+    def next(self, term: Any, steps: int = 1) -> Optional[Any]:
+        """SP_ID of the term steps terms after term; None after the last term"""
+        return self._shift(term, steps)
+
+    def last(self, count: int, until: Any = None) -> List[Any]:
+        """SP_IDs of the count latest terms up to and including until (default: the latest term)"""
+        end = len(self.sp_ids) if until is None else self._bound(until, side='right')
+        return self.sp_ids[max(end - count, 0):end]
+
+    def range(self, start: Any = None, end: Any = None) -> List[Any]:
+        """
+        SP_IDs of the terms from start to end, both included.
+
+        Bounds are codes or SP_IDs; codes need not be in the calendar
+        (range('SS15', 'WS1920') covers whatever lies in between). None
+        leaves that side open.
+        """
+        low = 0 if start is None else self._bound(start, side='left')
+        high = len(self.sp_ids) if end is None else self._bound(end, side='right')
+        return self.sp_ids[low:high]
+
+    # Vectorized mapping
+
+    def map_ids(self, series: pd.Series) -> pd.Series:
+        """Term codes -> SP_IDs for a whole column; unknown codes become NaN"""
+        return _map_values(series, self._ids)
+
+    def map_positions(self, series: pd.Series) -> pd.Series:
+        """SP_IDs -> chronological positions for a whole column"""
+        return series.map(self._position)
+
+    def _shift(self, term: Any, steps: int) -> Optional[Any]:
+        position = self.position(term)
+        if position is None:
+            raise KeyError(f"Unknown term: {term!r}")
+        target = position + steps
+        return self.sp_ids[target] if 0 <= target < len(self.sp_ids) else None
+
+    def _bound(self, term: Any, side: str) -> int:
+        """Insertion point of term's key in the sorted keys"""
+        key = self.key(term)
+        if key is None:
+            key = term_key(term)
+        return int(np.searchsorted(self.keys, key, side=side))
+
+
+def _map_values(series: pd.Series, mapping: Dict[Any, Any]) -> pd.Series:
+    """Series.map that resolves categoricals once per category (as fk_lookup.map_keys)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.empty(len(series.cat.categories) + 1, dtype=object)
+        lookup[:-1] = [mapping.get(value, np.nan) for value in series.cat.categories]
+        lookup[-1] = np.nan
+        return pd.Series(lookup[series.cat.codes.to_numpy()], index=series.index, name=series.name)
+    return series.map(mapping)
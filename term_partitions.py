@@ -0,0 +1,211 @@
+"""
+Term partitioning of the term-scoped Planning_Tool tables.
+
+OFFERING, COURSE, POSITION_PROFESSOR, SERVICE_REQUEST,
+PROGRAMM_SUBJECT_REQUIREMENT and DEPUTAT_ACCOUNT hold one slice of rows per
+SEMESTER_PLANNING term. Storing every slice separately means that reading
+or reloading a single term touches only that term's partition, and that an
+old term can be archived without rewriting the current ones.
+
+The term column differs per table: most tables reference SEMESTER_PLANNING
+by SP_ID, COURSE stores the term code itself. TermResolver maps both forms
+to the term code, which names the partitions (e.g. OFFERING/WS1516).
+"""
+
+import re
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+# Term-scoped table -> column holding its term (SP_ID or term code)
+TERM_COLUMNS: Dict[str, str] = {
+    'OFFERING': 'FK_SEMESTER_PLANNING',
+    'COURSE': 'C_SEMESTER',
+    'POSITION_PROFESSOR': 'TERM',
+    'SERVICE_REQUEST': 'FK_SEMESTER_PLANNING',
+    'PROGRAMM_SUBJECT_REQUIREMENT': 'FK_SEMESTER_PLANNING',
+    'DEPUTAT_ACCOUNT': 'FK_SEMESTER_PLANNING',
+}
+
+# Partition of rows without a (resolvable) term
+NO_TERM = '_none'
+
+
+def partition_name(term: Any) -> str:
+    """File and identifier safe partition name of a term"""
+    if term is None or (isinstance(term, float) and term != term):
+        return NO_TERM
+    return re.sub(r'[^A-Za-z0-9_-]', '_', str(term)) or NO_TERM
+
+
+class TermResolver:
+    """Maps SP_IDs and term codes to term codes"""
+
+    def __init__(self, id_to_term: Optional[Dict[Any, str]] = None):
+        self._id_to_term = dict(id_to_term or {})
+
+    @classmethod
+    def from_records(cls, semester_planning: Iterable[Dict[str, Any]]) -> 'TermResolver':
+        id_to_term = {}
+        for sem in semester_planning:
+            # SP_NAME is still emitted by older SEMESTER_PLANNING extractors
+            term = sem.get('SP_TERM', sem.get('SP_NAME'))
+            if sem.get('SP_ID') is not None and term is not None:
+                id_to_term[sem['SP_ID']] = str(term)
+                # Schema coercion turns SP_IDs in VARCHAR columns (POSITION_PROFESSOR.TERM) into strings
+                id_to_term[str(sem['SP_ID'])] = str(term)
+        return cls(id_to_term)
+
+    def term(self, value: Any) -> str:
+        if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+            value = value.item()
+        return partition_name(self._id_to_term.get(value, value))
+
+    def key(self, value: Any) -> Optional[int]:
+        """Chronological integer key of an SP_ID or term code; None for rows without a valid term"""
+        from term_calendar import term_key
+        try:
+            return term_key(self.term(value))
+        except ValueError:
+            return None
+
+
+def partition_records(table: str, records: List[Dict[str, Any]],
+                      resolver: Optional[TermResolver] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split the records of a term-scoped table by term code.
+
+    Raises:
+        ValueError: If table is not term-scoped
+    """
+    if table not in TERM_COLUMNS:
+        raise ValueError(f"{table} is not partitioned by term")
+    column = TERM_COLUMNS[table]
+    resolver = resolver or TermResolver()
+    partitions: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        partitions.setdefault(resolver.term(record.get(column)), []).append(record)
+    return partitions
+
+
+class PartitionedRecordCache:
+    """
+    On-disk cache of extracted tables, one file per term partition.
+
+    Layout: <root>/<TABLE>/<TERM>.bin plus a manifest with row counts and
+    content digests; tables without a term column are a single _all
+    partition. Writing a table rewrites only the partitions whose content
+    changed. Archived terms move to <root>/archive/<TERM>/ and are no longer
+    written or read.
+    """
+
+    ALL = '_all'
+
+    def __init__(self, root: str, resolver: Optional[TermResolver] = None):
+        self.root = Path(root)
+        self.resolver = resolver or TermResolver()
+
+    def write_table(self, table: str, records: List[Dict[str, Any]]) -> List[str]:
+        """Store a table and return the names of the partitions that were rewritten"""
+        from output_store import encode_records
+
+        if table in TERM_COLUMNS:
+            partitions = partition_records(table, records, self.resolver)
+        else:
+            partitions = {self.ALL: records}
+        archived = self.archived_terms()
+        manifest = self._manifest(table)
+        table_dir = self.root / table
+        table_dir.mkdir(parents=True, exist_ok=True)
+
+        written = []
+        for term, rows in partitions.items():
+            if term in archived:
+                logger.debug(f"{table}/{term} is archived, not cached")
+                continue
+            blob = encode_records(rows)
+            digest = hashlib.sha1(blob).hexdigest()
+            if manifest.get(term, {}).get('digest') == digest:
+                continue
+            tmp_path = table_dir / f".{term}.tmp"
+            tmp_path.write_bytes(blob)
+            tmp_path.replace(table_dir / f"{term}.bin")
+            manifest[term] = {'rows': len(rows), 'digest': digest}
+            written.append(term)
+
+        for term in [t for t in manifest if t not in partitions]:
+            (table_dir / f"{term}.bin").unlink(missing_ok=True)
+            del manifest[term]
+        self._save_manifest(table, manifest)
+        return written
+
+    def read(self, table: str, terms: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Read a table, or only the given term partitions of it.
+
+        Raises:
+            ValueError: If terms are given for a table that is not term-scoped
+        """
+        from output_store import decode_records
+
+        if terms is not None and table not in TERM_COLUMNS:
+            raise ValueError(f"{table} is not partitioned by term")
+        manifest = self._manifest(table)
+        wanted = list(manifest) if terms is None else [partition_name(t) for t in terms]
+        records: List[Dict[str, Any]] = []
+        for term in wanted:
+            if term in manifest:
+                records.extend(decode_records((self.root / table / f"{term}.bin").read_bytes()))
+        return records
+
+    def terms(self, table: str) -> List[str]:
+        """Cached partitions of table, term codes in chronological order"""
+        from term_calendar import term_sort_key
+        return sorted(self._manifest(table), key=term_sort_key)
+
+    def __contains__(self, table: str) -> bool:
+        return (self.root / table / 'manifest.json').exists()
+
+    def drop(self, table: str) -> None:
+        shutil.rmtree(self.root / table, ignore_errors=True)
+
+    def archive(self, term: str) -> List[str]:
+        """Move every partition of term into the archive; returns the archived tables"""
+        term = partition_name(term)
+        target = self.root / 'archive' / term
+        moved = []
+        for table in TERM_COLUMNS:
+            manifest = self._manifest(table)
+            if term not in manifest:
+                continue
+            target.mkdir(parents=True, exist_ok=True)
+            (self.root / table / f"{term}.bin").replace(target / f"{table}.bin")
+            del manifest[term]
+            self._save_manifest(table, manifest)
+            moved.append(table)
+        archived = self.archived_terms() | {term}
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / 'archived.json').write_text(json.dumps(sorted(archived)), encoding='utf-8')
+        return moved
+
+    def archived_terms(self) -> Set[str]:
+        try:
+            return set(json.loads((self.root / 'archived.json').read_text(encoding='utf-8')))
+        except FileNotFoundError:
+            return set()
+
+    def _manifest(self, table: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads((self.root / table / 'manifest.json').read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, table: str, manifest: Dict[str, Dict[str, Any]]) -> None:
+        path = self.root / table / 'manifest.json'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
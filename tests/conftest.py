@@ -0,0 +1,14 @@
+"""
+Shared pytest setup.
+
+Root modules and the extractor helpers are imported as top-level modules
+(as the extractor registry does), so both directories go on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / 'extractors'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
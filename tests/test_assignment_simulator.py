@@ -0,0 +1,86 @@
+import pytest
+
+from assignment_simulator import AssignmentSimulator
+
+SEMESTERS = [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}]
+TEACHERS = [{'T_ID': 86, 'T_ISPROFESSOR': True}, {'T_ID': 7, 'T_ISPROFESSOR': False}]
+OFFERINGS = [{'O_ID': 10, 'FK_SEMESTER_PLANNING': 1}, {'O_ID': 11, 'FK_SEMESTER_PLANNING': 2}]
+COURSES = [
+    {'C_TEACHER': 86, 'C_SEMESTER': 'WS1415', 'C_CREDITED_HOURS': 4.0, 'FK_OFFERING': 10},
+    {'C_TEACHER': 86, 'C_SEMESTER': 'SS15', 'C_CREDITED_HOURS': 2.0, 'FK_OFFERING': 11},
+    {'C_TEACHER': 7, 'C_SEMESTER': 'SS15', 'C_CREDITED_HOURS': 2.0, 'FK_OFFERING': 11},
+]
+ASSIGNMENTS = [
+    {'OA_ID': 1, 'FK_OFFERING': 10, 'FK_TEACHER': 86, 'OA_ASSIGNED_HOURS': 4.0},
+    {'OA_ID': 2, 'FK_OFFERING': 11, 'FK_TEACHER': 86, 'OA_ASSIGNED_HOURS': 2.0},
+    {'OA_ID': 3, 'FK_OFFERING': 11, 'FK_TEACHER': 7, 'OA_ASSIGNED_HOURS': 2.0},
+]
+
+
+def simulator(courses=COURSES, assignments=ASSIGNMENTS):
+    return AssignmentSimulator(TEACHERS, SEMESTERS, courses, OFFERINGS, assignments, [])
+
+
+def balance(sim, teacher):
+    return sim.teacher_balances(teacher)['ACC_BALANCE'].tolist()
+
+
+def test_reassign_moves_assignment_and_course_hours():
+    sim = simulator()
+    assert balance(sim, 86) == pytest.approx([4.0 - 18.0, 6.0 - 36.0])
+    step = sim.reassign(1, 7)
+    assert [change.course_rows for change in step.changes] == [[0]]
+    assert sim.teacher_load(7)['ASSIGNED_HOURS'].tolist() == pytest.approx([4.0, 2.0])
+    assert balance(sim, 7) == pytest.approx([4.0, 6.0])
+    assert balance(sim, 86) == pytest.approx([-18.0, 2.0 - 36.0])
+    assert sim.affected_teachers() == [7, 86]
+
+
+def test_courses_stay_while_the_old_teacher_keeps_an_assignment():
+    sim = simulator(assignments=ASSIGNMENTS + [
+        {'OA_ID': 4, 'FK_OFFERING': 10, 'FK_TEACHER': 86, 'OA_ASSIGNED_HOURS': 1.0}])
+    sim.reassign(1, 7)
+    assert sim.teacher_load(7)['CREDITED_HOURS'].tolist() == pytest.approx([0.0, 2.0])
+    sim.reassign(4, 7)
+    assert sim.teacher_load(7)['CREDITED_HOURS'].tolist() == pytest.approx([4.0, 2.0])
+
+
+@pytest.mark.parametrize('swap', [{2: 7, 3: 86}, {3: 86, 2: 7}])
+def test_swapping_two_teachers_swaps_their_courses(swap):
+    sim = simulator(courses=COURSES[:2] + [dict(COURSES[2], C_CREDITED_HOURS=1.0)])
+    sim.apply(swap)
+    assert sim.teacher_load(86)['CREDITED_HOURS'].tolist() == pytest.approx([4.0, 1.0])
+    assert sim.teacher_load(7)['CREDITED_HOURS'].tolist() == pytest.approx([0.0, 2.0])
+    sim.undo()
+    assert sim.teacher_load(86)['CREDITED_HOURS'].tolist() == pytest.approx([4.0, 2.0])
+    assert sim.teacher_load(7)['CREDITED_HOURS'].tolist() == pytest.approx([0.0, 1.0])
+
+def test_undo_and_rollback_restore_the_extracted_state():
+    sim = simulator()
+    before = sim.balances()
+    mark = sim.checkpoint()
+    sim.reassign(1, 7)
+    sim.apply({2: 7, 3: 86}, label='swap SS15')
+    assert [step.label for step in sim.steps] == ['OA 1 -> T 7', 'swap SS15']
+    assert sim.undo().label == 'swap SS15'
+    sim.rollback(mark)
+    assert sim.balances().equals(before)
+    assert {r['OA_ID']: r['FK_TEACHER'] for r in sim.assignments()} == {1: 86, 2: 86, 3: 7}
+    assert sim.undo() is None
+
+
+def test_unknown_assignment_or_teacher():
+    sim = simulator()
+    with pytest.raises(KeyError):
+        sim.reassign(99, 7)
+    with pytest.raises(KeyError):
+        sim.reassign(1, 99)
+    assert sim.steps == []
+
+
+def test_empty_inputs():
+    sim = simulator(courses=[], assignments=[])
+    assert sim.balances().empty
+    assert sim.assignments() == []
+    assert sim.teacher_load(7)['ASSIGNED_HOURS'].tolist() == [0.0, 0.0]
+    assert sim.rollback() is None
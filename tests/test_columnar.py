@@ -0,0 +1,65 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from columnar import ColumnarTable, as_columnar
+
+RECORDS = [
+    {'T_ID': 86, 'T_NAME': 'Reinhard', 'T_ISPROFESSOR': True, 'HOURS': 4.5},
+    {'T_ID': 7, 'T_NAME': None, 'T_ISPROFESSOR': False, 'HOURS': 2.0},
+]
+
+
+def test_native_and_object_columns():
+    table = ColumnarTable.from_records(RECORDS)
+    assert table.column('T_ID').dtype == np.int64
+    assert table.column('T_ISPROFESSOR').dtype == bool
+    assert table.column('T_NAME').dtype == object
+    with pytest.raises(ValueError):
+        table.column('T_ID')[0] = 1
+
+
+def test_rows_round_trip_and_compare_equal():
+    table = as_columnar(RECORDS)
+    assert len(table) == 2
+    assert table == RECORDS
+    assert table[0]['T_NAME'] == 'Reinhard'
+    assert [dict(row) for row in table] == RECORDS
+    assert pickle.loads(pickle.dumps(table)) == RECORDS
+
+
+def test_shared_rows_are_read_only():
+    table = as_columnar(RECORDS)
+    with pytest.raises(TypeError):
+        table[0]['T_ID'] = 1
+    copy = dict(table[0])
+    copy['T_ID'] = 1
+    assert table[0]['T_ID'] == 86
+
+
+def test_mapping_and_unique():
+    table = as_columnar(RECORDS)
+    assert table.mapping('T_ID', 'T_NAME') == {86: 'Reinhard', 7: None}
+    assert table.unique('T_ID') == {86, 7}
+    with pytest.raises(KeyError):
+        table.column('S_NR')
+
+
+def test_empty_table_has_empty_columns():
+    table = ColumnarTable.from_records([])
+    assert len(table) == 0
+    assert table.unique('T_ID') == set()
+    assert table.mapping('S_NR', 'S_ID') == {}
+    assert list(table.to_frame(['T_ID']).columns) == ['T_ID']
+    assert table == []
+
+
+def test_mixed_string_and_float_keys_keep_their_values():
+    # Coerced VARCHAR keys arrive as strings, IDs of gappy columns as floats
+    records = [{'SP_ID': 1, 'TERM': '2'}, {'SP_ID': 2.0, 'TERM': 1.0}, {'SP_ID': None, 'TERM': None}]
+    table = ColumnarTable.from_records(records)
+    assert table.column('SP_ID').dtype == object
+    assert table.mapping('SP_ID', 'TERM')[2] == 1.0
+    assert table.unique('TERM') == {'2', 1.0, None}
+    assert table == records
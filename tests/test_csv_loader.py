@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from conftest import ROOT
+from csv_loader import CsvSourceLoader
+
+
+def load_workload():
+    loader = CsvSourceLoader(ROOT / 'data')
+    return loader, loader.load(columns={'WorkLoad': ['name']})['WorkLoad']
+
+
+def test_lazy_columns_keep_their_interned_dtype():
+    loader, workload = load_workload()
+    assert 'job title' in workload.unloaded_columns
+
+    positions = workload['job title']
+    assert positions.dtype == loader.dictionaries['position']
+    assert workload[['name', 'job title']]['job title'].dtype == loader.dictionaries['position']
+    assert 'job title' not in workload.unloaded_columns
+
+
+def test_lazy_loads_do_not_modify_the_shared_frame():
+    _, workload = load_workload()
+    columns = list(workload.columns)
+    with ThreadPoolExecutor(4) as pool:
+        projections = list(pool.map(lambda _: workload[['name', 'job title', 'reduction']], range(8)))
+
+    assert list(workload.columns) == columns
+    for projection in projections:
+        pd.testing.assert_frame_equal(projection, projections[0])
+
+
+def test_shared_dictionaries_keep_one_dtype():
+    loader = CsvSourceLoader(ROOT / 'data')
+    frames = loader.load(columns={'OfferedCourses': ['sbjNo'], 'WorkLoad': ['name']})
+    offered, workload = frames['OfferedCourses'], frames['WorkLoad']
+    assert 'term' in offered.unloaded_columns and 'term' in workload.unloaded_columns
+
+    # The first lazy load seeds the dictionary with the terms of both sources
+    offered_terms = offered['term']
+    workload_terms = workload['term']
+    assert offered_terms.dtype == workload_terms.dtype == loader.dictionaries['term']
+    assert set(workload_terms.dropna()) <= set(offered_terms.dtype.categories)
+
+    # Wanting a shared column in one source parses it in the other one too
+    loader = CsvSourceLoader(ROOT / 'data')
+    frames = loader.load(columns={'OfferedCourses': ['term'], 'WorkLoad': ['name']})
+    assert 'term' in frames['WorkLoad'].columns
+    assert frames['WorkLoad']['term'].dtype == frames['OfferedCourses']['term'].dtype
@@ -0,0 +1,128 @@
+import sqlite3
+
+import pytest
+
+from db_sink import (LoadVerificationError, PartitionedSqliteSink, SqliteSink, StagedSqliteSink,
+                     UpsertSqliteSink)
+from schema_model import load_schema
+
+DEPARTMENTS = [{'D_NAME': 'IT'}, {'D_NAME': 'G'}]
+
+
+def staged(tmp_path):
+    return StagedSqliteSink(str(tmp_path / 'planning.db'), schema=load_schema()).open()
+
+
+def test_staged_swap_with_valid_keys(tmp_path):
+    sink = staged(tmp_path)
+    sink.write_table('DEPARTMENT', DEPARTMENTS)
+    sink.write_table('STUDY_PROGRAM', [{'ST_NAME': 'SWB', 'ST_DEPARTMENT': 'IT'}])
+    sink.commit()
+    with sqlite3.connect(tmp_path / 'planning.db') as connection:
+        assert connection.execute('SELECT ST_DEPARTMENT FROM STUDY_PROGRAM').fetchall() == [('IT',)]
+
+
+def test_staged_swap_refuses_foreign_key_violations(tmp_path):
+    sink = staged(tmp_path)
+    sink.write_table('DEPARTMENT', DEPARTMENTS)
+    sink.write_table('STUDY_PROGRAM', [{'ST_NAME': 'SWB', 'ST_DEPARTMENT': 'XX'}])
+    with pytest.raises(LoadVerificationError, match='foreign key'):
+        sink.commit()
+    assert not (tmp_path / 'planning.db').exists()
+
+
+def test_staged_load_refuses_duplicate_primary_keys(tmp_path):
+    sink = staged(tmp_path)
+    with pytest.raises(LoadVerificationError, match='DEPARTMENT'):
+        sink.write_table('DEPARTMENT', DEPARTMENTS + [{'D_NAME': 'IT'}])
+    sink.abort()
+
+
+def test_staged_load_refuses_duplicate_natural_keys(tmp_path):
+    sink = staged(tmp_path)
+    sink.write_table('DEPARTMENT', DEPARTMENTS)
+    sink.write_table('STUDY_PROGRAM', [{'ST_NAME': 'SWB', 'ST_DEPARTMENT': 'IT'}])
+    sink.write_table('SUBJECT', [{'S_NR': '1051001-SWB', 'S_STUDY_PROGRAM': 'SWB'}])
+    sink.write_table('SEMESTER_PLANNING', [{'SP_ID': 1, 'SP_TERM': 'WS1415'}])
+    with pytest.raises(LoadVerificationError, match='UNIQUE'):
+        sink.write_table('OFFERING', [offering(1, '1051001-SWB', 1), offering(2, '1051001-SWB', 1)])
+    sink.abort()
+
+def test_staged_swap_refuses_empty_tables_with_source_rows(tmp_path):
+    sink = staged(tmp_path)
+    sink.write_table('DEPARTMENT', [])
+    sink.input_rows['DEPARTMENT'] = 996
+    with pytest.raises(LoadVerificationError, match='empty'):
+        sink.commit()
+    assert not (tmp_path / 'planning.db').exists()
+
+
+def offering(o_id, subject, term):
+    return {'O_ID': o_id, 'FK_SUBJECT': subject, 'FK_SEMESTER_PLANNING': term, 'O_PLANNED_HOURS': 4.0}
+
+
+def assignment(oa_id, o_id, teacher):
+    return {'OA_ID': oa_id, 'FK_OFFERING': o_id, 'FK_TEACHER': teacher, 'OA_ASSIGNED_HOURS': 4.0}
+
+
+def upsert(db_path, offerings, assignments):
+    sink = UpsertSqliteSink(str(db_path), schema=load_schema()).open()
+    sink.write_table('OFFERING', offerings)
+    sink.write_table('OFFERING_ASSIGNMENT', assignments)
+    sink.close()
+    with sqlite3.connect(db_path) as connection:
+        stored = connection.execute('SELECT O_ID, FK_SUBJECT FROM OFFERING ORDER BY O_ID').fetchall()
+        linked = assignments and connection.execute(
+            'SELECT OA_ID, FK_SUBJECT FROM OFFERING_ASSIGNMENT JOIN OFFERING ON FK_OFFERING = O_ID '
+            'ORDER BY OA_ID').fetchall()
+    return sink, stored, linked
+
+
+def test_upsert_keeps_surrogate_ids_of_existing_rows(tmp_path):
+    db_path = tmp_path / 'planning.db'
+    upsert(db_path, [offering(1, 'A', 1), offering(2, 'B', 1)], [assignment(1, 1, 7), assignment(2, 2, 7)])
+
+    # A new offering sorts first, so the extractor numbers the existing ones differently
+    sink, stored, linked = upsert(
+        db_path, [offering(1, 'C', 1), offering(2, 'A', 1), offering(3, 'B', 1)],
+        [assignment(1, 1, 7), assignment(2, 2, 7), assignment(3, 3, 7)])
+    assert stored == [(1, 'A'), (2, 'B'), (3, 'C')]
+    assert sink.changes['OFFERING'] == (1, 0, 0)
+    assert sink.changes['OFFERING_ASSIGNMENT'] == (1, 0, 0)
+    assert linked == [(1, 'A'), (2, 'B'), (3, 'C')]
+
+
+def test_upsert_bulk_inserts_track_rowids(tmp_path):
+    db_path = tmp_path / 'planning.db'
+    upsert(db_path, [offering(1, 'A', 1), offering(2, 'B', 1)], [])
+    upsert(db_path, [offering(1, 'B', 1), offering(2, 'C', 1), offering(3, 'D', 1)], [])
+
+    changed = [offering(1, 'B', 1), offering(2, 'C', 1), dict(offering(3, 'D', 1), O_PLANNED_HOURS=2.0)]
+    sink, stored, _ = upsert(db_path, changed, [])
+    assert sink.changes['OFFERING'] == (0, 1, 0)
+    assert stored == [(2, 'B'), (3, 'C'), (4, 'D')]
+
+
+def test_plain_sink_writes_union_of_columns_and_empty_tables(tmp_path):
+    sink = SqliteSink(str(tmp_path / 'planning.db')).open()
+    assert sink.write_table('DEPARTMENT', [{'D_NAME': 'IT'}, {'D_NAME': 'G', 'D_NOTE': 'x'}]) == 2
+    assert sink.write_table('SERVICE_REQUEST', []) == 0
+    sink.commit()
+    with sqlite3.connect(tmp_path / 'planning.db') as connection:
+        assert connection.execute('SELECT D_NAME, D_NOTE FROM DEPARTMENT').fetchall() == [('IT', None), ('G', 'x')]
+        assert connection.execute('SELECT COUNT(*) FROM SERVICE_REQUEST').fetchone() == (0,)
+
+
+def test_partitioned_sink_splits_term_tables_by_term(tmp_path):
+    sink = PartitionedSqliteSink(str(tmp_path / 'planning.db')).open()
+    sink.write_table('SEMESTER_PLANNING', [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}])
+    # Float term IDs (FK columns with gaps) land in the same partitions as integer ones
+    offerings = [offering(1, 'A', 1), offering(2, 'A', 2.0)]
+    sink.write_table('OFFERING', offerings)
+    assert sink.partitions('OFFERING') == {'WS1415': 1, 'SS15': 1}
+    assert sink.write_table('OFFERING', offerings + [offering(3, 'B', 2)]) == 3
+    assert sink.partitions('OFFERING') == {'WS1415': 1, 'SS15': 2}
+    assert sink.write_table('OFFERING', []) == 0
+    assert sink.partitions('OFFERING') == {}
+    sink.close()
+
@@ -0,0 +1,114 @@
+import pytest
+
+from deputat_balance import DeputatBalanceEngine
+
+SEMESTERS = [
+    {'SP_ID': 1, 'SP_TERM': 'WS1415'},
+    {'SP_ID': 2, 'SP_TERM': 'SS15'},
+    {'SP_ID': 3, 'SP_TERM': 'WS1516'},
+]
+TEACHERS = [
+    {'T_ID': 86, 'T_ISPROFESSOR': True},
+    {'T_ID': 7, 'T_ISPROFESSOR': False},
+]
+
+
+def course(teacher, term, hours):
+    return {'C_TEACHER': teacher, 'C_SEMESTER': term, 'C_CREDITED_HOURS': hours}
+
+
+def reduction(professor, term, hours):
+    return {'P_ID': professor, 'TERM': term, 'CREDIT_HOURS': hours}
+
+
+def balances(engine):
+    frame = engine.balances()
+    return {(int(r.T_ID), int(r.SP_ID)): r.ACC_BALANCE for r in frame.itertuples()}
+
+
+def test_string_and_float_term_keys_aggregate_into_one_row():
+    # Coerced VARCHAR TERM values arrive as strings, SP_IDs mapped from codes as floats
+    engine = DeputatBalanceEngine(TEACHERS, SEMESTERS)
+    engine.load(
+        [course(86, 'WS1415', 10.0), course(86, 'SS15', 6.0)],
+        [reduction(86, '2', 2.0), reduction(86, 1.0, 2.0)],
+    )
+    frame = engine.balances()
+    assert not frame.duplicated(['T_ID', 'SP_ID']).any()
+    assert balances(engine)[(86, 1)] == pytest.approx(12.0 - 18.0)
+    assert balances(engine)[(86, 2)] == pytest.approx(-6.0 + 8.0 - 18.0)
+    assert balances(engine)[(86, 3)] == pytest.approx(-16.0 - 18.0)
+
+
+def test_empty_inputs():
+    engine = DeputatBalanceEngine(TEACHERS, SEMESTERS)
+    assert engine.load([], []).empty
+    assert engine.to_records() == []
+
+
+HISTORY = [course(86, 'WS1415', 10.0), course(86, 'SS15', 6.0), course(7, 'SS15', 4.0)]
+
+
+def test_update_term_matches_full_reload():
+    engine = DeputatBalanceEngine(TEACHERS, SEMESTERS)
+    engine.load(HISTORY, [reduction(86, 2, 2.0)])
+    engine.update_term('SS15', [course(86, 'SS15', 9.0), course(7, 'SS15', 4.0)])
+
+    reloaded = DeputatBalanceEngine(TEACHERS, SEMESTERS)
+    reloaded.load([course(86, 'WS1415', 10.0), course(86, 'SS15', 9.0), course(7, 'SS15', 4.0)],
+                  [reduction(86, 2, 2.0)])
+    assert engine.to_records() == reloaded.to_records()
+
+
+def test_update_term_returns_only_changed_rows():
+    engine = DeputatBalanceEngine(TEACHERS, SEMESTERS)
+    engine.load(HISTORY, [])
+    ids = {(r['FK_TEACHER'], r['FK_SEMESTER_PLANNING']): r['ACC_ID'] for r in engine.to_records()}
+
+    changes = engine.update_term(2, [course(86, 'SS15', 9.0), course(7, 'SS15', 4.0)])
+    assert list(zip(changes['T_ID'], changes['SP_ID'])) == [(86, 2), (86, 3)]
+    assert [r['ACC_ID'] for r in engine.to_records(changes)] == [ids[(86, 2)], ids[(86, 3)]]
+    assert engine.update_term(2, [course(86, 'SS15', 9.0), course(7, 'SS15', 4.0)]).empty
+
+
+def test_update_term_adds_new_teacher_with_full_history():
+    teachers = TEACHERS + [{'T_ID': 12, 'T_ISPROFESSOR': True}]
+    engine = DeputatBalanceEngine(teachers, SEMESTERS)
+    engine.load(HISTORY, [])
+    changes = engine.update_term('WS1516', [course(12, 'WS1516', 20.0)])
+
+    assert list(zip(changes['T_ID'], changes['SP_ID'])) == [(12, 1), (12, 2), (12, 3)]
+    assert balances(engine)[(12, 3)] == pytest.approx(-18.0 - 18.0 + 2.0)
+    assert balances(engine)[(86, 3)] == pytest.approx(-8.0 - 12.0 - 18.0)
+    assert len({r['ACC_ID'] for r in engine.to_records()}) == 9
+
+
+def test_baseline_hours_option():
+    from simple_db_populator import parse_baseline_hours
+
+    assert parse_baseline_hours('20') == {True: 20.0, False: 0.0}
+    assert parse_baseline_hours('18,4.5') == {True: 18.0, False: 4.5}
+    for value in ('', 'x', '18,4,2', '-1'):
+        with pytest.raises(ValueError):
+            parse_baseline_hours(value)
+    engine = DeputatBalanceEngine(TEACHERS, SEMESTERS, baseline_hours=parse_baseline_hours('20,2'))
+    engine.load([course(7, 'WS1415', 3.0)], [])
+    assert balances(engine)[(7, 1)] == pytest.approx(1.0)
+
+
+def test_extractor_updates_only_the_changed_terms():
+    from deputat_account import DeputatAccountExtractor
+
+    history = [course(86, 'WS1415', 10.0), course(7, 'SS15', 4.0), course(86, 'WS1516', 2.0)]
+    edited = history[:2] + [course(86, 'WS1516', 8.0)]
+    extractor = DeputatAccountExtractor()
+    extractor.extract(TEACHERS, SEMESTERS, history, [])
+    engine = extractor.engine
+
+    records = extractor.extract(TEACHERS, SEMESTERS, edited, [], changed_terms=['WS1516'])
+    assert extractor.engine is engine
+    assert records == DeputatAccountExtractor().extract(TEACHERS, SEMESTERS, edited, [])
+
+    # Other teachers or terms than before: the history is reloaded
+    extractor.extract(TEACHERS[:1], SEMESTERS, edited, [], changed_terms=['WS1516'])
+    assert extractor.engine is not engine
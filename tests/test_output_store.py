@@ -0,0 +1,89 @@
+import pytest
+
+from columnar import ColumnarTable
+from output_store import OutputStore, decode_records, encode_records, parse_size
+
+SEMESTER_PLANNING = [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}]
+TEACHER = ColumnarTable.from_records(
+    [{'T_ID': i, 'T_NAME': f'teacher {i}', 'T_ISPROFESSOR': i % 3 == 0} for i in range(1, 301)])
+OFFERING = ColumnarTable.from_records(
+    [{'O_ID': i, 'FK_SUBJECT': i % 40, 'FK_SEMESTER_PLANNING': 1 + i % 2, 'O_HOURS': i / 4}
+     for i in range(1, 401)])
+
+
+def rows(table):
+    return sorted((dict(row) for row in table), key=repr)
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Far below the size of TEACHER and OFFERING, so every put spills
+    store = OutputStore({'SEMESTER_PLANNING': 1, 'TEACHER': 2, 'OFFERING': 1},
+                        budget_bytes=1024, spill_dir=str(tmp_path))
+    store.put('SEMESTER_PLANNING', SEMESTER_PLANNING)
+    store.put('TEACHER', TEACHER)
+    store.put('OFFERING', OFFERING)
+    yield store
+    store.close()
+
+
+def test_parse_size():
+    assert parse_size('512') == 512
+    assert parse_size('2K') == 2048
+    assert parse_size('1.5 MiB') == 3 << 19
+    with pytest.raises(ValueError):
+        parse_size('lots')
+
+
+def test_encoded_records_round_trip():
+    records = [{'A': 1, 'B': 'x'}, {'A': None, 'C': 2.5}]
+    assert decode_records(encode_records(records)) == [{'A': 1, 'B': 'x', 'C': None},
+                                                       {'A': None, 'B': None, 'C': 2.5}]
+    assert decode_records(encode_records([{}, {}])) == [{}, {}]
+
+
+def test_over_budget_outputs_spill_and_reload_unchanged(store, tmp_path):
+    assert store.spill_count >= 2
+    assert store.current_bytes <= store.budget_bytes
+    assert list(tmp_path.glob('*/TEACHER')) and list(tmp_path.glob('*/OFFERING'))
+
+    assert 'TEACHER' in store and 'OFFERING' in store
+    assert rows(store.get('TEACHER')) == rows(TEACHER)
+    assert rows(store.get('OFFERING')) == rows(OFFERING)
+    # A spilled term-scoped table reads back single terms
+    assert rows(store.get('OFFERING', terms=['SS15'])) == \
+        rows(r for r in OFFERING if r['FK_SEMESTER_PLANNING'] == 2)
+
+
+def test_resident_outputs_are_returned_as_stored():
+    store = OutputStore({'TEACHER': 1})
+    store.put('TEACHER', TEACHER)
+    assert store.get('TEACHER') is TEACHER
+    assert store.spill_count == 0 and store.peak_bytes == TEACHER.nbytes
+
+
+def test_outputs_are_dropped_after_their_last_consumer(store, tmp_path):
+    store.release('TEACHER')
+    assert rows(store.get('TEACHER')) == rows(TEACHER)
+    store.release('TEACHER')
+    assert 'TEACHER' not in store
+    assert not list(tmp_path.glob('*/TEACHER'))
+    with pytest.raises(KeyError):
+        store.get('TEACHER')
+
+    # Outputs nobody consumes are not kept at all
+    store.put('SUBJECT', [{'S_ID': 1}])
+    assert 'SUBJECT' not in store
+
+    store.release('OFFERING')
+    store.release('SEMESTER_PLANNING')
+    assert store.current_bytes == 0
+    store.close()
+    assert not any(tmp_path.iterdir())
+
+
+def test_retaining_store_ignores_releases():
+    store = OutputStore({}, retain=True)
+    store.put('TEACHER', TEACHER)
+    store.release('TEACHER')
+    assert store.get('TEACHER') is TEACHER
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+import simple_db_populator
+from semester_planning import SemesterPlanningExtractor
+from shared_sources import SharedSources, block_key
+
+SOURCES = {
+    'OfferedCourses': pd.DataFrame({'term': pd.Categorical(['WS1415', 'SS15', 'WS1415'])}),
+    'WorkLoad': pd.DataFrame({'term': pd.Categorical(['WS1516'])}),
+}
+
+
+@pytest.fixture
+def shared():
+    shared = SharedSources.publish(SOURCES)
+    yield shared
+    simple_db_populator._process_projection_caches.pop(block_key(shared.handles[0]), None)
+    shared.close()
+
+
+def test_extractor_state_and_cache_follow_the_shared_sources(shared):
+    records, _, state, events = simple_db_populator._extract_in_process(
+        SemesterPlanningExtractor(), shared.handles, {})
+    assert [r['SP_TERM'] for r in records] == ['WS1415', 'SS15', 'WS1516']
+    assert state['calendar'].terms == ['WS1415', 'SS15', 'WS1516']
+    assert events == []
+    assert block_key(shared.handles[0]) in simple_db_populator._process_projection_caches
+
+
+def test_traced_extraction_returns_the_worker_spans(shared):
+    try:
+        _, _, _, events = simple_db_populator._extract_in_process(
+            SemesterPlanningExtractor(), shared.handles, {}, trace_origin=123)
+        spans = [e for e in events if e['ph'] == 'X']
+        assert ('SEMESTER_PLANNING', 'extractor') in {(e['name'], e['cat']) for e in spans}
+        assert {e['pid'] for e in events} == {os.getpid()}
+        assert any(e['ph'] == 'M' and e['args'].get('name', '').startswith('extractor worker') for e in events)
+        # The next task of the same worker sends only its own events
+        _, _, _, events = simple_db_populator._extract_in_process(
+            SemesterPlanningExtractor(), shared.handles, {}, trace_origin=123)
+        assert [e['name'] for e in events if e['ph'] == 'X'].count('SEMESTER_PLANNING') == 1
+    finally:
+        simple_db_populator._process_recorder.deactivate()
+        simple_db_populator._process_recorder = None
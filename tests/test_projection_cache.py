@@ -0,0 +1,38 @@
+import pandas as pd
+
+from projection_cache import ProjectionCache
+
+
+def offered_courses():
+    return pd.DataFrame({
+        'sbjNo': ['A1', 'A1', 'B2', 'B2'],
+        'term': ['WS1415', 'WS1415', 'SS15', 'SS15'],
+        'lecNo': [1.0, 2.0, 3.0, 3.0],
+    })
+
+
+def test_prime_scans_once_and_serves_declared_sets_as_hits():
+    frame = offered_courses()
+    cache = ProjectionCache({'OfferedCourses': frame})
+    cache.prime(frame, [['sbjNo', 'term'], ['lecNo'], []])
+    assert cache.stats == {'hits': 0, 'derived': 2, 'scans': 1}
+
+    result = cache.distinct(frame, ['sbjNo', 'term'])
+    cache.distinct(frame, ['lecNo'])
+    assert cache.stats == {'hits': 2, 'derived': 2, 'scans': 1}
+    pd.testing.assert_frame_equal(result, frame[['sbjNo', 'term']].drop_duplicates())
+
+
+def test_distinct_returns_a_copy():
+    frame = offered_courses()
+    cache = ProjectionCache({'OfferedCourses': frame})
+    projection = cache.distinct(frame, ['lecNo'])
+    projection['lecNo'] = 0.0
+    assert cache.distinct(frame, ['lecNo'])['lecNo'].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_unregistered_frames_bypass_the_cache():
+    cache = ProjectionCache()
+    cache.prime(offered_courses(), [['sbjNo']])
+    assert len(cache.distinct(offered_courses(), ['sbjNo'])) == 2
+    assert cache.stats == {'hits': 0, 'derived': 0, 'scans': 0}
@@ -0,0 +1,51 @@
+import pytest
+
+from query_store import QueryStore
+
+TABLES = {
+    'SEMESTER_PLANNING': [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}],
+    'SUBJECT': [{'S_NR': '1051001-SWB'}, {'S_NR': '10510102-WKB'}],
+    'TEACHER': [{'T_ID': 86, 'T_LASTNAME': 'Malz'}, {'T_ID': 7, 'T_LASTNAME': 'Beck'}],
+    'LECTURER': [{'T_ID': 7, 'L_SUPERVISOR': 86}],
+    'OFFERING': [
+        {'O_ID': 1, 'FK_SUBJECT': '1051001-SWB', 'FK_SEMESTER_PLANNING': 1},
+        {'O_ID': 2, 'FK_SUBJECT': '1051001-SWB', 'FK_SEMESTER_PLANNING': 2},
+        {'O_ID': 3, 'FK_SUBJECT': '10510102-WKB', 'FK_SEMESTER_PLANNING': 2},
+    ],
+    'COURSE': [
+        {'C_ID': 1, 'C_TEACHER': 86, 'C_SUBJECT': '1051001-SWB', 'C_SEMESTER': 'WS1415', 'C_CREDITED_HOURS': 4.0},
+        {'C_ID': 2, 'C_TEACHER': 86, 'C_SUBJECT': '10510102-WKB', 'C_SEMESTER': 'WS1415', 'C_CREDITED_HOURS': 2.5},
+    ],
+}
+
+
+@pytest.fixture(scope='module')
+def store():
+    return QueryStore(TABLES)
+
+
+def test_keys_come_from_the_schema(store):
+    assert store.primary_keys['LECTURER'] == ('T_ID',)
+    assert store.primary_keys['POSITION_PROFESSOR'] == ('P_ID', 'PO_ID', 'TERM')
+    assert 'L_SUPERVISOR' in store.foreign_keys['LECTURER']
+    assert store.get('LECTURER', 7)['L_SUPERVISOR'] == 86
+    assert store.where('LECTURER', 'L_SUPERVISOR', 86)[0]['T_ID'] == 7
+
+
+def test_get_raises_on_duplicate_primary_keys():
+    store = QueryStore({'TEACHER': [{'T_ID': 1}, {'T_ID': 1}]})
+    with pytest.raises(ValueError):
+        store.get('TEACHER', 1)
+    assert store.get('TEACHER', 2) is None
+
+
+def test_offerings_of_subject_joins_on_subject_number(store):
+    assert [o['O_ID'] for o in store.offerings_of_subject('1051001-SWB')] == [1, 2]
+    assert [o['O_ID'] for o in store.offerings_of_subject('1051001-SWB', 'SS15')] == [2]
+    subject = store.get('SUBJECT', '10510102-WKB')
+    assert [o['O_ID'] for o in store.offerings_of_subject(subject)] == [3]
+
+
+def test_teacher_load(store):
+    assert store.teacher_load(86, 'WS1415') == 6.5
+    assert store.teacher_load(86, 2) == 0.0
@@ -0,0 +1,121 @@
+import json
+
+import numpy as np
+import pytest
+
+import base_extractor  # noqa: F401  (_load_override looks the base class up in sys.modules)
+from regression_gate import (BaselineStore, RegressionGate, TableMeasurement, _load_override,
+                             diff_records)
+
+CANDIDATES = '''
+from base_extractor import DataExtractor
+
+
+class TeacherExtractor(DataExtractor):
+    @property
+    def table_name(self):
+        return 'TEACHER'
+
+    def extract(self, **kwargs):
+        return []
+
+
+class SubjectExtractor(DataExtractor):
+    @property
+    def table_name(self):
+        return 'SUBJECT'
+
+    def extract(self, **kwargs):
+        return []
+'''
+
+
+def measurement(records, seconds=1.0, peak_bytes=1000, input_rows=100, error=None):
+    return TableMeasurement('TEACHER', records, seconds, peak_bytes, input_rows, error)
+
+
+def judge(base, candidate, stored=None, **options):
+    gate = RegressionGate(None, None, data_dir='.', **options)
+    return gate._judge('TEACHER', base, candidate, stored)
+
+
+def test_diff_ignores_order_rounding_and_numpy_scalars():
+    base = [{'ID': 1, 'HOURS': 2.0}, {'ID': 2, 'HOURS': 1.234}, {'ID': 3, 'HOURS': float('nan')}]
+    candidate = [{'ID': np.int64(3), 'HOURS': None}, {'HOURS': 1.2349, 'ID': 2}, {'ID': 1, 'HOURS': 2}]
+    assert diff_records(base, candidate).identical
+    assert not diff_records(base, candidate, decimals=3).identical
+
+
+def test_diff_counts_duplicates_and_ignores_columns():
+    base = [{'ID': 1, 'STAMP': 'a'}, {'ID': 1, 'STAMP': 'a'}]
+    candidate = [{'ID': 1, 'STAMP': 'b'}]
+    diff = diff_records(base, candidate)
+    assert len(diff.only_base) == 2 and len(diff.only_candidate) == 1
+
+    diff = diff_records(base, candidate, ignore=('STAMP',))
+    assert diff.only_base == [(('ID', 1),)]
+    assert diff.only_candidate == []
+
+
+def test_verdict_passes_equal_outputs_and_costs():
+    rows = [{'ID': 1}]
+    verdict = judge(measurement(rows), measurement(rows))
+    assert verdict.passed, verdict.problems
+
+
+def test_verdict_reports_failures_and_differing_outputs():
+    verdict = judge(measurement([]), measurement([], error='boom'))
+    assert verdict.problems == ['candidate failed: boom']
+    assert judge(None, measurement([])).problems == ['no TEACHER extractor in base']
+
+    verdict = judge(measurement([{'ID': 1}]), measurement([{'ID': 2}]))
+    assert verdict.problems == ['outputs differ: 1 rows only in base, 1 only in candidate']
+    assert "- {'ID': 1}" in verdict.notes and "+ {'ID': 2}" in verdict.notes
+
+
+def test_verdict_gates_time_and_memory_against_base():
+    verdict = judge(measurement([], seconds=1.0, peak_bytes=1000),
+                    measurement([], seconds=1.2, peak_bytes=1300))
+    assert len(verdict.problems) == 2
+    assert verdict.problems[0].startswith('slower than base: 1.20x')
+    assert verdict.problems[1].startswith('more memory than base: 1.30x')
+
+    # Timings below min_seconds are too noisy to gate, memory still is
+    verdict = judge(measurement([], seconds=0.001), measurement([], seconds=0.005), min_seconds=0.01)
+    assert verdict.passed
+
+
+def test_verdict_prefers_the_stored_baseline():
+    stored = {'rate': 0.02, 'peak_bytes_per_row': 10.0}
+    # 1.5 s / 100 rows is faster than the stored 0.02 s per row, though slower than base
+    verdict = judge(measurement([], seconds=1.0), measurement([], seconds=1.5), stored=stored)
+    assert verdict.passed, verdict.problems
+
+    verdict = judge(measurement([], seconds=1.0), measurement([], seconds=2.5), stored=stored)
+    assert verdict.problems[0].startswith('slower than stored baseline: 1.25x')
+
+
+def test_baseline_update_keeps_other_tables(tmp_path):
+    store = BaselineStore(str(tmp_path / 'baseline' / 'gate.json'))
+    store.update({'TEACHER': measurement([], seconds=2.0, peak_bytes=500)}, 'HEAD')
+    store.update({'SUBJECT': TableMeasurement('SUBJECT', [], 1.0, 100, 10),
+                  'LECTURER': TableMeasurement('LECTURER', [], 0.0, 0, 0, 'failed')}, 'HEAD~1')
+
+    tables = store.load()
+    assert sorted(tables) == ['SUBJECT', 'TEACHER']
+    assert tables['TEACHER']['rate'] == 0.02 and tables['TEACHER']['peak_bytes_per_row'] == 5.0
+    assert tables['SUBJECT']['implementation'] == 'HEAD~1'
+    assert json.loads(store.path.read_text())['tables'] == tables
+    assert [p.name for p in store.path.parent.iterdir()] == ['gate.json']
+
+
+def test_override_matches_the_table(tmp_path):
+    module = tmp_path / 'candidates.py'
+    module.write_text(CANDIDATES)
+
+    assert _load_override(str(module), None, 'SUBJECT').table_name == 'SUBJECT'
+    assert _load_override(str(module), 'TeacherExtractor', 'TEACHER').table_name == 'TEACHER'
+    with pytest.raises(ValueError, match='extracts TEACHER, not SUBJECT'):
+        _load_override(str(module), 'TeacherExtractor', 'SUBJECT')
+    with pytest.raises(ValueError, match='No extractor for LECTURER'):
+        _load_override(str(module), None, 'LECTURER')
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from requirement_index import RequirementIndex
+
+REQUIREMENTS = [
+    {'FK_STUDY_PROGRAM': 'SWB', 'FK_SUBJECT': 3, 'FK_SEMESTER_PLANNING': 1},
+    {'FK_STUDY_PROGRAM': 'SWB', 'FK_SUBJECT': 1, 'FK_SEMESTER_PLANNING': 1},
+    {'FK_STUDY_PROGRAM': 'SWB', 'FK_SUBJECT': 1, 'FK_SEMESTER_PLANNING': 1},
+    {'FK_STUDY_PROGRAM': 'TIB', 'FK_SUBJECT': 1, 'FK_SEMESTER_PLANNING': 2},
+    {'FK_STUDY_PROGRAM': 'TIB', 'FK_SUBJECT': None, 'FK_SEMESTER_PLANNING': 2},
+]
+
+
+def test_lookups_both_ways_without_duplicates():
+    index = RequirementIndex.from_records(REQUIREMENTS, term_ids={'WS1415': 1, 'SS15': 2})
+    assert len(index) == 3
+    assert index.subjects('SWB', 1) == (1, 3)
+    assert index.subjects('SWB', 'WS1415') == (1, 3)
+    assert index.programs(1, 'SS15') == ('TIB',)
+    assert index.programs(3, 2) == ()
+    assert index.subjects('IFS', 1) == ()
+
+
+def test_float_term_ids_find_integer_keys():
+    # FK columns with gaps come out of pandas as floats
+    frame = pd.DataFrame(REQUIREMENTS[:2]).astype({'FK_SEMESTER_PLANNING': float})
+    index = RequirementIndex.from_frame(frame)
+    assert index.subjects('SWB', 1) == (1, 3)
+    assert index.subjects('SWB', 1.0) == (1, 3)
+    assert index.subjects('SWB', '1') == ()
+
+
+def test_empty_requirements():
+    index = RequirementIndex.from_records([])
+    assert len(index) == 0
+    assert index.subjects('SWB', 1) == ()
+    assert index.programs(1, 'WS1415') == ()
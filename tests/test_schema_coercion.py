@@ -0,0 +1,65 @@
+import pytest
+
+from schema_coercion import SchemaCoercer
+from schema_model import Column
+
+SPECS = {'COURSE': {
+    'C_ID': Column('C_ID', 'INT', mandatory=True),
+    'C_HOURS': Column('C_HOURS', 'DECIMAL', length=5, decimal=2),
+    'C_SEMESTER': Column('C_SEMESTER', 'VARCHAR', length=6),
+    'C_ACTIVE': Column('C_ACTIVE', 'BOOLEAN'),
+}}
+
+
+def coerce(*records):
+    return SchemaCoercer(SPECS).coerce('COURSE', list(records))
+
+
+def test_columns_are_cast_rounded_and_mapped():
+    result = coerce(
+        {'C_ID': 1.0, 'C_HOURS': '2,5', 'C_SEMESTER': 'WS1415', 'C_ACTIVE': 'WAHR'},
+        {'C_ID': True, 'C_HOURS': 1.2345, 'C_SEMESTER': 15, 'C_ACTIVE': 0},
+        {'C_ID': '3', 'C_HOURS': float('nan'), 'C_SEMESTER': None, 'C_ACTIVE': 'falsch', 'EXTRA': 'x'},
+    )
+    assert result.rejects == []
+    assert result.records == [
+        {'C_ID': 1, 'C_HOURS': 2.5, 'C_SEMESTER': 'WS1415', 'C_ACTIVE': True, 'EXTRA': None},
+        {'C_ID': 1, 'C_HOURS': 1.23, 'C_SEMESTER': '15', 'C_ACTIVE': False, 'EXTRA': None},
+        {'C_ID': 3, 'C_HOURS': None, 'C_SEMESTER': None, 'C_ACTIVE': False, 'EXTRA': 'x'},
+    ]
+    assert type(result.records[0]['C_ID']) is int
+
+
+@pytest.mark.parametrize('record, reason', [
+    ({'C_ID': None}, 'C_ID is mandatory'),
+    ({'C_ID': 1.5}, "C_ID 1.5 is not a valid INT"),
+    ({'C_ID': 'x'}, "C_ID 'x' is not a valid INT"),
+    ({'C_ID': 1, 'C_HOURS': 1000.0}, "C_HOURS 1000.0 is not a valid DECIMAL(5,2)"),
+    ({'C_ID': 1, 'C_SEMESTER': 'WS14156'}, "C_SEMESTER 'WS14156' is not a valid VARCHAR(6)"),
+    ({'C_ID': 1, 'C_ACTIVE': 'vielleicht'}, "C_ACTIVE 'vielleicht' is not a valid BOOLEAN"),
+])
+def test_violations_are_rejected_with_reasons(record, reason):
+    result = coerce({'C_ID': 9}, record)
+    assert [r['C_ID'] for r in result.records] == [9]
+    assert [(reject.row, reject.reasons, reject.record) for reject in result.rejects] == [(1, [reason], record)]
+
+
+def test_all_reasons_of_a_row_are_kept():
+    result = coerce({'C_ID': None, 'C_SEMESTER': 'WS14156'})
+    assert result.records == []
+    assert result.rejects[0].reasons == ['C_ID is mandatory', "C_SEMESTER 'WS14156' is not a valid VARCHAR(6)"]
+
+
+def test_unknown_tables_and_empty_input_pass_through():
+    records = [{'C_ID': 'not a number'}]
+    assert SchemaCoercer(SPECS).coerce('OFFERING', records).records is records
+    assert coerce().records == []
+
+
+def test_course_terms_fit_the_schema():
+    coercer = SchemaCoercer.from_schema()
+    assert coercer.specs['COURSE']['C_SEMESTER'].length == 6
+    result = coercer.coerce('COURSE', [{'C_ID': 1, 'C_TEACHER': 86.0, 'C_SUBJECT': '10510102-SWB',
+                                        'C_SEMESTER': 'WS1415', 'FK_OFFERING': 3}])
+    assert result.rejects == []
+    assert result.records[0]['C_TEACHER'] == 86
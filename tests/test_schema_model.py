@@ -0,0 +1,24 @@
+import logging
+
+import schema_model
+
+
+def test_drifted_root_copy_warns_once(tmp_path, monkeypatch, caplog):
+    canonical, copy = tmp_path / 'canonical.dbs', tmp_path / 'copy.dbs'
+    canonical.write_text('<project/>')
+    copy.write_text('<project name="old"/>')
+    monkeypatch.setattr(schema_model, '_checked_copies', False)
+    with caplog.at_level(logging.WARNING, logger='schema_model'):
+        assert not schema_model.check_schema_copies(str(canonical), str(copy))
+        assert schema_model.check_schema_copies(str(canonical), str(copy))
+    assert len(caplog.records) == 1
+
+
+def test_identical_or_missing_copy_is_fine(tmp_path, monkeypatch):
+    canonical = tmp_path / 'canonical.dbs'
+    canonical.write_text('<project/>')
+    (tmp_path / 'copy.dbs').write_text('<project/>')
+    monkeypatch.setattr(schema_model, '_checked_copies', False)
+    assert schema_model.check_schema_copies(str(canonical), str(tmp_path / 'copy.dbs'))
+    monkeypatch.setattr(schema_model, '_checked_copies', False)
+    assert schema_model.check_schema_copies(str(canonical), str(tmp_path / 'missing.dbs'))
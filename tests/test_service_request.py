@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from service_matrix import ServiceMatrix
+from service_request import ServiceRequestExtractor
+
+SEMESTERS = [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}]
+DEPARTMENTS = [{'D_NAME': name} for name in ('G', 'IT', 'IFS')]
+SUBJECTS = [{'S_NR': nr} for nr in ('1051001-SWB', '1052007-TIB', '1053007-WKB')]
+
+
+def offered(*rows):
+    columns = ['srvProvider', 'srvClient', 'sbjNo', 'term', 'lecNo', 'cntSchd', 'numSchd']
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+def extract(frame):
+    extractor = ServiceRequestExtractor()
+    records = extractor.extract(frame, subject=SUBJECTS, semester_planning=SEMESTERS, department=DEPARTMENTS)
+    return extractor, records
+
+
+def test_offering_hours_are_counted_once_across_lecturer_rows():
+    # Two lecturers share a 4-hour offering; each row repeats the offering's hours
+    extractor, records = extract(offered(
+        ('G', 'IT', '1051001-SWB', 'WS1415', 1.0, 2.0, 4.0),
+        ('G', 'IT', '1051001-SWB', 'WS1415', 2.0, 2.0, 4.0),
+        ('G', 'IT', '1051001-SWB', 'SS15', 1.0, 0.0, 2.0),
+        ('G', 'IT', '1051001-SWB', 'SS15', 2.0, 0.0, 2.0),
+    ))
+    hours = {r['FK_SEMESTER_PLANNING']: r['SR_WEEKLY_HOURS'] for r in records}
+    assert hours == {1: 4.0, 2: 2.0}
+    assert extractor.matrix.hours('G', 'IT') == pytest.approx(6.0)
+
+
+def test_internal_share_of_an_offering_is_not_a_service():
+    extractor, records = extract(offered(
+        ('IT', 'IT', '1052007-TIB', 'WS1415', 1.0, 3.0, 4.0),
+        ('G', 'IT', '1052007-TIB', 'WS1415', 2.0, 1.0, 4.0),
+    ))
+    assert [(r['SR_EXPORTING_FACULTY'], r['SR_WEEKLY_HOURS']) for r in records] == [('G', 1.0)]
+
+
+def test_empty_source():
+    extractor, records = extract(offered())
+    assert records == []
+    assert len(extractor.matrix) == 0
+    assert extractor.matrix.hours('G', 'IT') == 0.0
+
+
+def test_sparse_matrix_lookups():
+    matrix = ServiceMatrix({('G', 'IT', 1): 4.0, ('G', 'IT', 2): 2.0, ('IFS', 'IT', 2): 1.5, ('G', 'IFS', 1): 0.0})
+    assert len(matrix) == 3
+    assert matrix.hours('G', 'IT', 2) == 2.0
+    assert matrix.hours('G', 'IT') == 6.0
+    assert matrix.hours('G', 'IFS') == 0.0
+    assert matrix.provided_by('G') == {'IT': 6.0}
+    assert matrix.received_by('IT', 2) == {'G': 2.0, 'IFS': 1.5}
+    assert matrix.terms == [1, 2]
+    frame = matrix.to_frame(2)
+    assert frame.loc['IFS', 'IT'] == 1.5 and frame.loc['G', 'IT'] == 2.0
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from term_calendar import TermCalendar, is_term, term_code, term_key, terms_before
+
+CALENDAR = TermCalendar({3: 'WS1516', 1: 'WS1415', 2: 'SS15'})
+
+
+def test_term_keys_are_chronological():
+    assert term_key('WS1415') < term_key('SS15') < term_key('WS1516')
+    assert term_code(term_key('ws1415')) == 'WS1415'
+    assert terms_before(['WS1516', 'x', 'SS15', 'WS1415'], 'WS1516') == ['WS1415', 'SS15']
+
+
+@pytest.mark.parametrize('code', ['WS1417', 'SS1516', 'XX15', '', None, 2.0])
+def test_invalid_term_codes(code):
+    assert not is_term(code)
+    with pytest.raises(ValueError):
+        term_key(code)
+
+
+def test_duplicate_term_codes_are_rejected():
+    with pytest.raises(ValueError):
+        TermCalendar({1: 'SS15', 2: 'ss15'})
+
+
+def test_lookups_accept_codes_and_numeric_ids():
+    assert CALENDAR.sp_ids == [1, 2, 3]
+    assert CALENDAR.position('SS15') == 1
+    # SP_IDs mapped through pandas arrive as floats or numpy scalars
+    assert CALENDAR.position(2.0) == 1
+    assert CALENDAR.position(np.int64(3)) == 2
+    assert CALENDAR.sp_id('WS1516') == 3
+    assert CALENDAR.term(np.float64(1.0)) == 'WS1415'
+    assert CALENDAR.sp_id('SS16') is None
+    assert 'SS15' in CALENDAR and 4 not in CALENDAR
+
+
+def test_navigation():
+    assert CALENDAR.previous('SS15') == 1
+    assert CALENDAR.previous(1) is None
+    assert CALENDAR.next(1, steps=2) == 3
+    assert CALENDAR.last(2) == [2, 3]
+    assert CALENDAR.last(5, until='SS15') == [1, 2]
+    assert CALENDAR.range('SS15') == [2, 3]
+    assert CALENDAR.range('SS14', 'WS1920') == [1, 2, 3]
+    with pytest.raises(KeyError):
+        CALENDAR.next('SS16')
+
+
+def test_from_terms_keeps_valid_distinct_codes():
+    calendar = TermCalendar.from_terms(['ss15', 'WS1415', None, 'Nachklausur', 'SS15'], first_id=10)
+    assert calendar.id_mapping() == {'WS1415': 10, 'SS15': 11}
+
+
+def test_vectorized_mapping_of_plain_and_categorical_columns():
+    codes = pd.Series(['SS15', 'WS1516', 'SS30', None])
+    for series in (codes, codes.astype('category')):
+        ids = CALENDAR.map_ids(series)
+        assert ids.tolist()[:2] == [2, 3]
+        assert ids.iloc[2:].isna().all()
+    positions = CALENDAR.map_positions(pd.Series([3, 1.0, 7]))
+    assert positions.tolist()[:2] == [2, 0]
+    assert pd.isna(positions.iat[2])
+
+
+def test_empty_calendar():
+    calendar = TermCalendar.from_records([{'SP_ID': 1, 'SP_TERM': None}])
+    assert len(calendar) == 0
+    assert calendar.last(3) == []
+    assert calendar.range() == []
+    assert calendar.position('SS15') is None
+    assert calendar.map_ids(pd.Series([], dtype=object)).empty
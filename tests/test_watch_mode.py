@@ -0,0 +1,60 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from db_sink import PartitionedSqliteSink
+from output_store import OutputStore
+from watch_mode import PartitionWrites, diff_source
+
+SEMESTERS = [{'SP_ID': 1, 'SP_TERM': 'WS1415'}, {'SP_ID': 2, 'SP_TERM': 'SS15'}]
+OFFERINGS = [
+    {'O_ID': 1, 'FK_SUBJECT': 'A', 'FK_SEMESTER_PLANNING': 1, 'O_PLANNED_HOURS': 4.0},
+    {'O_ID': 2, 'FK_SUBJECT': 'A', 'FK_SEMESTER_PLANNING': 2, 'O_PLANNED_HOURS': 4.0},
+]
+
+
+def test_diff_source_compares_only_the_given_columns():
+    old = pd.DataFrame({'term': ['WS1415', 'SS15'], 'numSchd': [4, 2], 'assNotes': ['', '']})
+    new = old.assign(assNotes=['changed', ''])
+    assert not diff_source('OfferedCourses', old, new, ['term', 'numSchd']).changed
+
+    new = old.assign(numSchd=[4, 3])
+    change = diff_source('OfferedCourses', old, new, ['term', 'numSchd'])
+    assert (change.added_rows, change.removed_rows, change.terms) == (1, 1, {'SS15'})
+
+
+@pytest.fixture
+def partitioned(tmp_path):
+    sink = PartitionedSqliteSink(str(tmp_path / 'planning.db')).open()
+    sink.write_table('SEMESTER_PLANNING', SEMESTERS)
+    sink.write_table('OFFERING', OFFERINGS)
+    outputs = OutputStore({}, retain=True)
+    outputs.put('SEMESTER_PLANNING', SEMESTERS)
+    yield sink, outputs, tmp_path / 'planning.db'
+    sink.close()
+
+
+def hours(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return dict(connection.execute('SELECT O_ID, O_PLANNED_HOURS FROM OFFERING'))
+
+
+def test_only_the_changed_term_partition_is_written(partitioned):
+    sink, outputs, db_path = partitioned
+    changed = [OFFERINGS[0], dict(OFFERINGS[1], O_PLANNED_HOURS=6.0)]
+    writes = PartitionWrites(sink, {'SS15'}, {'OFFERING': OFFERINGS, 'SEMESTER_PLANNING': SEMESTERS}, outputs)
+
+    assert writes.write_table('OFFERING', changed) == 2
+    assert writes.written == {'OFFERING': ['SS15']}
+    assert hours(db_path) == {1: 4.0, 2: 6.0}
+
+
+def test_changes_outside_the_diff_terms_rewrite_the_table(partitioned):
+    sink, outputs, db_path = partitioned
+    changed = [dict(OFFERINGS[0], O_ID=3), OFFERINGS[1]]
+    writes = PartitionWrites(sink, {'SS15'}, {'OFFERING': OFFERINGS, 'SEMESTER_PLANNING': SEMESTERS}, outputs)
+
+    writes.write_table('OFFERING', changed)
+    assert writes.written == {}
+    assert hours(db_path) == {3: 4.0, 2: 4.0}
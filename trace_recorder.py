@@ -0,0 +1,135 @@
+"""
+Chrome trace-event recorder for populator runs.
+
+Records spans (complete events) for extractors, CSV loading, projection
+cache lookups, foreign key resolution and database writes, one lane per
+thread and one process track per OS process. The resulting JSON opens in
+chrome://tracing or https://ui.perfetto.dev, where idle workers show up as
+gaps in their lane and stragglers as the last long span.
+
+Instrumented code calls the module-level span()/instant()/counter()
+helpers; they are no-ops unless a recorder has been activated, so the
+instrumentation costs nothing in normal runs.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_active: Optional['TraceRecorder'] = None
+
+
+class TraceRecorder:
+    """Collects trace events in memory and writes them as trace-event JSON"""
+
+    def __init__(self, path: Optional[str] = None, origin: Optional[int] = None,
+                 process_name: str = 'populator'):
+        """
+        Args:
+            path: File save() writes to (None for recorders in worker processes)
+            origin: perf_counter_ns() value of time zero; worker processes pass
+                the parent's so their spans line up with its timeline
+            process_name: Label of this process's track
+        """
+        self.path = Path(path) if path is not None else None
+        self.origin = time.perf_counter_ns() if origin is None else origin
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._events.append({'ph': 'M', 'name': 'process_name', 'pid': self._pid, 'tid': 0,
+                             'args': {'name': f"{process_name} ({self._pid})"}})
+
+    def activate(self) -> 'TraceRecorder':
+        global _active
+        _active = self
+        return self
+
+    def deactivate(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+
+    def now(self) -> float:
+        """Microseconds since the recorder was created"""
+        return (time.perf_counter_ns() - self.origin) / 1000
+
+    def complete(self, name: str, category: str, start: float, end: float, **args) -> None:
+        self._append({'ph': 'X', 'name': name, 'cat': category, 'ts': start,
+                      'dur': max(end - start, 0.0), 'args': args})
+
+    def instant(self, name: str, category: str, **args) -> None:
+        self._append({'ph': 'i', 's': 't', 'name': name, 'cat': category, 'ts': self.now(), 'args': args})
+
+    def counter(self, name: str, **values: float) -> None:
+        self._append({'ph': 'C', 'name': name, 'ts': self.now(), 'args': values})
+
+    def add_events(self, events: List[Dict[str, Any]]) -> None:
+        """Merge events recorded elsewhere (e.g. by worker processes)"""
+        with self._lock:
+            self._events.extend(events)
+
+    def take_events(self) -> List[Dict[str, Any]]:
+        """Remove and return the events recorded so far (for sending them to the parent)"""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def save(self) -> Path:
+        with self._lock:
+            payload = {'traceEvents': list(self._events), 'displayTimeUnit': 'ms'}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(payload), encoding='utf-8')
+        logger.info(f"Trace with {len(payload['traceEvents'])} events written to {self.path}")
+        return self.path
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        with self._lock:
+            tid = self._threads.get(thread.ident)
+            if tid is None:
+                tid = self._threads[thread.ident] = len(self._threads) + 1
+                self._events.append({'ph': 'M', 'name': 'thread_name', 'pid': self._pid, 'tid': tid,
+                                     'args': {'name': thread.name}})
+                self._events.append({'ph': 'M', 'name': 'thread_sort_index', 'pid': self._pid, 'tid': tid,
+                                     'args': {'sort_index': tid}})
+            event['pid'] = self._pid
+            event['tid'] = tid
+            self._events.append(event)
+
+
+def active() -> Optional[TraceRecorder]:
+    return _active
+
+
+@contextmanager
+def span(name: str, category: str, **args):
+    """Record the enclosed block as one span on the current thread's lane"""
+    recorder = _active
+    if recorder is None:
+        yield
+        return
+    start = recorder.now()
+    try:
+        yield
+    finally:
+        recorder.complete(name, category, start, recorder.now(), **args)
+
+
+def instant(name: str, category: str, **args) -> None:
+    recorder = _active
+    if recorder is not None:
+        recorder.instant(name, category, **args)
+
+
+def counter(name: str, **values: float) -> None:
+    recorder = _active
+    if recorder is not None:
+        recorder.counter(name, **values)
@@ -0,0 +1,359 @@
+"""
+Watch mode: re-populate automatically when the CSV exports change.
+
+Monitors the data directory with inotify (via the optional inotify_simple
+package) and falls back to polling file size and mtime. Bursts of writes
+are debounced until the files have been quiet for a moment. The changed
+sources are then re-loaded and diffed row by row against the previous
+load, over the source columns the extractors declare; only the extractors
+whose declared columns changed, and everything downstream of them, are
+re-run. All other tables keep their outputs from the previous cycle and are
+not rewritten. The terms the diff touched are passed to the extractors as
+changed_terms, so DEPUTAT_ACCOUNT updates only those terms of its balances.
+With a term-partitioned sink, re-run term-scoped tables only rewrite the
+partitions of these terms.
+"""
+
+import time
+import logging
+from pathlib import Path
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from source_files import SOURCE_FILES, source_path, source_file_names
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # Optional dependency, polling fallback below
+    INotify = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceChange:
+    """Row level difference of one CSV source between two loads"""
+    source: str
+    added_rows: int = 0
+    removed_rows: int = 0
+    terms: Set[str] = field(default_factory=set)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added_rows or self.removed_rows)
+
+
+def diff_source(name: str, old, new, columns: Optional[List[str]] = None) -> SourceChange:
+    """
+    Compare two loads of a source as multisets of rows.
+
+    Rows are compared by content hash, so reordering rows is not a change.
+    The terms of all added and removed rows are collected.
+
+    Args:
+        columns: Compare only these columns (default: all loaded columns);
+            changes in other columns are not reported
+    """
+    import pandas as pd
+
+    change = SourceChange(name)
+    if old is None:
+        change.added_rows = len(new)
+    else:
+        projected = columns if columns is not None else list(new.columns)
+        old_hashes = pd.util.hash_pandas_object(old[projected], index=False)
+        new_hashes = pd.util.hash_pandas_object(new[projected], index=False)
+        removed = Counter(old_hashes.tolist()) - Counter(new_hashes.tolist())
+        added = Counter(new_hashes.tolist()) - Counter(old_hashes.tolist())
+        change.removed_rows = sum(removed.values())
+        change.added_rows = sum(added.values())
+        if 'term' in new.columns:
+            change.terms.update(old.loc[old_hashes.isin(removed).to_numpy(), 'term'].dropna().astype(str))
+            change.terms.update(new.loc[new_hashes.isin(added).to_numpy(), 'term'].dropna().astype(str))
+    return change
+
+
+class PartitionWrites:
+    """
+    Sink wrapper that rewrites only the changed term partitions.
+
+    Term-scoped tables whose rows changed only in the given terms are
+    written with write_partition(); all other tables, and tables whose rows
+    also moved in other terms (e.g. shifted surrogate keys), are written
+    with the wrapped sink's write_table().
+    """
+
+    def __init__(self, sink, terms: Set[str], previous: Dict[str, List[Dict[str, Any]]], outputs):
+        """
+        Args:
+            sink: Term-partitioned sink
+            terms: Term codes the source diff touched
+            previous: Table -> records of the previous cycle
+            outputs: Retaining store that receives this cycle's outputs
+        """
+        from term_partitions import TermResolver, partition_name
+
+        self.sink = sink
+        self.terms = {partition_name(term) for term in terms}
+        self.previous = previous
+        self.outputs = outputs
+        self._previous_resolver = TermResolver.from_records(previous.get('SEMESTER_PLANNING', []))
+        self.written: Dict[str, List[str]] = {}
+
+    def write_table(self, table_name: str, records: List[Dict[str, Any]]) -> int:
+        from term_partitions import TERM_COLUMNS, TermResolver, partition_records
+
+        if table_name not in TERM_COLUMNS or table_name not in self.previous:
+            return self.sink.write_table(table_name, records)
+
+        new = partition_records(table_name, records, TermResolver.from_records(self.outputs.get('SEMESTER_PLANNING')))
+        old = partition_records(table_name, self.previous[table_name], self._previous_resolver)
+        changed = sorted(term for term in new.keys() | old.keys()
+                         if _rows(new.get(term, [])) != _rows(old.get(term, [])))
+        if not set(changed) <= self.terms or not set(changed) <= new.keys():
+            logger.info(f"{table_name}: rows changed outside the terms of the diff, rewriting the table")
+            return self.sink.write_table(table_name, records)
+
+        for term in changed:
+            self.sink.write_partition(table_name, term, new[term])
+        self.written[table_name] = changed
+        logger.info(f"✓ {table_name}: rewrote partitions {', '.join(changed) or '-'}")
+        return len(records)
+
+    def __getattr__(self, name: str):
+        return getattr(self.sink, name)
+
+
+def _rows(records: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    """Comparable row values (NaN and numpy scalars as the sink stores them)"""
+    from db_sink import to_sql_value
+
+    return [tuple(sorted((column, to_sql_value(value)) for column, value in record.items())) for record in records]
+
+
+class DataDirectoryWatcher:
+    """Blocks until source files in the data directory changed (debounced)"""
+
+    def __init__(self, data_dir: str = "data", debounce: float = 1.0, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        self.data_dir = Path(data_dir)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._names = {file_name: name for name in SOURCE_FILES for file_name in source_file_names(name)}
+        self._inotify = None
+        if use_inotify and INotify is not None:
+            try:
+                self._inotify = INotify()
+                self._inotify.add_watch(
+                    str(self.data_dir),
+                    inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+                    | inotify_flags.DELETE | inotify_flags.MODIFY
+                )
+            except OSError as e:
+                logger.warning(f"inotify unavailable ({e}), falling back to polling")
+                self._inotify = None
+        self._snapshot = self._stat_all()
+
+    @property
+    def backend(self) -> str:
+        return 'inotify' if self._inotify is not None else 'polling'
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Return the names of the sources that changed.
+
+        Blocks until at least one source changed and the directory has been
+        quiet for the debounce interval, or until timeout (returns []).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._inotify is not None:
+                triggered = self._wait_inotify(deadline)
+            else:
+                triggered = self._wait_polling(deadline)
+            if not triggered:
+                return []
+
+            # Debounce: wait until the files stop changing
+            while True:
+                time.sleep(self.debounce)
+                if self._inotify is not None:
+                    if not self._inotify.read(timeout=0):
+                        break
+                elif self._stat_all() == self._snapshot_pending:
+                    break
+                else:
+                    self._snapshot_pending = self._stat_all()
+
+            current = self._stat_all()
+            changed = sorted(name for name in SOURCE_FILES
+                             if current.get(name) != self._snapshot.get(name))
+            self._snapshot = current
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _wait_inotify(self, deadline: Optional[float]) -> bool:
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            events = self._inotify.read(timeout=None if remaining is None else int(remaining * 1000))
+            if any(event.name in self._names for event in events):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def _wait_polling(self, deadline: Optional[float]) -> bool:
+        while True:
+            current = self._stat_all()
+            if current != self._snapshot:
+                self._snapshot_pending = current
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _stat_all(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        snapshot = {}
+        for name in SOURCE_FILES:
+            path = source_path(self.data_dir, name)
+            try:
+                stat = path.stat()
+                snapshot[name] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                snapshot[name] = None
+        return snapshot
+
+
+class WatchMode:
+    """
+    Long-running populator loop.
+
+    The first cycle populates the full database. Every following cycle
+    re-runs only the extractors affected by the changed sources, using the
+    retained outputs of the previous cycles for all other dependencies.
+    """
+
+    def __init__(self, populator, db_path: str, debounce: float = 1.0, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        from output_store import OutputStore
+
+        self.populator = populator
+        self.sink = populator.create_sink(db_path)
+        self.outputs = OutputStore({}, retain=True, budget_bytes=populator.memory_budget,
+                                   spill_dir=populator.spill_dir)
+        self.watcher = DataDirectoryWatcher(populator.data_dir, debounce, poll_interval, use_inotify)
+        self.sources: Dict[str, object] = {}
+
+    def run(self, max_cycles: Optional[int] = None) -> None:
+        """Populate once, then re-populate on every change (until max_cycles changes)"""
+        logger.info(f"Watching {self.populator.data_dir} ({self.watcher.backend}), Ctrl+C to stop")
+        self.sink.open()
+        try:
+            self.sources = self.populator.load_sources()
+            self._report(self.populator.extract_all(self.sink, sources=self.sources, outputs=self.outputs))
+
+            cycles = 0
+            while max_cycles is None or cycles < max_cycles:
+                changed = self.watcher.wait_for_changes()
+                cycles += 1
+                self.refresh(changed)
+        except KeyboardInterrupt:
+            logger.info("Watch mode stopped")
+        finally:
+            self.watcher.close()
+            self.outputs.close()
+            self.sink.close()
+
+    def refresh(self, changed_sources: List[str]) -> None:
+        """Re-load the sources and re-run the extractors affected by real row changes"""
+        from term_calendar import term_sort_key
+
+        started = time.perf_counter()
+        try:
+            sources = self.populator.load_sources()
+        except Exception as e:
+            # Typically a half-written export; the next write triggers another cycle
+            logger.error(f"Could not load changed sources: {e}")
+            return
+
+        declared = self.populator.source_columns()
+        changes = [diff_source(name, self.sources.get(name), sources[name], declared.get(name))
+                   for name in changed_sources if name in sources]
+        changes = [change for change in changes if change.changed]
+        previous_sources, self.sources = self.sources, sources
+        if not changes:
+            logger.info(f"{', '.join(changed_sources)} touched without changes to the read columns, nothing to do")
+            return
+
+        for change in changes:
+            terms = ', '.join(sorted(change.terms, key=term_sort_key)) or '-'
+            logger.info(f"{change.source}: +{change.added_rows}/-{change.removed_rows} rows, terms: {terms}")
+
+        direct = self._changed_extractors(changes, previous_sources, sources)
+        affected = set(direct) | self.populator.graph.descendants(direct)
+        # Dependencies that failed in an earlier cycle have no output to reuse
+        affected |= {t for t in self.populator.graph.ancestors(affected) if t not in self.outputs}
+        affected = [table for table in self.populator.order if table in affected]
+        if not affected:
+            logger.info("No extractor reads the changed columns, nothing to do")
+            return
+        logger.info(f"Re-running {len(affected)} extractors: {', '.join(affected)}")
+        # Every changed row carries its term: incremental extractors (DEPUTAT_ACCOUNT)
+        # update just these terms instead of recomputing the history
+        options = {}
+        if all(change.terms for change in changes):
+            options['changed_terms'] = sorted(set().union(*(c.terms for c in changes)), key=term_sort_key)
+        result = self.populator.extract_all(self._partition_writes(affected, changes), tables=affected,
+                                            sources=sources, outputs=self.outputs, options=options)
+        self._report(result)
+        logger.info(f"✓ Database refreshed in {time.perf_counter() - started:.2f}s")
+
+    def _changed_extractors(self, changes: List[SourceChange], old_sources: Dict[str, object],
+                            new_sources: Dict[str, object]) -> List[str]:
+        """Extractors whose own declared columns of a changed source differ between the loads"""
+        import inspect
+
+        changed: Dict[Tuple[str, Optional[Tuple[str, ...]]], bool] = {}
+        tables = []
+        for table, extractor in self.populator.extractors.items():
+            parameters = inspect.signature(extractor.extract).parameters
+            declared = extractor.source_columns
+            for change in changes:
+                if change.source not in parameters:
+                    continue
+                columns = None if declared is None else declared.get(change.source)
+                if columns == []:
+                    continue
+                key = (change.source, None if columns is None else tuple(sorted(columns)))
+                if key not in changed:
+                    changed[key] = columns is None or diff_source(
+                        change.source, old_sources.get(change.source), new_sources[change.source],
+                        sorted(columns)).changed
+                if changed[key]:
+                    tables.append(table)
+                    break
+        return tables
+
+    def _partition_writes(self, tables: List[str], changes: List[SourceChange]):
+        """The sink, wrapped to write only the changed terms when it is term-partitioned"""
+        from term_partitions import TERM_COLUMNS
+
+        terms = set().union(*(change.terms for change in changes))
+        if not hasattr(self.sink, 'write_partition') or not terms or 'SEMESTER_PLANNING' not in self.outputs:
+            return self.sink
+        previous = {table: [dict(record) for record in self.outputs.get(table)]
+                    for table in list(tables) + ['SEMESTER_PLANNING']
+                    if (table in TERM_COLUMNS or table == 'SEMESTER_PLANNING') and table in self.outputs}
+        return PartitionWrites(self.sink, terms, previous, self.outputs)
+
+    @staticmethod
+    def _report(result) -> None:
+        for table, error in result.failed.items():
+            logger.error(f"❌ {table}: {error}")
+        if result.skipped:
+            logger.warning(f"Skipped: {', '.join(result.skipped)}")